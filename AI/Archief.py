@@ -0,0 +1,102 @@
+import lzma
+import os
+import threading
+from pathlib import Path
+from typing import Optional, Set, Tuple
+from Models import Project
+from Snapshot import decodeer_project, encodeer_project
+
+
+ARCHIEFMAP = '.archief'
+PAKEXTENSIE = '.xz'
+
+
+class Archief:
+    """
+    Gecomprimeerde opslag voor gesloten projecten.
+    
+    Elk project staat in een eigen pack: het blok van encodeer_project(),
+    gecomprimeerd met lzma. Een pack wordt pas uitgepakt als het project
+    geopend wordt; voor het overzicht volstaat de catalogus.
+    """
+    
+    def __init__(self, base_path: Path, niveau: int = 6):
+        """
+        Args:
+            base_path: De map van de werkruimte; de packs komen in base_path/.archief
+            niveau: lzma-niveau (0-9), hoger is kleiner maar trager bij inpakken
+        """
+        self.pad = base_path / ARCHIEFMAP
+        self.niveau = niveau
+        self._mapnamen: Set[str] = set()
+        self._vingerafdruk: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+    
+    def _pak(self, mapnaam: str) -> Path:
+        return self.pad / (mapnaam + PAKEXTENSIE)
+    
+    def mapnamen(self) -> Set[str]:
+        """Geef de mapnamen van alle gearchiveerde projecten (niet wijzigen)"""
+        try:
+            status = os.stat(self.pad)
+            vingerafdruk = (status.st_mtime_ns, status.st_size)
+        except FileNotFoundError:
+            return set()
+        
+        # De map wordt alleen opnieuw gelezen als er packs bijgekomen of verdwenen zijn
+        with self._lock:
+            if vingerafdruk != self._vingerafdruk:
+                with os.scandir(self.pad) as items:
+                    self._mapnamen = {item.name[:-len(PAKEXTENSIE)] for item in items
+                                      if item.name.endswith(PAKEXTENSIE)}
+                self._vingerafdruk = vingerafdruk
+            return self._mapnamen
+    
+    def bevat(self, mapnaam: str) -> bool:
+        """Controleer of een project gearchiveerd is"""
+        return self._pak(mapnaam).exists()
+    
+    def vingerafdruk(self, mapnaam: str) -> Optional[Tuple[int, int]]:
+        """Wijzigingstijd en grootte van het pack van een project; None als het er niet is"""
+        try:
+            status = os.stat(self._pak(mapnaam))
+        except FileNotFoundError:
+            return None
+        return status.st_mtime_ns, status.st_size
+    
+    def pak_in(self, mapnaam: str, project: Project) -> int:
+        """
+        Schrijf een project atomisch naar zijn pack.
+        
+        Returns:
+            Grootte van het pack in bytes
+        """
+        data = lzma.compress(encodeer_project(project), preset=self.niveau)
+        self.pad.mkdir(exist_ok=True)
+        
+        pak = self._pak(mapnaam)
+        tijdelijk = pak.with_name(pak.name + '.tmp')
+        with open(tijdelijk, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tijdelijk, pak)
+        
+        return len(data)
+    
+    def pak_uit(self, mapnaam: str) -> Optional[Project]:
+        """Lees een project met al zijn taken uit zijn pack; None als het niet gearchiveerd is"""
+        try:
+            with open(self._pak(mapnaam), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        
+        return decodeer_project(lzma.decompress(data))
+    
+    def verwijder(self, mapnaam: str):
+        """Verwijder het pack van een project, als het er is"""
+        try:
+            os.remove(self._pak(mapnaam))
+        except FileNotFoundError:
+            pass
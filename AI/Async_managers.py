@@ -0,0 +1,154 @@
+from contextlib import AsyncExitStack
+from datetime import datetime
+from typing import Any, Iterable, List, Mapping, Optional, Tuple
+from Models import Project, ProjectStatus, ProjectSamenvatting, Task, TaskPriority, TaskStatus, naam_sleutel
+from Project_manager import ProjectManager
+from Task_manager import TaskManager
+from Async_storage import AsyncStorage
+
+
+class AsyncProjectManager:
+    """
+    Asyncio-variant van ProjectManager.
+    
+    Elke methode die van schijf kan lezen of naar schijf schrijft is een
+    coroutine en draait de bijbehorende ProjectManager-methode in de
+    threadpool van AsyncStorage. Operaties op hetzelfde project lopen na
+    elkaar; operaties op verschillende projecten lopen tegelijk, zodat een
+    trage schrijfactie de rest niet ophoudt.
+    
+    Maak een instantie aan met ``await AsyncProjectManager.open(storage)``.
+    """
+    
+    def __init__(self, manager: ProjectManager, opslag: AsyncStorage):
+        self.manager = manager
+        self.opslag = opslag
+    
+    @classmethod
+    async def open(cls, storage, max_gelijktijdig: int = 4) -> "AsyncProjectManager":
+        """
+        Maak een manager aan en laad de catalogus zonder de event loop te blokkeren.
+        
+        Args:
+            storage: De onderliggende (synchrone) opslag
+            max_gelijktijdig: Maximaal aantal operaties dat tegelijk op schijf werkt
+        """
+        opslag = AsyncStorage(storage, max_gelijktijdig)
+        manager = await opslag.voer_uit(ProjectManager, storage, gebruik_zoekindex=True)
+        return cls(manager, opslag)
+    
+    async def maak_project_aan(self, naam: str,
+                               beschrijving: Optional[str] = None) -> Tuple[bool, str, Optional[Project]]:
+        """Maak een nieuw project aan, zie ProjectManager.maak_project_aan"""
+        async with self.opslag.project_lock(naam):
+            return await self.opslag.voer_uit(self.manager.maak_project_aan, naam, beschrijving)
+    
+    async def zoek_project(self, naam: str) -> Optional[Project]:
+        """Zoek een project op naam en laad het zo nodig"""
+        async with self.opslag.project_lock(naam):
+            return await self.opslag.voer_uit(self.manager.zoek_project, naam)
+    
+    async def sluit_project(self, projectnaam: str) -> Tuple[bool, str]:
+        """Sluit een project, zie ProjectManager.sluit_project"""
+        async with self.opslag.project_lock(projectnaam):
+            return await self.opslag.voer_uit(self.manager.sluit_project, projectnaam)
+    
+    async def verwijder_project(self, projectnaam: str) -> Tuple[bool, str]:
+        """Verwijder een project, zie ProjectManager.verwijder_project"""
+        async with self.opslag.project_lock(projectnaam):
+            return await self.opslag.voer_uit(self.manager.verwijder_project, projectnaam)
+    
+    def haal_samenvattingen_op(self) -> List[ProjectSamenvatting]:
+        """Haal een samenvatting van alle projecten op; leest niet van schijf"""
+        return self.manager.haal_samenvattingen_op()
+    
+    def toon_projectoverzicht(self) -> str:
+        """Toon een overzicht van alle projecten; leest niet van schijf"""
+        return self.manager.toon_projectoverzicht()
+    
+    async def zoek_taken(self, status: Optional[TaskStatus] = None,
+                         prioriteit: Optional[TaskPriority] = None,
+                         projectstatus: Optional[ProjectStatus] = None,
+                         aangemaakt_vanaf: Optional[datetime] = None,
+                         aangemaakt_voor: Optional[datetime] = None,
+                         afgerond_vanaf: Optional[datetime] = None,
+                         afgerond_voor: Optional[datetime] = None) -> List[Tuple[Project, Task]]:
+        """
+        Zoek taken over alle projecten heen, zie ProjectManager.zoek_taken.
+        
+        Houdt de locks van alle projecten vast, zodat geen taak of index
+        wijzigt terwijl de threadpool erdoorheen loopt.
+        """
+        # Altijd in dezelfde volgorde; de andere methodes nemen maar een lock
+        namen = sorted({naam_sleutel(samenvatting.naam)
+                        for samenvatting in self.manager.haal_samenvattingen_op()})
+        
+        async with AsyncExitStack() as locks:
+            for naam in namen:
+                await locks.enter_async_context(self.opslag.project_lock(naam))
+            
+            return await self.opslag.voer_uit(
+                lambda: list(self.manager.zoek_taken(status, prioriteit, projectstatus,
+                                                     aangemaakt_vanaf, aangemaakt_voor,
+                                                     afgerond_vanaf, afgerond_voor))
+            )
+    
+    async def sluit(self):
+        """Schrijf alles weg en sluit de opslag"""
+        await self.opslag.sluit()
+
+
+class AsyncTaskManager:
+    """
+    Asyncio-variant van TaskManager.
+    
+    Gebruikt dezelfde AsyncStorage als de AsyncProjectManager, zodat
+    taakwijzigingen en projectoperaties op hetzelfde project na elkaar lopen.
+    """
+    
+    def __init__(self, opslag: AsyncStorage):
+        """
+        Args:
+            opslag: De AsyncStorage, bijvoorbeeld AsyncProjectManager.opslag
+        """
+        self.opslag = opslag
+        self.manager = TaskManager(opslag.storage)
+    
+    async def maak_taak_aan(self, project: Project, titel: str, beschrijving: Optional[str] = None,
+                            prioriteit_str: str = "normaal") -> Tuple[bool, str, Optional[Task]]:
+        """Maak een nieuwe taak aan, zie TaskManager.maak_taak_aan"""
+        async with self.opslag.project_lock(project.naam):
+            return await self.opslag.voer_uit(self.manager.maak_taak_aan, project, titel,
+                                              beschrijving, prioriteit_str)
+    
+    async def maak_taken_aan_bulk(self, project: Project, rijen: Iterable[Mapping[str, Any]],
+                                  alles_of_niets: bool = False
+                                  ) -> Tuple[bool, str, List[Tuple[bool, str, Optional[Task]]]]:
+        """Maak meerdere taken in een keer aan, zie TaskManager.maak_taken_aan_bulk"""
+        async with self.opslag.project_lock(project.naam):
+            return await self.opslag.voer_uit(self.manager.maak_taken_aan_bulk, project, rijen,
+                                              alles_of_niets)
+    
+    def zoek_taak(self, project: Project, titel: str) -> Optional[Task]:
+        """Zoek een taak in een project op titel; leest niet van schijf"""
+        return self.manager.zoek_taak(project, titel)
+    
+    async def wijzig_taakstatus(self, project: Project, taaktitel: str,
+                                nieuwe_status_str: str) -> Tuple[bool, str]:
+        """Wijzig de status van een taak, zie TaskManager.wijzig_taakstatus"""
+        async with self.opslag.project_lock(project.naam):
+            return await self.opslag.voer_uit(self.manager.wijzig_taakstatus, project, taaktitel,
+                                              nieuwe_status_str)
+    
+    async def verwijder_taak(self, project: Project, taaktitel: str) -> Tuple[bool, str]:
+        """Verwijder een taak uit een project, zie TaskManager.verwijder_taak"""
+        async with self.opslag.project_lock(project.naam):
+            return await self.opslag.voer_uit(self.manager.verwijder_taak, project, taaktitel)
+    
+    def toon_takenlijst(self, project: Project) -> str:
+        """Toon een overzicht van alle taken in een project; leest niet van schijf"""
+        return self.manager.toon_takenlijst(project)
+    
+    def toon_taakdetails(self, project: Project, taaktitel: str) -> str:
+        """Toon gedetailleerde informatie over een taak; leest niet van schijf"""
+        return self.manager.toon_taakdetails(project, taaktitel)
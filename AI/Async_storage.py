@@ -0,0 +1,100 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+from Models import Project, Task, ProjectSamenvatting, naam_sleutel
+
+
+class AsyncStorage:
+    """
+    Asyncio-variant van de opslag.
+    
+    Wordt om een StorageManager, SqliteStorageManager of UitgesteldeStorage
+    heen gezet en heeft dezelfde methodes, maar dan als coroutines. Het
+    eigenlijke schijfwerk draait in een threadpool, zodat de event loop
+    niet blokkeert; een semafoor begrenst hoeveel operaties tegelijk lopen.
+    
+    Operaties op hetzelfde project moeten na elkaar lopen; gebruik daarvoor
+    project_lock(). De async managers doen dat zelf.
+    """
+    
+    def __init__(self, storage, max_gelijktijdig: int = 4):
+        """
+        Args:
+            storage: De onderliggende (synchrone) opslag
+            max_gelijktijdig: Maximaal aantal operaties dat tegelijk op
+                schijf mag werken
+        """
+        self.storage = storage
+        self.max_gelijktijdig = max_gelijktijdig
+        self._executor = ThreadPoolExecutor(max_workers=max_gelijktijdig,
+                                            thread_name_prefix="opslag")
+        self._semafoor: Optional[asyncio.Semaphore] = None
+        # Een lock per project op naam_sleutel
+        self._project_locks: Dict[str, asyncio.Lock] = {}
+    
+    def project_lock(self, naam: str) -> asyncio.Lock:
+        """Geef de lock waarmee operaties op een project na elkaar lopen"""
+        sleutel = naam_sleutel(naam)
+        if sleutel not in self._project_locks:
+            self._project_locks[sleutel] = asyncio.Lock()
+        return self._project_locks[sleutel]
+    
+    async def voer_uit(self, functie: Callable, *args, **kwargs) -> Any:
+        """
+        Voer een blokkerende functie uit in de threadpool.
+        
+        Wacht eerst tot er minder dan max_gelijktijdig operaties lopen.
+        """
+        # De semafoor hoort bij de event loop en wordt daarom pas hier gemaakt
+        if self._semafoor is None:
+            self._semafoor = asyncio.Semaphore(self.max_gelijktijdig)
+        
+        async with self._semafoor:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(functie, *args, **kwargs))
+    
+    async def sla_project_op(self, project: Project) -> bool:
+        """Sla een project op"""
+        return await self.voer_uit(self.storage.sla_project_op, project)
+    
+    async def sla_taakwijziging_op(self, project: Project, actie: str, taak: Task) -> bool:
+        """Sla een enkele taakwijziging op"""
+        return await self.voer_uit(self.storage.sla_taakwijziging_op, project, actie, taak)
+    
+    async def laad_project(self, project_naam: str) -> Optional[Project]:
+        """Laad een project"""
+        return await self.voer_uit(self.storage.laad_project, project_naam)
+    
+    async def laad_alle_projecten(self, werkers: Optional[int] = None) -> List[Project]:
+        """Laad alle projecten"""
+        return await self.voer_uit(self.storage.laad_alle_projecten, werkers)
+    
+    async def laad_catalogus(self) -> List[ProjectSamenvatting]:
+        """Geef een lichte samenvatting van alle projecten"""
+        return await self.voer_uit(self.storage.laad_catalogus)
+    
+    async def sla_catalogus_op(self) -> bool:
+        """Schrijf de catalogus weg"""
+        return await self.voer_uit(self.storage.sla_catalogus_op)
+    
+    async def verwijder_project(self, project_naam: str) -> bool:
+        """Verwijder een project"""
+        return await self.voer_uit(self.storage.verwijder_project, project_naam)
+    
+    async def project_bestaat(self, project_naam: str) -> bool:
+        """Controleer of een project bestaat"""
+        return await self.voer_uit(self.storage.project_bestaat, project_naam)
+    
+    async def list_projectmappen(self) -> List[str]:
+        """Geef alle projectnamen"""
+        return await self.voer_uit(self.storage.list_projectmappen)
+    
+    async def flush(self) -> bool:
+        """Schrijf alles weg wat nog in het geheugen staat"""
+        return await self.voer_uit(self.storage.flush)
+    
+    async def sluit(self):
+        """Sluit de onderliggende opslag en stop de threadpool"""
+        await self.voer_uit(self.storage.sluit)
+        self._executor.shutdown(wait=True)
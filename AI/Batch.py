@@ -0,0 +1,221 @@
+import json
+import shlex
+import sys
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+from Models import Task
+from Project_manager import ProjectManager
+from Task_manager import TaskManager
+from Storage import StorageManager
+from Write_behind import UitgesteldeStorage
+
+
+HULPTEKST = """Commando's (een per regel, argumenten met spaties tussen aanhalingstekens):
+  project-aanmaken <naam> [beschrijving]
+  project-sluiten <naam>
+  project-verwijderen <naam>
+  projecten
+  taak-aanmaken <project> <titel> [beschrijving] [prioriteit]
+  status <project> <titel> <nieuwe status>
+  taken <project>
+  taakdetails <project> <titel>
+  taak-verwijderen <project> <titel>
+Lege regels en regels die met # beginnen worden overgeslagen."""
+
+
+def taak_naar_dict(taak: Task) -> Dict[str, Any]:
+    """Zet een taak om naar een dictionary voor uitvoer"""
+    return {
+        'titel': taak.titel,
+        'beschrijving': taak.beschrijving,
+        'prioriteit': taak.prioriteit.value,
+        'status': taak.status.value,
+        'aanmaakdatum': taak.aanmaakdatum.isoformat(),
+        'afrondmoment': taak.afrondmoment.isoformat() if taak.afrondmoment else None
+    }
+
+
+class BatchVerwerker:
+    """
+    Voert commando's uit tegen ProjectManager en TaskManager zonder het
+    scherm te wissen of om invoer te vragen.
+    
+    Elk commando levert een resultaat op als dictionary met de sleutels
+    'succes', 'bericht' en eventueel 'data'.
+    """
+    
+    def __init__(self, project_manager: ProjectManager, task_manager: TaskManager):
+        self.project_manager = project_manager
+        self.task_manager = task_manager
+        
+        # Commando -> (functie, minimum en maximum aantal argumenten)
+        self.commandos: Dict[str, Tuple[Callable, int, int]] = {
+            'project-aanmaken': (self._project_aanmaken, 1, 2),
+            'project-sluiten': (self._project_sluiten, 1, 1),
+            'project-verwijderen': (self._project_verwijderen, 1, 1),
+            'projecten': (self._projecten, 0, 0),
+            'taak-aanmaken': (self._taak_aanmaken, 2, 4),
+            'status': (self._status, 3, 3),
+            'taken': (self._taken, 1, 1),
+            'taakdetails': (self._taakdetails, 2, 2),
+            'taak-verwijderen': (self._taak_verwijderen, 2, 2),
+        }
+    
+    def voer_uit(self, regel: str) -> Optional[Dict[str, Any]]:
+        """
+        Voer een enkele commandoregel uit.
+        
+        Args:
+            regel: De commandoregel
+        
+        Returns:
+            Het resultaat, of None voor een lege regel of commentaar
+        """
+        regel = regel.strip()
+        if not regel or regel.startswith('#'):
+            return None
+        
+        try:
+            delen = shlex.split(regel)
+        except ValueError as e:
+            return {'commando': regel, 'succes': False, 'bericht': f"Ongeldige regel: {e}"}
+        
+        commando, argumenten = delen[0].lower(), delen[1:]
+        
+        if commando not in self.commandos:
+            return {'commando': commando, 'succes': False,
+                    'bericht': f"Onbekend commando '{commando}'"}
+        
+        functie, minimum, maximum = self.commandos[commando]
+        if not minimum <= len(argumenten) <= maximum:
+            return {'commando': commando, 'succes': False,
+                    'bericht': f"'{commando}' verwacht {minimum} tot {maximum} argumenten"}
+        
+        resultaat = functie(*argumenten)
+        resultaat['commando'] = commando
+        return resultaat
+    
+    def verwerk(self, regels: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Voer alle commandoregels uit.
+        
+        Returns:
+            Een generator van resultaten, met het regelnummer erbij
+        """
+        for nummer, regel in enumerate(regels, start=1):
+            resultaat = self.voer_uit(regel)
+            if resultaat is not None:
+                resultaat['regel'] = nummer
+                yield resultaat
+    
+    def _resultaat(self, succes: bool, bericht: str, data: Any = None) -> Dict[str, Any]:
+        """Bouw een resultaat op"""
+        resultaat = {'succes': succes, 'bericht': bericht}
+        if data is not None:
+            resultaat['data'] = data
+        return resultaat
+    
+    def _zoek_project(self, projectnaam: str):
+        """Zoek een project, of geef een foutresultaat"""
+        project = self.project_manager.zoek_project(projectnaam)
+        if not project:
+            return None, self._resultaat(False, f"Project '{projectnaam}' niet gevonden")
+        return project, None
+    
+    def _project_aanmaken(self, naam: str, beschrijving: Optional[str] = None):
+        succes, bericht, project = self.project_manager.maak_project_aan(naam, beschrijving)
+        return self._resultaat(succes, bericht)
+    
+    def _project_sluiten(self, naam: str):
+        return self._resultaat(*self.project_manager.sluit_project(naam))
+    
+    def _project_verwijderen(self, naam: str):
+        return self._resultaat(*self.project_manager.verwijder_project(naam))
+    
+    def _projecten(self):
+        data = [
+            {
+                'naam': s.naam,
+                'status': s.status.value,
+                'aantal_taken': s.aantal_taken,
+                'per_status': {status.value: aantal for status, aantal in s.aantal_per_status.items()}
+            }
+            for s in self.project_manager.haal_samenvattingen_op()
+        ]
+        return self._resultaat(True, f"{len(data)} project(en)", data)
+    
+    def _taak_aanmaken(self, projectnaam: str, titel: str, beschrijving: Optional[str] = None,
+                       prioriteit: str = "normaal"):
+        project, fout = self._zoek_project(projectnaam)
+        if fout:
+            return fout
+        
+        succes, bericht, taak = self.task_manager.maak_taak_aan(
+            project, titel, beschrijving or None, prioriteit
+        )
+        return self._resultaat(succes, bericht)
+    
+    def _status(self, projectnaam: str, titel: str, nieuwe_status: str):
+        project, fout = self._zoek_project(projectnaam)
+        if fout:
+            return fout
+        
+        return self._resultaat(*self.task_manager.wijzig_taakstatus(project, titel, nieuwe_status))
+    
+    def _taken(self, projectnaam: str):
+        project, fout = self._zoek_project(projectnaam)
+        if fout:
+            return fout
+        
+        data = [taak_naar_dict(taak) for taak in project.tasks]
+        return self._resultaat(True, f"{len(data)} taak/taken", data)
+    
+    def _taakdetails(self, projectnaam: str, titel: str):
+        project, fout = self._zoek_project(projectnaam)
+        if fout:
+            return fout
+        
+        taak = self.task_manager.zoek_taak(project, titel)
+        if not taak:
+            return self._resultaat(False, f"Taak '{titel}' niet gevonden")
+        
+        return self._resultaat(True, f"Taak '{taak.titel}'", taak_naar_dict(taak))
+    
+    def _taak_verwijderen(self, projectnaam: str, titel: str):
+        project, fout = self._zoek_project(projectnaam)
+        if fout:
+            return fout
+        
+        return self._resultaat(*self.task_manager.verwijder_taak(project, titel))
+
+
+def voer_batch_uit(bron: str, storage=None) -> int:
+    """
+    Voer een batchbestand uit en schrijf de resultaten als JSON-regels naar stdout.
+    
+    Wijzigingen worden in het geheugen verzameld en aan het einde in een
+    keer weggeschreven, zodat elk gewijzigd project maar een keer
+    opgeslagen wordt.
+    
+    Args:
+        bron: Pad naar het bestand met commando's, of '-' voor stdin
+        storage: De onderliggende opslag, standaard een StorageManager
+    
+    Returns:
+        0 als alle commando's geslaagd zijn, anders 1
+    """
+    opslag = UitgesteldeStorage(storage or StorageManager(), achtergrond=False)
+    verwerker = BatchVerwerker(ProjectManager(opslag), TaskManager(opslag))
+    
+    invoer = sys.stdin if bron == '-' else open(bron, 'r', encoding='utf-8')
+    alles_gelukt = True
+    
+    try:
+        for resultaat in verwerker.verwerk(invoer):
+            alles_gelukt = alles_gelukt and resultaat['succes']
+            sys.stdout.write(json.dumps(resultaat, ensure_ascii=False) + '\n')
+    finally:
+        if invoer is not sys.stdin:
+            invoer.close()
+        opslag.sluit()
+    
+    return 0 if alles_gelukt else 1
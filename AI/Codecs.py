@@ -0,0 +1,71 @@
+import json
+from typing import Any, Dict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JsonCodec:
+    """Leesbare JSON met inspringing, zoals de oorspronkelijke bestanden"""
+    
+    naam = "json"
+    
+    def encodeer(self, data: Any) -> bytes:
+        return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    
+    def decodeer(self, inhoud: bytes) -> Any:
+        return json.loads(inhoud)
+
+
+class CompacteJsonCodec(JsonCodec):
+    """JSON zonder inspringing en spaties, ongeveer half zo groot"""
+    
+    naam = "json-compact"
+    
+    def encodeer(self, data: Any) -> bytes:
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class OrjsonCodec(JsonCodec):
+    """Compacte JSON via orjson, alleen beschikbaar als orjson geïnstalleerd is"""
+    
+    naam = "orjson"
+    
+    def encodeer(self, data: Any) -> bytes:
+        return orjson.dumps(data)
+    
+    def decodeer(self, inhoud: bytes) -> Any:
+        return orjson.loads(inhoud)
+
+
+CODECS: Dict[str, type] = {
+    JsonCodec.naam: JsonCodec,
+    CompacteJsonCodec.naam: CompacteJsonCodec,
+    OrjsonCodec.naam: OrjsonCodec,
+}
+
+
+def kies_codec(naam: str = "snel") -> JsonCodec:
+    """
+    Geef een codec op naam.
+    
+    'snel' kiest orjson als dat geïnstalleerd is en anders compacte JSON.
+    Ook als 'orjson' gevraagd wordt maar niet geïnstalleerd is, wordt
+    teruggevallen op compacte JSON. Alle codecs schrijven gewone JSON, dus
+    bestanden van de ene codec zijn met de andere te lezen.
+    
+    Args:
+        naam: 'json', 'json-compact', 'orjson' of 'snel'
+    
+    Returns:
+        Een codec object met encodeer() en decodeer()
+    """
+    if naam in ("snel", OrjsonCodec.naam):
+        return OrjsonCodec() if orjson else CompacteJsonCodec()
+    
+    if naam not in CODECS:
+        raise ValueError(f"Onbekende codec '{naam}', kies uit: snel, {', '.join(CODECS)}")
+    
+    return CODECS[naam]()
@@ -1,20 +1,44 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import argparse
+import sys
+from typing import Optional
+
+from Batch import HULPTEKST, voer_batch_uit
+from Server import HULPTEKST as SERVER_HULPTEKST, start_server
 from Project_manager import ProjectManager
 from Task_manager import TaskManager
 from Storage import StorageManager
+from Write_behind import UitgesteldeStorage
+from Metingen import instrumenteer
 from Utils import (toon_menu, lees_invoer, lees_keuzecijfer, lees_ja_nee,
-                  toon_bericht, wacht_op_enter, wis_scherm)
+                  toon_bericht, toon_paginas, wacht_op_enter, wis_scherm)
 
 
 class TaskManagementApp:
     """Hoofd applicatie voor project & task management"""
     
-    def __init__(self):
-        self.storage_manager = StorageManager()
+    def __init__(self, storage_manager=None, schrijf_uitgesteld: bool = False,
+                 metingen: bool = False, ververs_interval: Optional[float] = None):
+        # Standaard JSON-opslag, of bijvoorbeeld een SqliteStorageManager
+        self.storage_manager = storage_manager or StorageManager()
+        
+        # Schrijf wijzigingen optioneel op de achtergrond weg
+        if schrijf_uitgesteld:
+            self.storage_manager = UitgesteldeStorage(self.storage_manager)
+        
         self.project_manager = ProjectManager(self.storage_manager)
         self.task_manager = TaskManager(self.storage_manager)
+        
+        # Neem optioneel wijzigingen van andere processen over
+        if ververs_interval:
+            self.project_manager.start_verversen(ververs_interval)
+        
+        # Meet optioneel alle aanroepen; zonder metingen wordt niets omhuld
+        self.instrumentatie = (
+            instrumenteer(self.project_manager, self.task_manager) if metingen else None
+        )
     
     def menu_project_aanmaken(self):
         """Menu: Nieuw project aanmaken"""
@@ -38,7 +62,7 @@ class TaskManagementApp:
     
     def menu_projectoverzicht(self):
         """Menu: Projectoverzicht weergeven"""
-        print(self.project_manager.toon_projectoverzicht())
+        toon_paginas(self.project_manager.projectoverzicht_paginas())
         wacht_op_enter()
     
     def menu_project_sluiten(self):
@@ -169,7 +193,7 @@ class TaskManagementApp:
             wacht_op_enter()
             return
         
-        print(self.task_manager.toon_takenlijst(project))
+        toon_paginas(self.task_manager.takenlijst_paginas(project))
         wacht_op_enter()
     
     def menu_taakdetails_weergeven(self):
@@ -219,13 +243,61 @@ class TaskManagementApp:
         
         wacht_op_enter()
     
+    def menu_taken_zoeken(self):
+        """Menu: Taken zoeken op woorden in titel of beschrijving"""
+        print("\n=== TAKEN ZOEKEN ===")
+        
+        zoekterm = lees_invoer("Zoekwoorden")
+        if not zoekterm:
+            toon_bericht("Zoekwoorden zijn verplicht", "fout")
+            wacht_op_enter()
+            return
+        
+        prefix = lees_ja_nee("Ook woorden die met de zoekwoorden beginnen?")
+        resultaten = self.project_manager.zoek_tekst(zoekterm, prefix, maximum=100)
+        
+        # 20 resultaten per pagina, de kop alleen op de eerste
+        regels = list(self.project_manager.zoekresultaat_regels(resultaten))
+        paginas = ("".join(regels[begin:begin + 20]) for begin in range(0, len(regels), 20))
+        toon_paginas(paginas)
+        wacht_op_enter()
+    
+    def menu_metingen(self):
+        """Menu: Metingen bekijken en exporteren"""
+        metingen = self.instrumentatie.metingen
+        toon_paginas(["".join(metingen.overzicht_regels())])
+        
+        if lees_ja_nee("Metingen exporteren?"):
+            bestand = lees_invoer("Bestandsnaam (.json voor JSON, anders Prometheus-tekst)")
+            if bestand:
+                inhoud = metingen.naar_json() if bestand.endswith('.json') else metingen.naar_prometheus()
+                try:
+                    with open(bestand, 'w', encoding='utf-8') as f:
+                        f.write(inhoud)
+                    toon_bericht(f"Metingen geschreven naar {bestand}", "succes")
+                except OSError as e:
+                    toon_bericht(f"Kon metingen niet schrijven: {e}", "fout")
+        
+        if lees_ja_nee("Metingen op nul zetten?"):
+            metingen.reset()
+        
+        wacht_op_enter()
+    
     def run(self):
         """Hoofd applicatielus"""
+        try:
+            self._menulus()
+        finally:
+            # Schrijf openstaande wijzigingen weg, ook bij Ctrl+C
+            self.storage_manager.sluit()
+    
+    def _menulus(self):
+        """Toon het menu en voer keuzes uit tot de gebruiker afsluit"""
         while True:
             wis_scherm()
-            toon_menu()
+            toon_menu(self.instrumentatie is not None)
             
-            keuze = lees_keuzecijfer("Maak een keuze", 0, 9)
+            keuze = lees_keuzecijfer("Maak een keuze", 0, 11 if self.instrumentatie else 10)
             
             if keuze == 0:
                 toon_bericht("Tot ziens!", "succes")
@@ -248,11 +320,47 @@ class TaskManagementApp:
                 self.menu_taakdetails_weergeven()
             elif keuze == 9:
                 self.menu_taak_verwijderen()
+            elif keuze == 10:
+                self.menu_taken_zoeken()
+            elif keuze == 11:
+                self.menu_metingen()
 
 
 def main():
     """Main entry point"""
-    app = TaskManagementApp()
+    parser = argparse.ArgumentParser(
+        description="Project & task management",
+        epilog=HULPTEKST + "\n\n" + SERVER_HULPTEKST,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--batch", metavar="BESTAND",
+                        help="voer commando's uit een bestand uit ('-' voor stdin) "
+                             "en schrijf de resultaten als JSON-regels")
+    parser.add_argument("--server", action="store_true",
+                        help="start een HTTP/JSON-server die de projecten in het geheugen houdt")
+    parser.add_argument("--host", default="127.0.0.1", help="adres voor --server (standaard 127.0.0.1)")
+    parser.add_argument("--poort", type=int, default=8080, help="poort voor --server (standaard 8080)")
+    parser.add_argument("--werkers", type=int, default=8,
+                        help="aantal threads voor --server; een open verbinding houdt er een bezet "
+                             "(standaard 8)")
+    parser.add_argument("--laad-werkers", type=int, default=1, metavar="AANTAL",
+                        help="aantal threads voor het laden van alle projecten, bijvoorbeeld bij "
+                             "het starten van --server; helpt op trage of netwerkschijven (standaard 1)")
+    parser.add_argument("--metingen", action="store_true",
+                        help="meet aanroepen van managers en opslag; te bekijken via het menu")
+    parser.add_argument("--ververs", type=float, metavar="SECONDEN",
+                        help="controleer elke SECONDEN seconden of andere processen projecten "
+                             "gewijzigd hebben")
+    args = parser.parse_args()
+    storage = StorageManager(laad_werkers=args.laad_werkers)
+    
+    if args.batch:
+        sys.exit(voer_batch_uit(args.batch, storage))
+    
+    if args.server:
+        sys.exit(start_server(args.host, args.poort, args.werkers, storage))
+    
+    app = TaskManagementApp(storage, metingen=args.metingen, ververs_interval=args.ververs)
     app.run()
 
 
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+from Vergrendeling import Projectslot
+
+
+MANIFEST_BESTAND = 'manifest.json'
+MANIFESTVERSIE = 1
+
+
+def gespreid_pad(base_path: Path, mapnaam: str) -> Path:
+    """
+    Geef het pad van een projectmap in de gespreide indeling:
+    base_path/ab/cd/mapnaam, met ab en cd uit de SHA-1 van de mapnaam.
+    Zo komen er hooguit 256 mappen in elke tussenmap.
+    """
+    code = hashlib.sha1(mapnaam.encode('utf-8')).hexdigest()
+    return base_path / code[:2] / code[2:4] / mapnaam
+
+
+class Manifest:
+    """
+    Lijst van alle projecten in een gespreide werkruimte, van mapnaam naar
+    de echte projectnaam, in een enkel bestand.
+    
+    Het bestand wordt alleen opnieuw gelezen als het op schijf gewijzigd
+    is. Wijzigingen gebeuren onder het slot van base_path, zodat processen
+    die tegelijk projecten aanmaken elkaars toevoegingen niet overschrijven.
+    """
+    
+    def __init__(self, base_path: Path):
+        self.base_path = base_path
+        self.pad = base_path / MANIFEST_BESTAND
+        self._projecten: Dict[str, str] = {}
+        self._vingerafdruk: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def bestaat(base_path: Path) -> bool:
+        """Controleer of een werkruimte de gespreide indeling heeft"""
+        return (base_path / MANIFEST_BESTAND).exists()
+    
+    def _vingerafdruk_op_schijf(self) -> Optional[Tuple[int, int]]:
+        try:
+            status = os.stat(self.pad)
+        except FileNotFoundError:
+            return None
+        return status.st_mtime_ns, status.st_size
+    
+    def _lees(self) -> Dict[str, str]:
+        """Lees het manifest van schijf en onthoud de vingerafdruk"""
+        vingerafdruk = self._vingerafdruk_op_schijf()
+        if vingerafdruk is None:
+            projecten = {}
+        else:
+            with open(self.pad, 'rb') as f:
+                projecten = json.loads(f.read())['projecten']
+        
+        self._projecten = projecten
+        self._vingerafdruk = vingerafdruk
+        return projecten
+    
+    def projecten(self) -> Dict[str, str]:
+        """Geef alle projecten als mapnaam -> projectnaam (niet wijzigen)"""
+        with self._lock:
+            if self._vingerafdruk is None or self._vingerafdruk != self._vingerafdruk_op_schijf():
+                self._lees()
+            return self._projecten
+    
+    def _wijzig(self, wijziging: Callable[[Dict[str, str]], bool]):
+        """Pas het manifest aan en schrijf het atomisch weg, als wijziging() True geeft"""
+        with self._lock, Projectslot(self.base_path):
+            projecten = dict(self._lees())
+            if not wijziging(projecten):
+                return
+            
+            tijdelijk = self.pad.with_name(self.pad.name + '.tmp')
+            with open(tijdelijk, 'w', encoding='utf-8') as f:
+                json.dump({'formaat': MANIFESTVERSIE, 'projecten': projecten}, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tijdelijk, self.pad)
+            
+            self._projecten = projecten
+            self._vingerafdruk = self._vingerafdruk_op_schijf()
+    
+    def voeg_toe(self, mapnaam: str, naam: str):
+        """Neem een project op in het manifest"""
+        def voeg_toe(projecten: Dict[str, str]) -> bool:
+            if projecten.get(mapnaam) == naam:
+                return False
+            projecten[mapnaam] = naam
+            return True
+        
+        self._wijzig(voeg_toe)
+    
+    def voeg_meerdere_toe(self, nieuw: Dict[str, str]):
+        """Neem meerdere projecten in een keer op, bijvoorbeeld bij migratie"""
+        def voeg_toe(projecten: Dict[str, str]) -> bool:
+            projecten.update(nieuw)
+            return True
+        
+        self._wijzig(voeg_toe)
+    
+    def verwijder(self, mapnaam: str):
+        """Haal een project uit het manifest"""
+        self._wijzig(lambda projecten: projecten.pop(mapnaam, None) is not None)
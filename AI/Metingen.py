@@ -0,0 +1,353 @@
+import functools
+import inspect
+import json
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from Models import Project, Task
+import Project_manager
+import Task_manager
+
+
+# Bovengrenzen van de histogrambakken in seconden; de laatste bak is onbegrensd
+BAKGRENZEN: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Interne methodes van de opslag die ook gemeten worden, zodat te zien is
+# waar de tijd van een publieke methode heen gaat
+INTERNE_METHODES = ('_lees_project', '_schrijf_project', '_lees_bestand', '_schrijf_bestand',
+                    '_speel_journal_af')
+
+# Voorvoegsel van alle Prometheus-metrieken
+PROMETHEUS_NAAM = "taakbeheer"
+
+
+class Histogram:
+    """Aantal aanroepen, fouten en een latentiehistogram voor een methode"""
+    
+    __slots__ = ('bakken', 'aantal', 'fouten', 'totaal', 'maximum')
+    
+    def __init__(self):
+        self.bakken = [0] * (len(BAKGRENZEN) + 1)
+        self.aantal = 0
+        self.fouten = 0
+        self.totaal = 0.0
+        self.maximum = 0.0
+    
+    def voeg_toe(self, duur: float, fout: bool = False):
+        """Registreer een aanroep die duur seconden duurde"""
+        self.bakken[bisect_left(BAKGRENZEN, duur)] += 1
+        self.aantal += 1
+        self.totaal += duur
+        if duur > self.maximum:
+            self.maximum = duur
+        if fout:
+            self.fouten += 1
+    
+    def percentiel(self, p: float) -> float:
+        """Geef een bovengrens voor het p-de percentiel, op de bakgrenzen afgerond"""
+        if not self.aantal:
+            return 0.0
+        
+        nodig = self.aantal * p / 100
+        opgeteld = 0
+        for grens, aantal in zip(BAKGRENZEN, self.bakken):
+            opgeteld += aantal
+            if opgeteld >= nodig:
+                return min(grens, self.maximum)
+        return self.maximum
+    
+    def naar_dict(self) -> Dict[str, Any]:
+        return {
+            'aantal': self.aantal,
+            'fouten': self.fouten,
+            'totaal_seconden': self.totaal,
+            'maximum_seconden': self.maximum,
+            'bakken': {
+                str(grens): aantal for grens, aantal in zip(BAKGRENZEN + ('+Inf',), self.bakken)
+            }
+        }
+
+
+class Metingen:
+    """
+    Verzamelt metingen: per methode een histogram, en tellers voor gelezen
+    en geschreven bytes en aangemaakte objecten. Veilig vanuit meerdere threads.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.methodes: Dict[str, Histogram] = {}
+        self.bytes_gelezen = 0
+        self.bytes_geschreven = 0
+        # Aantal aangemaakte objecten per klassenaam
+        self.objecten: Dict[str, int] = {}
+    
+    def meet(self, methode: str, duur: float, fout: bool = False):
+        """Registreer een aanroep van een methode"""
+        with self._lock:
+            histogram = self.methodes.get(methode)
+            if histogram is None:
+                histogram = self.methodes[methode] = Histogram()
+            histogram.voeg_toe(duur, fout)
+    
+    def gelezen(self, aantal: int):
+        """Tel gelezen bytes"""
+        with self._lock:
+            self.bytes_gelezen += aantal
+    
+    def geschreven(self, aantal: int):
+        """Tel geschreven bytes"""
+        with self._lock:
+            self.bytes_geschreven += aantal
+    
+    def aangemaakt(self, klasse: str):
+        """Tel een aangemaakt object"""
+        with self._lock:
+            self.objecten[klasse] = self.objecten.get(klasse, 0) + 1
+    
+    def reset(self):
+        """Zet alle metingen op nul"""
+        with self._lock:
+            self.methodes = {}
+            self.bytes_gelezen = 0
+            self.bytes_geschreven = 0
+            self.objecten = {}
+    
+    def naar_dict(self) -> Dict[str, Any]:
+        """Alle metingen als dictionary"""
+        with self._lock:
+            return {
+                'methodes': {naam: h.naar_dict() for naam, h in sorted(self.methodes.items())},
+                'bytes_gelezen': self.bytes_gelezen,
+                'bytes_geschreven': self.bytes_geschreven,
+                'objecten_aangemaakt': dict(sorted(self.objecten.items()))
+            }
+    
+    def naar_json(self) -> str:
+        """Alle metingen als JSON"""
+        return json.dumps(self.naar_dict(), ensure_ascii=False, indent=2)
+    
+    def naar_prometheus(self) -> str:
+        """Alle metingen in het tekstformaat van Prometheus"""
+        gegevens = self.naar_dict()
+        regels = [
+            f"# HELP {PROMETHEUS_NAAM}_aanroep_seconden Duur van aanroepen per methode",
+            f"# TYPE {PROMETHEUS_NAAM}_aanroep_seconden histogram",
+        ]
+        
+        for methode, histogram in gegevens['methodes'].items():
+            opgeteld = 0
+            for grens, aantal in histogram['bakken'].items():
+                opgeteld += aantal
+                regels.append(f'{PROMETHEUS_NAAM}_aanroep_seconden_bucket'
+                              f'{{methode="{methode}",le="{grens}"}} {opgeteld}')
+            regels.append(f'{PROMETHEUS_NAAM}_aanroep_seconden_sum{{methode="{methode}"}} '
+                          f'{histogram["totaal_seconden"]}')
+            regels.append(f'{PROMETHEUS_NAAM}_aanroep_seconden_count{{methode="{methode}"}} '
+                          f'{histogram["aantal"]}')
+        
+        regels.append(f"# HELP {PROMETHEUS_NAAM}_aanroep_fouten_total Aanroepen die een uitzondering gaven")
+        regels.append(f"# TYPE {PROMETHEUS_NAAM}_aanroep_fouten_total counter")
+        for methode, histogram in gegevens['methodes'].items():
+            regels.append(f'{PROMETHEUS_NAAM}_aanroep_fouten_total{{methode="{methode}"}} '
+                          f'{histogram["fouten"]}')
+        
+        for soort in ('gelezen', 'geschreven'):
+            regels.append(f"# HELP {PROMETHEUS_NAAM}_bytes_{soort}_total Bytes {soort} door de opslag")
+            regels.append(f"# TYPE {PROMETHEUS_NAAM}_bytes_{soort}_total counter")
+            regels.append(f"{PROMETHEUS_NAAM}_bytes_{soort}_total {gegevens['bytes_' + soort]}")
+        
+        regels.append(f"# HELP {PROMETHEUS_NAAM}_objecten_aangemaakt_total Aangemaakte objecten per klasse")
+        regels.append(f"# TYPE {PROMETHEUS_NAAM}_objecten_aangemaakt_total counter")
+        for klasse, aantal in gegevens['objecten_aangemaakt'].items():
+            regels.append(f'{PROMETHEUS_NAAM}_objecten_aangemaakt_total{{klasse="{klasse}"}} {aantal}')
+        
+        return "\n".join(regels) + "\n"
+    
+    def overzicht_regels(self) -> Iterator[str]:
+        """Geef een leesbaar overzicht, regel voor regel"""
+        gegevens = self.naar_dict()
+        
+        yield "\n=== METINGEN ===\n"
+        yield (f"{'Methode':<44} {'Aantal':>8} {'Fout':>5} {'Totaal ms':>10} "
+               f"{'Gem ms':>8} {'p99 ms':>8} {'Max ms':>8}\n")
+        yield "-" * 97 + "\n"
+        
+        with self._lock:
+            methodes = sorted(self.methodes.items(), key=lambda item: item[1].totaal, reverse=True)
+            rijen = [
+                (naam, h.aantal, h.fouten, h.totaal, h.totaal / h.aantal, h.percentiel(99), h.maximum)
+                for naam, h in methodes
+            ]
+        
+        for naam, aantal, fouten, totaal, gemiddeld, p99, maximum in rijen:
+            yield (f"{naam:<44} {aantal:>8} {fouten:>5} {totaal * 1000:>10.2f} "
+                   f"{gemiddeld * 1000:>8.3f} {p99 * 1000:>8.3f} {maximum * 1000:>8.3f}\n")
+        
+        if not rijen:
+            yield "Nog geen aanroepen gemeten.\n"
+        
+        yield "-" * 97 + "\n"
+        yield f"Bytes gelezen: {gegevens['bytes_gelezen']}, geschreven: {gegevens['bytes_geschreven']}\n"
+        objecten = ", ".join(f"{klasse}: {aantal}" for klasse, aantal in gegevens['objecten_aangemaakt'].items())
+        yield f"Objecten aangemaakt: {objecten or 'geen'}\n"
+
+
+class Instrumentatie:
+    """
+    Omhult methodes en functies zodat elke aanroep gemeten wordt.
+    
+    Niets wordt gemeten tot er iets omhuld is, zodat uitgeschakelde
+    metingen niets kosten. verwijder() herstelt alle oorspronkelijke
+    methodes en functies. Generatorfuncties worden niet omhuld, omdat
+    de tijd van de aanroeper dan meetelt.
+    """
+    
+    def __init__(self, metingen: Optional[Metingen] = None):
+        self.metingen = metingen or Metingen()
+        # (houder, naam, oorspronkelijke waarde of None als het een instantieattribuut was)
+        self._omhuld: List[Tuple[Any, str, Any]] = []
+        self._opslag: List[Any] = []
+    
+    def _meet(self, functie: Callable, methode: str) -> Callable:
+        """Geef een versie van functie die elke aanroep meet"""
+        meet = self.metingen.meet
+        
+        @functools.wraps(functie)
+        def gemeten(*args, **kwargs):
+            begin = time.perf_counter()
+            fout = True
+            try:
+                resultaat = functie(*args, **kwargs)
+                fout = False
+                return resultaat
+            finally:
+                meet(methode, time.perf_counter() - begin, fout)
+        
+        return gemeten
+    
+    def omhul_methodes(self, obj: Any, voorvoegsel: str, namen: Optional[List[str]] = None):
+        """
+        Meet de publieke methodes van een object, alleen voor dit object.
+        
+        Args:
+            obj: Het object
+            voorvoegsel: Voorvoegsel van de metrieknamen, bijvoorbeeld 'opslag'
+            namen: De methodes, standaard alle publieke methodes van de klasse
+        """
+        if namen is None:
+            namen = [
+                naam for naam, waarde in inspect.getmembers(type(obj), inspect.isfunction)
+                if not naam.startswith('_')
+            ]
+        
+        for naam in namen:
+            methode = getattr(obj, naam)
+            if inspect.isgeneratorfunction(methode):
+                continue
+            setattr(obj, naam, self._meet(methode, f"{voorvoegsel}.{naam}"))
+            self._omhuld.append((obj, naam, None))
+    
+    def omhul_functie(self, module: Any, naam: str, voorvoegsel: str):
+        """Meet een functie op moduleniveau, zoals een validator die een manager importeert"""
+        functie = getattr(module, naam)
+        setattr(module, naam, self._meet(functie, f"{voorvoegsel}.{naam}"))
+        self._omhuld.append((module, naam, functie))
+    
+    def tel_objecten(self, klasse: type):
+        """Tel aangemaakte objecten van een klasse, via __init__ en uit_opslag()"""
+        aangemaakt = self.metingen.aangemaakt
+        klassenaam = klasse.__name__
+        init = klasse.__dict__['__init__']
+        
+        @functools.wraps(init)
+        def geteld_init(obj, *args, **kwargs):
+            aangemaakt(klassenaam)
+            init(obj, *args, **kwargs)
+        
+        klasse.__init__ = geteld_init
+        self._omhuld.append((klasse, '__init__', init))
+        
+        # Taken uit de opslag worden zonder __init__ gemaakt
+        if 'uit_opslag' in klasse.__dict__:
+            uit_opslag = klasse.__dict__['uit_opslag']
+            
+            @functools.wraps(uit_opslag.__func__)
+            def geteld_uit_opslag(cls, *args, **kwargs):
+                aangemaakt(klassenaam)
+                return uit_opslag.__func__(cls, *args, **kwargs)
+            
+            klasse.uit_opslag = classmethod(geteld_uit_opslag)
+            self._omhuld.append((klasse, 'uit_opslag', uit_opslag))
+    
+    def omhul_opslag(self, opslag: Any):
+        """
+        Meet een opslag, de opslag die erin zit (bij UitgesteldeStorage) en
+        de codec, en laat de opslag gelezen en geschreven bytes tellen.
+        """
+        while opslag is not None:
+            voorvoegsel = type(opslag).__name__
+            self.omhul_methodes(opslag, voorvoegsel)
+            self.omhul_methodes(opslag, voorvoegsel,
+                                [naam for naam in INTERNE_METHODES if hasattr(type(opslag), naam)])
+            
+            # Via vars(): UitgesteldeStorage geeft onbekende attributen door aan
+            # de opslag die erin zit, en die komt hieronder zelf nog aan de beurt
+            if 'metingen' in vars(opslag):
+                opslag.metingen = self.metingen
+                self._opslag.append(opslag)
+            
+            codec = vars(opslag).get('codec')
+            if codec is not None:
+                self.omhul_methodes(codec, f"{voorvoegsel}.codec", ['encodeer', 'decodeer'])
+            
+            opslag = vars(opslag).get('storage')
+    
+    def verwijder(self):
+        """Herstel alle omhulde methodes en functies"""
+        for houder, naam, oorspronkelijk in reversed(self._omhuld):
+            if oorspronkelijk is None:
+                delattr(houder, naam)
+            else:
+                setattr(houder, naam, oorspronkelijk)
+        self._omhuld = []
+        
+        for opslag in self._opslag:
+            opslag.metingen = None
+        self._opslag = []
+
+
+def instrumenteer(project_manager, task_manager, metingen: Optional[Metingen] = None) -> Instrumentatie:
+    """
+    Meet de managers, hun opslag, de validators en het aanmaken van
+    projecten en taken.
+    
+    Args:
+        project_manager: De ProjectManager
+        task_manager: De TaskManager; deelt normaal de opslag met project_manager
+        metingen: Waar de metingen heen gaan, standaard een nieuwe Metingen
+    
+    Returns:
+        De Instrumentatie; roep verwijder() aan om de metingen te stoppen
+    """
+    instrumentatie = Instrumentatie(metingen)
+    
+    instrumentatie.omhul_methodes(project_manager, "ProjectManager")
+    instrumentatie.omhul_methodes(task_manager, "TaskManager")
+    instrumentatie.omhul_opslag(project_manager.storage)
+    if task_manager.storage is not project_manager.storage:
+        instrumentatie.omhul_opslag(task_manager.storage)
+    
+    for naam in ('valideer_projectnaam', 'valideer_projectsluitng'):
+        instrumentatie.omhul_functie(Project_manager, naam, "Validators")
+    for naam in ('valideer_taaktitel', 'valideer_prioriteit'):
+        instrumentatie.omhul_functie(Task_manager, naam, "Validators")
+    
+    instrumentatie.tel_objecten(Project)
+    instrumentatie.tel_objecten(Task)
+    
+    return instrumentatie
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Zet een bestaande projects/ map om naar het huidige bestandsformaat.
+
+Gebruik: python Migreer.py [--pad projects] [--codec snel] [--gespreid] [--archiveer]
+"""
+
+import argparse
+
+from Codecs import CODECS
+from Storage import StorageManager
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Herschrijf alle projecten in het huidige formaat")
+    parser.add_argument("--pad", default="projects", help="map met de projecten")
+    parser.add_argument("--codec", default="snel", choices=["snel", *CODECS],
+                        help="codec voor de herschreven bestanden")
+    parser.add_argument("--gespreid", action="store_true",
+                        help="zet de werkruimte eerst om naar de gespreide indeling met een manifest")
+    parser.add_argument("--archiveer", action="store_true",
+                        help="verplaats daarna alle gesloten projecten naar het gecomprimeerde archief")
+    args = parser.parse_args()
+    
+    storage = StorageManager(args.pad, codec=args.codec)
+    
+    if args.gespreid and not storage.gespreid:
+        verplaatst = storage.migreer_naar_gespreid()
+        print(f"{verplaatst} project(en) verplaatst naar de gespreide indeling")
+    
+    aantal = storage.migreer()
+    
+    print(f"{aantal} project(en) herschreven met codec '{storage.codec.naam}'")
+    for mapnaam, fout in storage.laadfouten.items():
+        print(f"  Overgeslagen: {mapnaam} ({fout})")
+    
+    if args.archiveer:
+        print(f"{storage.archiveer_gesloten()} gesloten project(en) gearchiveerd")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
-from datetime import datetime
-from typing import Optional, List
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional, List, Tuple
 from enum import Enum
+from Zoekindex import Zoekindex
 
 
 class TaskPriority(Enum):
@@ -23,17 +25,200 @@ class ProjectStatus(Enum):
     GESLOTEN = "gesloten"
 
 
+# Compacte opslag: prioriteit en status als klein getal, tijdstippen als
+# aantal microseconden sinds 1970 (naïeve lokale tijd, zoals datetime.now())
+_PRIORITEITEN = tuple(TaskPriority)
+_PRIORITEIT_NUMMERS = {prioriteit: nummer for nummer, prioriteit in enumerate(_PRIORITEITEN)}
+_STATUSSEN = tuple(TaskStatus)
+_STATUS_NUMMERS = {status: nummer for nummer, status in enumerate(_STATUSSEN)}
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECONDE = timedelta(microseconds=1)
+
+
+def naam_sleutel(naam: str) -> str:
+    """Geef de hoofdletterongevoelige sleutel voor een project- of taaknaam"""
+    return naam.casefold()
+
+
+def _naar_epoch(moment: datetime) -> int:
+    """Zet een tijdstip om naar microseconden sinds 1970"""
+    return (moment - _EPOCH) // _MICROSECONDE
+
+
+def _van_epoch(microseconden: int) -> datetime:
+    """Zet microseconden sinds 1970 om naar een tijdstip"""
+    return _EPOCH + timedelta(microseconds=microseconden)
+
+
 class Task:
-    """Representatie van een taak"""
+    """
+    Representatie van een taak.
+    
+    Gebruikt __slots__ en slaat prioriteit, status en tijdstippen intern als
+    gehele getallen op, zodat miljoenen taken weinig geheugen kosten. Naar
+    buiten toe gedragen de attributen zich als enums en datetimes.
+    """
+    
+    __slots__ = ('project', 'gewijzigd', '_titel', '_beschrijving', '_prioriteit',
+                 '_status', '_aanmaakdatum', '_afrondmoment')
     
     def __init__(self, titel: str, beschrijving: Optional[str] = None, 
                  prioriteit: TaskPriority = TaskPriority.NORMAAL):
-        self.titel = titel
-        self.beschrijving = beschrijving
-        self.prioriteit = prioriteit
-        self.status = TaskStatus.NIEUW
-        self.aanmaakdatum = datetime.now()
-        self.afrondmoment: Optional[datetime] = None
+        # Het project waartoe de taak behoort, gezet door Project
+        self.project: Optional["Project"] = None
+        self.gewijzigd = True
+        self._titel = titel
+        self._beschrijving = beschrijving
+        self._prioriteit = _PRIORITEIT_NUMMERS[prioriteit]
+        self._status = _STATUS_NUMMERS[TaskStatus.NIEUW]
+        self._aanmaakdatum = _naar_epoch(datetime.now())
+        self._afrondmoment: Optional[int] = None
+    
+    def _markeer_gewijzigd(self):
+        """Markeer de taak, en daarmee de taken van het project, als gewijzigd"""
+        if self.gewijzigd:
+            return
+        
+        project = self.project
+        if not project:
+            self.gewijzigd = True
+            return
+        
+        # Onder het slot van het project, zodat een opslag die tegelijk de
+        # wijzigingen overneemt deze taak niet mist
+        with project._wijzigingen_lock:
+            if not self.gewijzigd:
+                self.gewijzigd = True
+                project._gewijzigde_taken.append(self)
+    
+    @property
+    def titel(self) -> str:
+        return self._titel
+    
+    @titel.setter
+    def titel(self, waarde: str):
+        oude_titel = self._titel
+        self._titel = waarde
+        self._markeer_gewijzigd()
+        
+        if self.project:
+            self.project._herindexeer_taak(self, oude_titel)
+    
+    @property
+    def beschrijving(self) -> Optional[str]:
+        return self._beschrijving
+    
+    @beschrijving.setter
+    def beschrijving(self, waarde: Optional[str]):
+        self._beschrijving = waarde
+        self._markeer_gewijzigd()
+        
+        if self.project and self.project._zoekindex is not None:
+            self.project._zoekindex.werk_bij(self)
+    
+    @property
+    def prioriteit(self) -> TaskPriority:
+        return _PRIORITEITEN[self._prioriteit]
+    
+    @prioriteit.setter
+    def prioriteit(self, waarde: TaskPriority):
+        oude_prioriteit = self._prioriteit
+        self._prioriteit = _PRIORITEIT_NUMMERS[waarde]
+        self._markeer_gewijzigd()
+        
+        if self.project:
+            self.project._verplaats_taak(self.project._prioriteit_index, self,
+                                         oude_prioriteit, self._prioriteit)
+    
+    @property
+    def status(self) -> TaskStatus:
+        return _STATUSSEN[self._status]
+    
+    @status.setter
+    def status(self, waarde: TaskStatus):
+        oude_status = self._status
+        self._status = _STATUS_NUMMERS[waarde]
+        self._markeer_gewijzigd()
+        
+        if self.project:
+            self.project._verplaats_taak(self.project._status_index, self,
+                                         oude_status, self._status)
+    
+    @property
+    def aanmaakdatum(self) -> datetime:
+        return _van_epoch(self._aanmaakdatum)
+    
+    @aanmaakdatum.setter
+    def aanmaakdatum(self, waarde: datetime):
+        self._aanmaakdatum = _naar_epoch(waarde)
+        self._markeer_gewijzigd()
+    
+    @property
+    def afrondmoment(self) -> Optional[datetime]:
+        if self._afrondmoment is None:
+            return None
+        return _van_epoch(self._afrondmoment)
+    
+    @afrondmoment.setter
+    def afrondmoment(self, waarde: Optional[datetime]):
+        self._afrondmoment = _naar_epoch(waarde) if waarde else None
+        self._markeer_gewijzigd()
+    
+    @property
+    def aanmaakdatum_epoch(self) -> int:
+        """De aanmaakdatum in microseconden sinds 1970, zonder omzetting"""
+        return self._aanmaakdatum
+    
+    @aanmaakdatum_epoch.setter
+    def aanmaakdatum_epoch(self, waarde: int):
+        self._aanmaakdatum = waarde
+        self._markeer_gewijzigd()
+    
+    @property
+    def afrondmoment_epoch(self) -> Optional[int]:
+        """Het afrondmoment in microseconden sinds 1970, zonder omzetting"""
+        return self._afrondmoment
+    
+    @afrondmoment_epoch.setter
+    def afrondmoment_epoch(self, waarde: Optional[int]):
+        self._afrondmoment = waarde
+        self._markeer_gewijzigd()
+    
+    @classmethod
+    def uit_opslag(cls, titel: str, beschrijving: Optional[str], prioriteit: int, status: int,
+                   aanmaakdatum: int, afrondmoment: Optional[int]) -> "Task":
+        """
+        Maak een ongewijzigde taak aan uit de interne waarden, zonder
+        __init__ en setters; voor snel laden uit opslag.
+        """
+        taak = cls.__new__(cls)
+        taak.project = None
+        taak.gewijzigd = False
+        taak._titel = titel
+        taak._beschrijving = beschrijving
+        taak._prioriteit = prioriteit
+        taak._status = status
+        taak._aanmaakdatum = aanmaakdatum
+        taak._afrondmoment = afrondmoment
+        return taak
+    
+    @property
+    def prioriteit_nummer(self) -> int:
+        return self._prioriteit
+    
+    @property
+    def status_nummer(self) -> int:
+        return self._status
+    
+    @staticmethod
+    def naar_epoch(moment: datetime) -> int:
+        """Zet een tijdstip om naar dezelfde schaal als aanmaakdatum_epoch"""
+        return _naar_epoch(moment)
+    
+    @staticmethod
+    def van_epoch(microseconden: int) -> datetime:
+        """Zet een waarde op de schaal van aanmaakdatum_epoch om naar een tijdstip"""
+        return _van_epoch(microseconden)
     
     def wijzig_status(self, nieuwe_status: TaskStatus) -> bool:
         """
@@ -69,10 +254,40 @@ class Task:
                 f"(Prioriteit: {self.prioriteit.value})")
 
 
+# Wijzigingen van een project die opgeslagen worden, zie Project.neem_wijzigingen():
+# (gegevens gewijzigd, gewijzigde taken, taken verwijderd)
+Wijzigingen = Tuple[bool, List[Task], bool]
+
+
 class Project:
     """Representatie van een project"""
     
+    __slots__ = ('gegevens_gewijzigd', '_gewijzigde_taken', 'taken_verwijderd', '_wijzigingen_lock',
+                 '_taak_index', '_status_index', '_prioriteit_index', '_zoekindex', 'versie', 'naam',
+                 'beschrijving', 'status', 'aanmaakdatum', 'tasks', 'sluitdatum')
+    
+    # Projectgegevens waarvan een wijziging opgeslagen moet worden
+    _GEVOLGDE_VELDEN = {'naam', 'beschrijving', 'status', 'aanmaakdatum', 'sluitdatum'}
+    
     def __init__(self, naam: str, beschrijving: Optional[str] = None):
+        # Wijzigingen sinds de laatste keer opslaan
+        self.gegevens_gewijzigd = True
+        self._gewijzigde_taken: List[Task] = []
+        self.taken_verwijderd = False
+        # Beschermt de wijzigingen hierboven tegen een opslag in een andere thread
+        self._wijzigingen_lock = threading.Lock()
+        # Taken op hoofdletterongevoelige titel
+        self._taak_index: Dict[str, Task] = {}
+        # Taken per status en per prioriteit (op intern nummer), als
+        # geordende verzameling zodat verplaatsen en verwijderen O(1) is
+        self._status_index: List[Dict[Task, None]] = [{} for _ in _STATUSSEN]
+        self._prioriteit_index: List[Dict[Task, None]] = [{} for _ in _PRIORITEITEN]
+        # Woordindex voor zoeken in titels en beschrijvingen; wordt pas bij
+        # de eerste zoekopdracht opgebouwd en daarna bijgehouden
+        self._zoekindex: Optional[Zoekindex] = None
+        # Versienummer op schijf bij de laatste keer laden of opslaan
+        self.versie = 0
+        
         self.naam = naam
         self.beschrijving = beschrijving
         self.status = ProjectStatus.ACTIEF
@@ -80,6 +295,189 @@ class Project:
         self.tasks: List[Task] = []
         self.sluitdatum: Optional[datetime] = None
     
+    def __setattr__(self, naam, waarde):
+        super().__setattr__(naam, waarde)
+        
+        if naam in Project._GEVOLGDE_VELDEN:
+            super().__setattr__('gegevens_gewijzigd', True)
+    
+    @property
+    def taken_gewijzigd(self) -> bool:
+        """Of er sinds de laatste opslag taken toegevoegd, gewijzigd of verwijderd zijn"""
+        return bool(self._gewijzigde_taken) or self.taken_verwijderd
+    
+    def heeft_wijzigingen(self) -> bool:
+        """Of er sinds de laatste opslag iets aan het project gewijzigd is"""
+        return self.gegevens_gewijzigd or self.taken_gewijzigd
+    
+    def gewijzigde_taken(self) -> List[Task]:
+        """Geef de taken die sinds de laatste opslag nieuw of gewijzigd zijn"""
+        return list(self._gewijzigde_taken)
+    
+    def markeer_opgeslagen(self):
+        """Markeer het project en al zijn taken als opgeslagen"""
+        self.neem_wijzigingen()
+    
+    def neem_wijzigingen(self) -> Wijzigingen:
+        """
+        Neem de wijzigingen sinds de laatste opslag over om ze op te slaan, en
+        markeer ze als opgeslagen.
+        
+        Roep dit aan voordat het project gecodeerd wordt: een wijziging die
+        daarna nog gebeurt, ook vanuit een andere thread, markeert het project
+        opnieuw en gaat dus niet verloren. Mislukt het opslaan, geef de
+        wijzigingen dan terug met herstel_wijzigingen().
+        
+        Returns:
+            Tuple van (gegevens gewijzigd, gewijzigde taken, taken verwijderd)
+        """
+        with self._wijzigingen_lock:
+            taken = self._gewijzigde_taken
+            for taak in taken:
+                taak.gewijzigd = False
+            
+            wijzigingen = (self.gegevens_gewijzigd, taken, self.taken_verwijderd)
+            self._gewijzigde_taken = []
+            self.taken_verwijderd = False
+            self.gegevens_gewijzigd = False
+        
+        return wijzigingen
+    
+    def neem_taakwijziging(self, taak: Task, verwijderd: bool = False) -> Wijzigingen:
+        """
+        Neem alleen de wijziging van een taak over, zoals neem_wijzigingen(),
+        voor een opslag die alleen die taak schrijft.
+        
+        Args:
+            taak: De gewijzigde of verwijderde taak
+            verwijderd: Neem ook taken_verwijderd over; alleen als de opslag
+                bij de volgende volledige opslag toch alle taken schrijft
+        """
+        with self._wijzigingen_lock:
+            taken = []
+            if taak.project is self and taak.gewijzigd:
+                taak.gewijzigd = False
+                self._gewijzigde_taken.remove(taak)
+                taken.append(taak)
+            
+            taken_verwijderd = verwijderd and self.taken_verwijderd
+            if taken_verwijderd:
+                self.taken_verwijderd = False
+        
+        return False, taken, taken_verwijderd
+    
+    def herstel_wijzigingen(self, wijzigingen: Wijzigingen):
+        """Markeer wijzigingen uit neem_wijzigingen() weer als niet opgeslagen"""
+        gegevens, taken, verwijderd = wijzigingen
+        
+        with self._wijzigingen_lock:
+            for taak in taken:
+                if taak.project is self and not taak.gewijzigd:
+                    taak.gewijzigd = True
+                    self._gewijzigde_taken.append(taak)
+            
+            self.taken_verwijderd = self.taken_verwijderd or verwijderd
+            if gegevens:
+                self.gegevens_gewijzigd = True
+    
+    @property
+    def taakindex(self) -> Dict[str, Task]:
+        """De taken van het project op hoofdletterongevoelige titel (niet wijzigen)"""
+        return self._taak_index
+    
+    def zoek_taak(self, titel: str) -> Optional[Task]:
+        """Zoek een taak op titel, ongeacht hoofdletters"""
+        return self._taak_index.get(naam_sleutel(titel))
+    
+    def _herindexeer_taak(self, taak: Task, oude_titel: str):
+        """Werk de index bij nadat de titel van een taak gewijzigd is"""
+        if self._taak_index.get(naam_sleutel(oude_titel)) is taak:
+            del self._taak_index[naam_sleutel(oude_titel)]
+        self._taak_index[naam_sleutel(taak.titel)] = taak
+        
+        if self._zoekindex is not None:
+            self._zoekindex.werk_bij(taak)
+    
+    @property
+    def zoekindex(self) -> Zoekindex:
+        """De woordindex van de taken; wordt bij het eerste gebruik opgebouwd"""
+        if self._zoekindex is None:
+            self._zoekindex = Zoekindex(self.tasks)
+        return self._zoekindex
+    
+    def _verplaats_taak(self, index: List[Dict[Task, None]], taak: Task, oud: int, nieuw: int):
+        """Verplaats een taak in de status- of prioriteitindex"""
+        if oud != nieuw:
+            index[oud].pop(taak, None)
+            index[nieuw][taak] = None
+    
+    def taken_met_status(self, status: TaskStatus) -> List[Task]:
+        """Geef de taken met een bepaalde status zonder alle taken te doorlopen"""
+        return list(self._status_index[_STATUS_NUMMERS[status]])
+    
+    def taken_met_prioriteit(self, prioriteit: TaskPriority) -> List[Task]:
+        """Geef de taken met een bepaalde prioriteit zonder alle taken te doorlopen"""
+        return list(self._prioriteit_index[_PRIORITEIT_NUMMERS[prioriteit]])
+    
+    def aantal_met_status(self, status: TaskStatus) -> int:
+        """Geef het aantal taken met een bepaalde status"""
+        return len(self._status_index[_STATUS_NUMMERS[status]])
+    
+    def aantal_met_prioriteit(self, prioriteit: TaskPriority) -> int:
+        """Geef het aantal taken met een bepaalde prioriteit"""
+        return len(self._prioriteit_index[_PRIORITEIT_NUMMERS[prioriteit]])
+    
+    def aantal_per_status(self) -> Dict[TaskStatus, int]:
+        """Geef het aantal taken voor elke status"""
+        return {status: len(self._status_index[nummer]) for nummer, status in enumerate(_STATUSSEN)}
+    
+    def aantal_per_prioriteit(self) -> Dict[TaskPriority, int]:
+        """Geef het aantal taken voor elke prioriteit"""
+        return {prioriteit: len(self._prioriteit_index[nummer])
+                for nummer, prioriteit in enumerate(_PRIORITEITEN)}
+    
+    def percentage_afgerond(self) -> float:
+        """Geef het percentage afgeronde taken (0 zonder taken)"""
+        if not self.tasks:
+            return 0.0
+        return 100.0 * self.aantal_met_status(TaskStatus.AFGEROND) / len(self.tasks)
+    
+    def herstel_taak(self, taak: Task):
+        """
+        Voeg een bestaande taak toe zonder controles, bijvoorbeeld bij het
+        laden van schijf.
+        """
+        taak.project = self
+        self.tasks.append(taak)
+        self._taak_index[naam_sleutel(taak.titel)] = taak
+        self._status_index[taak._status][taak] = None
+        self._prioriteit_index[taak._prioriteit][taak] = None
+        if self._zoekindex is not None:
+            self._zoekindex.voeg_toe(taak)
+        
+        if taak.gewijzigd:
+            with self._wijzigingen_lock:
+                self._gewijzigde_taken.append(taak)
+    
+    def herstel_taken(self, taken: List[Task]):
+        """Voeg bestaande taken in een keer toe zonder controles, zoals herstel_taak"""
+        for taak in taken:
+            taak.project = self
+        
+        self.tasks.extend(taken)
+        self._taak_index.update((naam_sleutel(taak.titel), taak) for taak in taken)
+        
+        for taak in taken:
+            self._status_index[taak._status][taak] = None
+            self._prioriteit_index[taak._prioriteit][taak] = None
+        
+        if self._zoekindex is not None:
+            for taak in taken:
+                self._zoekindex.voeg_toe(taak)
+        
+        with self._wijzigingen_lock:
+            self._gewijzigde_taken.extend(taak for taak in taken if taak.gewijzigd)
+    
     def voeg_taak_toe(self, taak: Task) -> bool:
         """
         Voeg een taak toe aan het project.
@@ -88,14 +486,82 @@ class Project:
         if self.status == ProjectStatus.GESLOTEN:
             return False
         
-        self.tasks.append(taak)
+        self.herstel_taak(taak)
         return True
     
+    def verwijder_taak(self, taak: Task):
+        """Verwijder een taak uit het project"""
+        self.tasks.remove(taak)
+        taak.project = None
+        
+        if self._taak_index.get(naam_sleutel(taak.titel)) is taak:
+            del self._taak_index[naam_sleutel(taak.titel)]
+        self._status_index[taak._status].pop(taak, None)
+        self._prioriteit_index[taak._prioriteit].pop(taak, None)
+        if self._zoekindex is not None:
+            self._zoekindex.verwijder(taak)
+        
+        with self._wijzigingen_lock:
+            if taak in self._gewijzigde_taken:
+                self._gewijzigde_taken.remove(taak)
+            self.taken_verwijderd = True
+    
+    def verwijder_taken(self, taken: List[Task]):
+        """Verwijder meerdere taken in een keer uit het project"""
+        te_verwijderen = {id(taak) for taak in taken}
+        if not te_verwijderen:
+            return
+        
+        self.tasks = [taak for taak in self.tasks if id(taak) not in te_verwijderen]
+        with self._wijzigingen_lock:
+            self._gewijzigde_taken = [
+                taak for taak in self._gewijzigde_taken if id(taak) not in te_verwijderen
+            ]
+        
+        for taak in taken:
+            taak.project = None
+            if self._taak_index.get(naam_sleutel(taak.titel)) is taak:
+                del self._taak_index[naam_sleutel(taak.titel)]
+            self._status_index[taak._status].pop(taak, None)
+            self._prioriteit_index[taak._prioriteit].pop(taak, None)
+            if self._zoekindex is not None:
+                self._zoekindex.verwijder(taak)
+        
+        with self._wijzigingen_lock:
+            self.taken_verwijderd = True
+    
+    def neem_over(self, ander: "Project"):
+        """
+        Vervang de gegevens en taken van dit project door die van een ander,
+        bijvoorbeeld een versie die net opnieuw van schijf geladen is.
+        Verwijzingen naar dit project blijven zo geldig.
+        """
+        self.naam = ander.naam
+        self.beschrijving = ander.beschrijving
+        self.status = ander.status
+        self.aanmaakdatum = ander.aanmaakdatum
+        self.sluitdatum = ander.sluitdatum
+        self.versie = ander.versie
+        
+        for taak in self.tasks:
+            taak.project = None
+        
+        self.tasks = []
+        self._taak_index = {}
+        self._status_index = [{} for _ in _STATUSSEN]
+        self._prioriteit_index = [{} for _ in _PRIORITEITEN]
+        self._zoekindex = None
+        self._gewijzigde_taken = []
+        self.herstel_taken(ander.tasks)
+        
+        self.gegevens_gewijzigd = ander.gegevens_gewijzigd
+        self.taken_verwijderd = ander.taken_verwijderd
+    
     def alle_taken_afgerond(self) -> bool:
         """Controleer of alle taken afgerond zijn"""
         if not self.tasks:
             return False
-        return all(task.is_afgerond() for task in self.tasks)
+        return self.aantal_met_status(TaskStatus.AFGEROND) == len(self.tasks)
     
     def sluit_project(self) -> bool:
         """
@@ -117,5 +583,44 @@ class Project:
         """Geef het aantal taken in het project terug"""
         return len(self.tasks)
     
+    def samenvatting(self, locatie: str = "") -> "ProjectSamenvatting":
+        """Geef een lichte samenvatting van het project voor de catalogus"""
+        return ProjectSamenvatting(self.naam, self.status, self.aantal_taken(), locatie,
+                                   self.aantal_per_status(), self.aantal_per_prioriteit())
+    
+    def __str__(self) -> str:
+        return f"{self.naam} (Status: {self.status.value})"
+
+
+class ProjectSamenvatting:
+    """
+    Lichte representatie van een project zonder taken.
+    
+    Wordt gebruikt door de catalogus zodat het projectoverzicht getoond kan
+    worden zonder alle taken van schijf te laden.
+    """
+    
+    __slots__ = ('naam', 'status', 'aantal_taken', 'locatie', 'aantal_per_status',
+                 'aantal_per_prioriteit')
+    
+    def __init__(self, naam: str, status: ProjectStatus = ProjectStatus.ACTIEF,
+                 aantal_taken: int = 0, locatie: str = "",
+                 aantal_per_status: Optional[Dict[TaskStatus, int]] = None,
+                 aantal_per_prioriteit: Optional[Dict[TaskPriority, int]] = None):
+        self.naam = naam
+        self.status = status
+        self.aantal_taken = aantal_taken
+        self.locatie = locatie
+        # Aantal taken per status en per prioriteit, zodat voortgang getoond
+        # kan worden zonder de taken te laden
+        self.aantal_per_status = aantal_per_status or dict.fromkeys(TaskStatus, 0)
+        self.aantal_per_prioriteit = aantal_per_prioriteit or dict.fromkeys(TaskPriority, 0)
+    
+    def percentage_afgerond(self) -> float:
+        """Geef het percentage afgeronde taken (0 zonder taken)"""
+        if not self.aantal_taken:
+            return 0.0
+        return 100.0 * self.aantal_per_status[TaskStatus.AFGEROND] / self.aantal_taken
+    
     def __str__(self) -> str:
         return f"{self.naam} (Status: {self.status.value})"
@@ -1,20 +1,82 @@
-from typing import List, Optional, Tuple
-from Models import Project, ProjectStatus
+import threading
+from datetime import datetime
+from heapq import nlargest
+from typing import Dict, Iterator, List, Optional, Tuple
+from Models import (Project, ProjectStatus, ProjectSamenvatting, Task, TaskPriority, TaskStatus,
+                    naam_sleutel)
 from Validators import valideer_projectnaam, valideer_projectsluitng
 from Storage import StorageManager
+from Transactie import Transactie
+from Vergrendeling import VersieConflict, met_herhaling
+from Zoekindex import doorzoek, tokeniseer
 
 
 class ProjectManager:
     """Manager voor projectbeheer"""
     
-    def __init__(self, storage: Optional[StorageManager] = None):
+    def __init__(self, storage: Optional[StorageManager] = None, gebruik_zoekindex: bool = False):
+        """
+        Args:
+            storage: De opslag, een StorageManager of SqliteStorageManager
+            gebruik_zoekindex: Bouw voor zoek_tekst() per project een woordindex
+                op; loont alleen in een langlopend proces dat vaak zoekt
+        """
         self.storage = storage or StorageManager()
-        self.projecten: List[Project] = []
+        self.gebruik_zoekindex = gebruik_zoekindex
+        # Samenvattingen van alle projecten op naam_sleutel; taken worden
+        # pas bij gebruik geladen
+        self._catalogus: Dict[str, ProjectSamenvatting] = {}
+        # Volledig geladen projecten op naam_sleutel
+        self._geladen: Dict[str, Project] = {}
+        # Gezet door de verversthread als er wijzigingen op schijf zijn;
+        # ze worden bij het volgende gebruik van de manager overgenomen
+        self._wijzigingen_gevonden = threading.Event()
+        self._stop_verversen: Optional[threading.Event] = None
         self._laad_projecten_van_schijf()
     
     def _laad_projecten_van_schijf(self):
-        """Laad alle projecten van schijf in het geheugen"""
-        self.projecten = self.storage.laad_alle_projecten()
+        """Laad de projectcatalogus van schijf; taken worden later geladen"""
+        self._catalogus = {
+            naam_sleutel(samenvatting.naam): samenvatting
+            for samenvatting in self.storage.laad_catalogus()
+        }
+        self._geladen = {}
+    
+    @property
+    def projecten(self) -> List[Project]:
+        """
+        Alle projecten, volledig geladen (laadt ontbrekende projecten van schijf).
+        
+        Ontbreken er meerdere, dan worden ze in een keer geladen met
+        laad_alle_projecten() van de opslag, met zijn laad_werkers threads.
+        """
+        samenvattingen = list(self._catalogus.values())
+        
+        if sum(naam_sleutel(samenvatting.naam) not in self._geladen for samenvatting in samenvattingen) > 1:
+            for project in self.storage.laad_alle_projecten():
+                sleutel = naam_sleutel(project.naam)
+                # Een al geladen project kan niet opgeslagen wijzigingen hebben
+                if sleutel in self._catalogus:
+                    self._geladen.setdefault(sleutel, project)
+        
+        projecten = []
+        for samenvatting in samenvattingen:
+            project = self._haal_project(samenvatting)
+            if project:
+                projecten.append(project)
+        return projecten
+    
+    def _haal_project(self, samenvatting: ProjectSamenvatting) -> Optional[Project]:
+        """Geef het volledige project bij een samenvatting, en laad het zo nodig"""
+        sleutel = naam_sleutel(samenvatting.naam)
+        
+        if sleutel not in self._geladen:
+            project = self.storage.laad_project(samenvatting.naam)
+            if not project:
+                return None
+            self._geladen[sleutel] = project
+        
+        return self._geladen[sleutel]
     
     def maak_project_aan(self, naam: str, beschrijving: Optional[str] = None) -> Tuple[bool, str, Optional[Project]]:
         """
@@ -27,36 +89,332 @@ class ProjectManager:
         Returns:
             Tuple van (succes, bericht, project)
         """
-        is_geldig, foutbericht = valideer_projectnaam(naam, self.projecten)
+        is_geldig, foutbericht = valideer_projectnaam(naam, self._catalogus)
         
         if not is_geldig:
             return False, foutbericht, None
         
         nieuw_project = Project(naam, beschrijving)
-        self.projecten.append(nieuw_project)
+        sleutel = naam_sleutel(naam)
+        self._catalogus[sleutel] = nieuw_project.samenvatting()
+        self._geladen[sleutel] = nieuw_project
         
         # Sla op schijf op
-        if self.storage.sla_project_op(nieuw_project):
+        try:
+            opgeslagen = self.storage.sla_project_op(nieuw_project)
+        except VersieConflict:
+            # Een ander proces heeft het project intussen aangemaakt
+            del self._catalogus[sleutel]
+            del self._geladen[sleutel]
+            bestaand = self.storage.laad_project(naam)
+            if bestaand:
+                self._catalogus[sleutel] = bestaand.samenvatting()
+                self._geladen[sleutel] = bestaand
+            return False, f"Project '{naam}' bestaat al", None
+        
+        if opgeslagen:
             return True, f"Project '{naam}' succesvol aangemaakt", nieuw_project
         else:
             # Verwijder uit geheugen als opslaan mislukt
-            self.projecten.remove(nieuw_project)
+            del self._catalogus[sleutel]
+            del self._geladen[sleutel]
             return False, f"Project '{naam}' kon niet opgeslagen worden", None
     
     def zoek_project(self, naam: str) -> Optional[Project]:
         """
         Zoek een project op naam.
         
+        Bij de eerste keer dat een project gevonden wordt, worden de taken
+        van schijf geladen.
+        
         Args:
             naam: De naam van het project
         
         Returns:
             Het gevonden project of None
         """
-        return next(
-            (p for p in self.projecten if p.naam.lower() == naam.lower()),
-            None
-        )
+        self._neem_wijzigingen_over()
+        samenvatting = self._zoek_samenvatting(naam)
+        
+        if not samenvatting:
+            return None
+        
+        return self._haal_project(samenvatting)
+    
+    def ververs(self) -> Tuple[int, int]:
+        """
+        Neem wijzigingen van andere processen over zonder alles opnieuw te laden.
+        
+        Alleen projecten waarvan de bestanden gewijzigd zijn worden opnieuw
+        gelezen; nieuwe projectmappen worden toegevoegd en verdwenen
+        projecten verwijderd. Een geladen project wordt in place bijgewerkt,
+        zodat verwijzingen ernaar geldig blijven. Nog niet weggeschreven
+        wijzigingen (bijvoorbeeld bij UitgesteldeStorage) vervallen daarbij,
+        zoals bij een versieconflict. Alleen projecten die in een lopende
+        transactie gewijzigd zijn worden overgeslagen; bij het einde van de
+        transactie volgt dan een versieconflict.
+        
+        Opslag zonder wijzigingen() (zoals SqliteStorageManager) wordt in
+        zijn geheel opnieuw ingelezen.
+        
+        Returns:
+            Tuple van (aantal gewijzigde of nieuwe projecten, aantal verwijderde projecten)
+        """
+        if not hasattr(self.storage, 'wijzigingen'):
+            self._laad_projecten_van_schijf()
+            return len(self._catalogus), 0
+        
+        gewijzigd, verwijderd = self.storage.wijzigingen()
+        if not gewijzigd and not verwijderd:
+            return 0, 0
+        
+        per_map = {self.storage.mapnaam(samenvatting.naam): sleutel
+                   for sleutel, samenvatting in list(self._catalogus.items())}
+        aantal_gewijzigd = aantal_verwijderd = 0
+        transactie = vars(self.storage).get('_transactie')
+        
+        for mapnaam in gewijzigd + verwijderd:
+            sleutel = per_map.get(mapnaam)
+            project = self._geladen.get(sleutel) if sleutel else None
+            
+            if project is not None:
+                if transactie is not None and transactie.bevat(project):
+                    continue
+                if self.storage.herlaad_project(project):
+                    self._catalogus[sleutel] = project.samenvatting(mapnaam)
+                    aantal_gewijzigd += 1
+                    continue
+            
+            samenvatting = self.storage.ververs_map(mapnaam)
+            
+            if sleutel and (samenvatting is None or naam_sleutel(samenvatting.naam) != sleutel):
+                del self._catalogus[sleutel]
+                self._geladen.pop(sleutel, None)
+                aantal_verwijderd += samenvatting is None
+            
+            if samenvatting is not None:
+                self._catalogus[naam_sleutel(samenvatting.naam)] = samenvatting
+                aantal_gewijzigd += 1
+        
+        return aantal_gewijzigd, aantal_verwijderd
+    
+    def start_verversen(self, interval: float = 2.0) -> bool:
+        """
+        Controleer op de achtergrond elke interval seconden op wijzigingen.
+        
+        De thread doet alleen het goedkope vergelijken van vingerafdrukken;
+        gevonden wijzigingen worden bij het volgende gebruik van de manager
+        in de aanroepende thread overgenomen, zodat de manager niet
+        tegelijk vanuit twee threads gewijzigd wordt.
+        
+        Args:
+            interval: Aantal seconden tussen twee controles
+        
+        Returns:
+            True als de thread gestart is, False als de opslag dit niet ondersteunt
+        """
+        if not hasattr(self.storage, 'wijzigingen'):
+            return False
+        
+        self.stop_verversen()
+        self._stop_verversen = threading.Event()
+        threading.Thread(target=self._ververslus, args=(interval, self._stop_verversen),
+                         name="verversen", daemon=True).start()
+        return True
+    
+    def stop_verversen(self):
+        """Stop de verversthread, als die loopt"""
+        if self._stop_verversen is not None:
+            self._stop_verversen.set()
+            self._stop_verversen = None
+    
+    def _ververslus(self, interval: float, stop: threading.Event):
+        """Zoek periodiek naar wijzigingen tot stop gezet wordt"""
+        while not stop.wait(interval):
+            try:
+                gewijzigd, verwijderd = self.storage.wijzigingen()
+            except Exception as e:
+                print(f"Fout bij zoeken naar wijzigingen: {e}")
+                continue
+            
+            if gewijzigd or verwijderd:
+                self._wijzigingen_gevonden.set()
+    
+    def _neem_wijzigingen_over(self):
+        """Neem wijzigingen over die de verversthread gevonden heeft"""
+        if self._wijzigingen_gevonden.is_set():
+            self._wijzigingen_gevonden.clear()
+            self.ververs()
+    
+    def _zoek_samenvatting(self, naam: str) -> Optional[ProjectSamenvatting]:
+        """Zoek de catalogusvermelding van een project op naam"""
+        return self._catalogus.get(naam_sleutel(naam))
+    
+    def haal_samenvattingen_op(self) -> List[ProjectSamenvatting]:
+        """
+        Haal een samenvatting van alle projecten op zonder taken te laden.
+        
+        Voor projecten die al geladen zijn worden de actuele gegevens gebruikt.
+        """
+        self._neem_wijzigingen_over()
+        return [
+            self._geladen[sleutel].samenvatting(samenvatting.locatie)
+            if sleutel in self._geladen else samenvatting
+            for sleutel, samenvatting in list(self._catalogus.items())
+        ]
+    
+    def zoek_taken(self, status: Optional[TaskStatus] = None,
+                   prioriteit: Optional[TaskPriority] = None,
+                   projectstatus: Optional[ProjectStatus] = None,
+                   aangemaakt_vanaf: Optional[datetime] = None,
+                   aangemaakt_voor: Optional[datetime] = None,
+                   afgerond_vanaf: Optional[datetime] = None,
+                   afgerond_voor: Optional[datetime] = None) -> Iterator[Tuple[Project, Task]]:
+        """
+        Zoek taken over alle projecten heen.
+        
+        Projecten worden op status gefilterd via de catalogus, zodat
+        projecten met een andere status niet geladen worden. Binnen een
+        project wordt begonnen bij de kleinste van de status- en
+        prioriteitindex, zodat niet alle taken doorlopen worden. Filters die
+        None zijn worden niet toegepast; datumgrenzen zijn inclusief vanaf
+        en exclusief voor.
+        
+        Args:
+            status: Alleen taken met deze status
+            prioriteit: Alleen taken met deze prioriteit
+            projectstatus: Alleen taken in projecten met deze status
+            aangemaakt_vanaf: Alleen taken aangemaakt op of na dit moment
+            aangemaakt_voor: Alleen taken aangemaakt voor dit moment
+            afgerond_vanaf: Alleen taken afgerond op of na dit moment
+            afgerond_voor: Alleen taken afgerond voor dit moment
+        
+        Returns:
+            Een generator van (project, taak) tuples
+        """
+        # Vergelijk op de interne epochwaarden, zonder datetimes aan te maken
+        aanmaak_grenzen = self._epochgrenzen(aangemaakt_vanaf, aangemaakt_voor)
+        afrond_grenzen = self._epochgrenzen(afgerond_vanaf, afgerond_voor)
+        
+        for samenvatting in self.haal_samenvattingen_op():
+            if projectstatus is not None and samenvatting.status != projectstatus:
+                continue
+            
+            project = self._haal_project(samenvatting)
+            if not project:
+                continue
+            
+            # Begin bij de kleinste index die van toepassing is
+            if status is not None and (
+                    prioriteit is None
+                    or project.aantal_met_status(status) <= project.aantal_met_prioriteit(prioriteit)):
+                taken = project.taken_met_status(status)
+            elif prioriteit is not None:
+                taken = project.taken_met_prioriteit(prioriteit)
+            else:
+                taken = list(project.tasks)
+            
+            for taak in taken:
+                if status is not None and taak.status != status:
+                    continue
+                if prioriteit is not None and taak.prioriteit != prioriteit:
+                    continue
+                if aanmaak_grenzen and not self._binnen(taak.aanmaakdatum_epoch, aanmaak_grenzen):
+                    continue
+                if afrond_grenzen and not self._binnen(taak.afrondmoment_epoch, afrond_grenzen):
+                    continue
+                
+                yield project, taak
+    
+    def zoek_tekst(self, zoekterm: str, prefix: bool = True, projectstatus: Optional[ProjectStatus] = None,
+                   maximum: Optional[int] = 50) -> List[Tuple[float, Project, Task]]:
+        """
+        Zoek taken op woorden in hun titel of beschrijving, over alle projecten heen.
+        
+        Een taak wordt gevonden als alle woorden van de zoekterm erin
+        voorkomen, ongeacht hoofdletters. Een woord in de titel telt zwaarder
+        dan een woord in de beschrijving, en een heel woord zwaarder dan een
+        woord dat alleen met de zoekterm begint.
+        
+        Zonder gebruik_zoekindex worden de taken doorzocht; het opbouwen van
+        de index kost bij een enkele zoekopdracht veel meer dan het oplevert.
+        Een index die er al is wordt wel gebruikt.
+        
+        Args:
+            zoekterm: De woorden om op te zoeken
+            prefix: Vind ook woorden die met een zoekwoord beginnen
+            projectstatus: Alleen taken in projecten met deze status
+            maximum: Maximaal aantal resultaten, of None voor alle
+        
+        Returns:
+            Een lijst van (score, project, taak) tuples, hoogste score eerst
+        """
+        termen = list(dict.fromkeys(tokeniseer(zoekterm)))
+        if not termen:
+            return []
+        
+        resultaten = []
+        for samenvatting in self.haal_samenvattingen_op():
+            if projectstatus is not None and samenvatting.status != projectstatus:
+                continue
+            
+            project = self._haal_project(samenvatting)
+            if not project:
+                continue
+            
+            if self.gebruik_zoekindex or project._zoekindex is not None:
+                gevonden = project.zoekindex.zoek(termen, prefix)
+            else:
+                gevonden = doorzoek(project.tasks, termen, prefix)
+            resultaten.extend((score, project, taak) for taak, score in gevonden.items())
+        
+        # Bij gelijke score op project en titel
+        def sorteersleutel(resultaat: Tuple[float, Project, Task]):
+            score, project, taak = resultaat
+            return -score, naam_sleutel(project.naam), naam_sleutel(taak.titel)
+        
+        if maximum is None:
+            return sorted(resultaten, key=sorteersleutel)
+        return sorted(nlargest(maximum, resultaten, key=lambda resultaat: resultaat[0]), key=sorteersleutel)
+    
+    def zoekresultaat_regels(self, resultaten: List[Tuple[float, Project, Task]]) -> Iterator[str]:
+        """
+        Geef zoekresultaten van zoek_tekst() regel voor regel, te beginnen met de kop.
+        
+        Returns:
+            Een generator van regels (inclusief regeleinde)
+        """
+        if not resultaten:
+            yield "Geen taken gevonden\n"
+            return
+        
+        yield "=== ZOEKRESULTATEN ===\n"
+        yield f"{'Score':>5} {'Project':<20} {'Titel':<30} {'Status':<10} {'Beschrijving':<10}\n"
+        yield "-" * 79 + "\n"
+        
+        for score, project, taak in resultaten:
+            beschrijving = (taak.beschrijving or "").replace("\n", " ")
+            if len(beschrijving) > 10:
+                beschrijving = beschrijving[:7] + "..."
+            yield (f"{score:>5.1f} {project.naam[:20]:<20} {taak.titel[:30]:<30} "
+                   f"{taak.status.value:<10} {beschrijving}\n")
+    
+    @staticmethod
+    def _epochgrenzen(vanaf: Optional[datetime],
+                      voor: Optional[datetime]) -> Optional[Tuple[Optional[int], Optional[int]]]:
+        """Zet een datumbereik om naar epochgrenzen, of None als er geen grenzen zijn"""
+        if vanaf is None and voor is None:
+            return None
+        return (None if vanaf is None else Task.naar_epoch(vanaf),
+                None if voor is None else Task.naar_epoch(voor))
+    
+    @staticmethod
+    def _binnen(moment: Optional[int], grenzen: Tuple[Optional[int], Optional[int]]) -> bool:
+        """Controleer of een epochwaarde binnen de grenzen valt"""
+        vanaf, voor = grenzen
+        return (moment is not None
+                and (vanaf is None or moment >= vanaf)
+                and (voor is None or moment < voor))
     
     def haal_alle_projecten_op(self) -> List[Project]:
         """Haal alle projecten op"""
@@ -77,6 +435,14 @@ class ProjectManager:
         if not project:
             return False, f"Project '{projectnaam}' niet gevonden"
         
+        return met_herhaling(
+            self.storage, project,
+            lambda: self._sluit_project(project, projectnaam),
+            (False, "Project kon niet opgeslagen worden, het wordt steeds elders gewijzigd")
+        )
+    
+    def _sluit_project(self, project: Project, projectnaam: str) -> Tuple[bool, str]:
+        """Sluit een geladen project en sla het op, zie sluit_project"""
         is_geldig, bericht = valideer_projectsluitng(project)
         
         if not is_geldig:
@@ -109,7 +475,8 @@ class ProjectManager:
         if not project.is_gesloten():
             return False, "Alleen gesloten projecten kunnen verwijderd worden"
         
-        self.projecten.remove(project)
+        del self._catalogus[naam_sleutel(project.naam)]
+        del self._geladen[naam_sleutel(project.naam)]
         
         # Verwijder van schijf
         if self.storage.verwijder_project(projectnaam):
@@ -117,24 +484,93 @@ class ProjectManager:
         else:
             return False, "Project kon niet verwijderd worden"
     
+    def transactie(self) -> Transactie:
+        """
+        Groepeer wijzigingen tot een enkele schrijfactie per project:
+        
+            with project_manager.transactie():
+                project_manager.maak_project_aan("Website")
+                task_manager.maak_taak_aan(...)
+        
+        Geldt ook voor een TaskManager met dezelfde opslag. Bij een fout
+        wordt alles teruggedraaid, zie Transactie.
+        
+        Raises:
+            VersieConflict: Bij het einde, als een project intussen door een ander proces gewijzigd is
+            TransactieMislukt: Bij het einde, als er iets niet opgeslagen kon worden
+        """
+        return Transactie(self.storage, self)
+    
     def toon_projectoverzicht(self) -> str:
         """
         Toon een overzicht van alle projecten.
         
+        Het overzicht komt uit de catalogus; alleen projecten die al geladen
+        zijn leveren hun actuele gegevens.
+        
         Returns:
             Een geformateerde string met het projectoverzicht
         """
-        if not self.projecten:
-            return "Geen projecten gevonden"
+        return "".join(self.projectoverzicht_regels())
+    
+    def projectoverzicht_regels(self, offset: int = 0,
+                                aantal: Optional[int] = None) -> Iterator[str]:
+        """
+        Geef het projectoverzicht regel voor regel, te beginnen met de kop.
+        
+        Args:
+            offset: Index van het eerste project
+            aantal: Maximaal aantal projecten, of None voor alle projecten
+        
+        Returns:
+            Een generator van regels (inclusief regeleinde)
+        """
+        if not self._catalogus:
+            yield "Geen projecten gevonden"
+            return
+        
+        yield "=== PROJECTOVERZICHT ===\n"
+        yield (f"{'Naam':<30} {'Status':<10} {'Taken':>6} {'Nieuw':>6} {'Bezig':>6} "
+               f"{'Afgerond':>8} {'Gereed':>7}\n")
+        yield "-" * 79 + "\n"
         
-        overzicht = "=== PROJECTOVERZICHT ===\n"
-        overzicht += f"{'Naam':<30} {'Status':<10} {'Aantal taken':<12}\n"
-        overzicht += "-" * 52 + "\n"
+        einde = None if aantal is None else offset + aantal
         
-        for project in self.projecten:
-            status_text = project.status.value
-            aantal_taken = project.aantal_taken()
+        # Een kopie: de executor van de async managers kan intussen projecten toevoegen
+        for sleutel, samenvatting in list(self._catalogus.items())[offset:einde]:
+            project = self._geladen.get(sleutel)
             
-            overzicht += f"{project.naam:<30} {status_text:<10} {aantal_taken:<12}\n"
+            # Geladen projecten leveren actuele tellers
+            if project:
+                samenvatting = project.samenvatting(samenvatting.locatie)
+            
+            per_status = samenvatting.aantal_per_status
+            
+            yield (f"{samenvatting.naam:<30} {samenvatting.status.value:<10} "
+                   f"{samenvatting.aantal_taken:>6} {per_status[TaskStatus.NIEUW]:>6} "
+                   f"{per_status[TaskStatus.BEZIG]:>6} {per_status[TaskStatus.AFGEROND]:>8} "
+                   f"{samenvatting.percentage_afgerond():>6.0f}%\n")
+    
+    def projectoverzicht_paginas(self, pagina_grootte: int = 20,
+                                 offset: int = 0) -> Iterator[str]:
+        """
+        Geef het projectoverzicht per pagina; een pagina wordt pas opgebouwd
+        als erom gevraagd wordt.
+        
+        Args:
+            pagina_grootte: Aantal projecten per pagina
+            offset: Index van het eerste project
+        
+        Returns:
+            Een generator van geformateerde pagina's
+        """
+        totaal = len(self._catalogus)
+        
+        if not totaal:
+            yield "".join(self.projectoverzicht_regels())
+            return
         
-        return overzicht
+        for begin in range(offset, totaal, pagina_grootte):
+            einde = min(begin + pagina_grootte, totaal)
+            pagina = "".join(self.projectoverzicht_regels(begin, pagina_grootte))
+            yield pagina + f"(projecten {begin + 1}-{einde} van {totaal})"
@@ -0,0 +1,248 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, List, Tuple
+from urllib.parse import unquote, urlsplit
+from Models import naam_sleutel
+from Batch import BatchVerwerker
+from Project_manager import ProjectManager
+from Task_manager import TaskManager
+from Storage import StorageManager
+
+
+# Markering voor een veld dat in de body moet staan
+VERPLICHT = object()
+
+# Methode, pad en het bijbehorende batchcommando. '*' in het pad is een
+# naam (project of taak) die als argument aan het commando meegaat, gevolgd
+# door de velden uit de JSON-body met hun standaardwaarde. Alle bodyvelden
+# zijn tekst (of null als de standaardwaarde None is); of een prioriteit of
+# status geldig is controleren de managers.
+ROUTES: List[Tuple[str, Tuple[str, ...], str, Tuple[Tuple[str, Any], ...]]] = [
+    ('GET', ('projecten',), 'projecten', ()),
+    ('POST', ('projecten',), 'project-aanmaken', (('naam', VERPLICHT), ('beschrijving', None))),
+    ('POST', ('projecten', '*', 'sluiten'), 'project-sluiten', ()),
+    ('DELETE', ('projecten', '*'), 'project-verwijderen', ()),
+    ('GET', ('projecten', '*', 'taken'), 'taken', ()),
+    ('POST', ('projecten', '*', 'taken'), 'taak-aanmaken',
+     (('titel', VERPLICHT), ('beschrijving', None), ('prioriteit', "normaal"))),
+    ('GET', ('projecten', '*', 'taken', '*'), 'taakdetails', ()),
+    ('PUT', ('projecten', '*', 'taken', '*', 'status'), 'status', (('status', VERPLICHT),)),
+    ('DELETE', ('projecten', '*', 'taken', '*'), 'taak-verwijderen', ()),
+]
+
+HULPTEKST = """Endpoints (namen in het pad URL-gecodeerd, bodies als JSON):
+  GET    /projecten
+  POST   /projecten                               {"naam", "beschrijving"}
+  POST   /projecten/<project>/sluiten
+  DELETE /projecten/<project>
+  GET    /projecten/<project>/taken
+  POST   /projecten/<project>/taken               {"titel", "beschrijving", "prioriteit"}
+  GET    /projecten/<project>/taken/<titel>
+  PUT    /projecten/<project>/taken/<titel>/status {"status"}
+  DELETE /projecten/<project>/taken/<titel>"""
+
+
+def zoek_route(methode: str, delen: List[str]):
+    """
+    Zoek de route bij een verzoek.
+    
+    Returns:
+        Tuple van (commando, namen uit het pad, bodyvelden), of None
+    """
+    for route_methode, patroon, commando, velden in ROUTES:
+        if route_methode != methode or len(patroon) != len(delen):
+            continue
+        
+        namen = []
+        for verwacht, deel in zip(patroon, delen):
+            if verwacht == '*':
+                namen.append(deel)
+            elif verwacht != deel:
+                break
+        else:
+            return commando, namen, velden
+    
+    return None
+
+
+class Verzoekafhandelaar(BaseHTTPRequestHandler):
+    """Zet een HTTP-verzoek om naar een batchcommando en het resultaat naar JSON"""
+    
+    # Keep-alive, zodat een client niet per verzoek een verbinding opent. Een
+    # open verbinding houdt een werker bezet; na timeout seconden zonder
+    # verzoek wordt hij gesloten.
+    protocol_version = 'HTTP/1.1'
+    timeout = 5
+    # Kop en body gaan in aparte writes; zonder dit wacht het tweede pakket
+    # op de vertraagde ACK van de client
+    disable_nagle_algorithm = True
+    server: "ProjectServer"
+    
+    def do_GET(self):
+        self._verwerk('GET')
+    
+    def do_POST(self):
+        self._verwerk('POST')
+    
+    def do_PUT(self):
+        self._verwerk('PUT')
+    
+    def do_DELETE(self):
+        self._verwerk('DELETE')
+    
+    def _verwerk(self, methode: str):
+        """Handel een verzoek af"""
+        delen = [unquote(deel) for deel in urlsplit(self.path).path.split('/') if deel]
+        route = zoek_route(methode, delen)
+        
+        try:
+            body = self._lees_body()
+        except ValueError as e:
+            self._antwoord(400, {'succes': False, 'bericht': f"Ongeldige body: {e}"})
+            return
+        
+        if route is None:
+            self._antwoord(404, {'succes': False, 'bericht': f"Onbekend endpoint {methode} {self.path}"})
+            return
+        
+        commando, argumenten, velden = route
+        for veld, standaard in velden:
+            waarde = body.get(veld, standaard)
+            if waarde is VERPLICHT:
+                self._antwoord(400, {'succes': False, 'bericht': f"Veld '{veld}' ontbreekt"})
+                return
+            if not isinstance(waarde, str) and not (waarde is None and standaard is None):
+                self._antwoord(400, {'succes': False, 'bericht': f"Veld '{veld}' moet tekst zijn"})
+                return
+            argumenten.append(waarde)
+        
+        resultaat = self.server.voer_uit(commando, argumenten)
+        self._antwoord(200 if resultaat['succes'] else 400, resultaat)
+    
+    def _lees_body(self) -> Dict[str, Any]:
+        """Lees de JSON-body van het verzoek; een lege body is een lege dictionary"""
+        lengte = int(self.headers.get('Content-Length') or 0)
+        if not lengte:
+            return {}
+        
+        body = json.loads(self.rfile.read(lengte))
+        if not isinstance(body, dict):
+            raise ValueError("verwacht een JSON-object")
+        return body
+    
+    def _antwoord(self, code: int, inhoud: Dict[str, Any]):
+        """Stuur een JSON-antwoord"""
+        data = json.dumps(inhoud, ensure_ascii=False).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, format: str, *args):
+        """Geen regel per verzoek op stderr; dat kost bij veel verzoeken te veel tijd"""
+        pass
+
+
+class ProjectServer(HTTPServer):
+    """
+    HTTP/JSON-server rond een ProjectManager en TaskManager die in het
+    geheugen blijven, zodat niet elk commando de werkruimte opnieuw laadt.
+    
+    Verzoeken worden afgehandeld in een vaste threadpool. Verzoeken op
+    hetzelfde project lopen na elkaar via een lock per project; verzoeken
+    op verschillende projecten lopen tegelijk.
+    """
+    
+    def __init__(self, adres: Tuple[str, int], verwerker: BatchVerwerker, werkers: int = 8):
+        """
+        Args:
+            adres: Host en poort; poort 0 kiest een vrije poort
+            verwerker: De BatchVerwerker die de commando's uitvoert
+            werkers: Aantal threads voor het afhandelen van verzoeken
+        """
+        super().__init__(adres, Verzoekafhandelaar)
+        self.verwerker = verwerker
+        self._pool = ThreadPoolExecutor(max_workers=werkers, thread_name_prefix="verzoek")
+        # Een lock per project op naam_sleutel
+        self._project_locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+    
+    def project_lock(self, naam: str) -> threading.Lock:
+        """Geef de lock waarmee verzoeken op een project na elkaar lopen"""
+        sleutel = naam_sleutel(naam)
+        with self._locks_lock:
+            if sleutel not in self._project_locks:
+                self._project_locks[sleutel] = threading.Lock()
+            return self._project_locks[sleutel]
+    
+    def voer_uit(self, commando: str, argumenten: List[Any]) -> Dict[str, Any]:
+        """Voer een batchcommando uit, onder de lock van het project als het er een heeft"""
+        functie, _, _ = self.verwerker.commandos[commando]
+        
+        if not argumenten:
+            return functie()
+        
+        with self.project_lock(str(argumenten[0])):
+            return functie(*argumenten)
+    
+    def process_request(self, request, client_address):
+        """Geef de verbinding door aan de threadpool"""
+        self._pool.submit(self._verwerk_verbinding, request, client_address)
+    
+    def _verwerk_verbinding(self, request, client_address):
+        """Handel een verbinding af in een thread uit de pool"""
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+    
+    def server_close(self):
+        """Stop met luisteren en wacht tot lopende verzoeken klaar zijn"""
+        super().server_close()
+        self._pool.shutdown(wait=True)
+
+
+def maak_server(host: str = "127.0.0.1", poort: int = 8080, werkers: int = 8,
+                storage=None) -> ProjectServer:
+    """
+    Maak een server aan en laad alle projecten alvast in het geheugen.
+    
+    Args:
+        host: Het adres waarop de server luistert
+        poort: De poort; 0 kiest een vrije poort
+        werkers: Aantal threads voor het afhandelen van verzoeken
+        storage: De opslag, standaard een StorageManager
+    """
+    project_manager = ProjectManager(storage or StorageManager(), gebruik_zoekindex=True)
+    # Laad alle projecten vooraf, zodat het eerste verzoek niet op schijf wacht
+    project_manager.haal_alle_projecten_op()
+    verwerker = BatchVerwerker(project_manager, TaskManager(project_manager.storage))
+    return ProjectServer((host, poort), verwerker, werkers)
+
+
+def start_server(host: str = "127.0.0.1", poort: int = 8080, werkers: int = 8,
+                 storage=None) -> int:
+    """
+    Start de server en blijf verzoeken afhandelen tot Ctrl+C.
+    
+    Returns:
+        0 na een nette afsluiting
+    """
+    server = maak_server(host, poort, werkers, storage)
+    print(f"Server luistert op http://{server.server_address[0]}:{server.server_address[1]}/ "
+          f"met {werkers} werkers (Ctrl+C om te stoppen)")
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.verwerker.project_manager.storage.sluit()
+    
+    return 0
@@ -0,0 +1,257 @@
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from Models import Project, Task, ProjectStatus
+
+
+# Bestandsindeling (alle getallen little-endian):
+#
+#   kop          KOP: magic, versie, aantal projecten, positie van de map
+#   blokken      een blok per project, zie encodeer_project()
+#   map          per project MAPREGEL, gevolgd door de mapnamen als UTF-8
+#
+# Een blok bevat alleen verwijzingen binnen zichzelf, zodat een ongewijzigd
+# project bij het herschrijven ongezien gekopieerd kan worden.
+MAGIC = b'TMSNAP\r\n'
+VERSIE = 1
+KOP = struct.Struct('<8sIIQ')
+# Blokpositie en -lengte, lengte van de mapnaam, vingerafdruk van de bestanden
+MAPREGEL = struct.Struct('<QQI6q')
+# Naam, beschrijving, status, aanmaakdatum, sluitdatum en aantal taken
+PROJECTREGEL = struct.Struct('<IIBqqI')
+# Titel, beschrijving, prioriteit, status, aanmaakdatum en afrondmoment
+TAAKREGEL = struct.Struct('<IIBBqq')
+TELLER = struct.Struct('<I')
+
+# Waarden voor een ontbrekende tekst of datum
+GEEN_TEKST = 0xFFFFFFFF
+GEEN_DATUM = -2 ** 63
+
+_PROJECTSTATUSSEN = tuple(ProjectStatus)
+_PROJECTSTATUS_NUMMERS = {status: nummer for nummer, status in enumerate(_PROJECTSTATUSSEN)}
+
+Vingerafdruk = Tuple[int, int, int, int, int, int]
+
+
+def encodeer_project(project: Project) -> bytes:
+    """
+    Zet een project om naar een blok: een PROJECTREGEL, een TAAKREGEL per
+    taak en een tekstentabel: het aantal teksten, hun eindposities en de
+    teksten als UTF-8, gescheiden door een nulbyte.
+    """
+    teksten: List[bytes] = []
+    
+    def tekst(waarde: Optional[str]) -> int:
+        if waarde is None:
+            return GEEN_TEKST
+        teksten.append(waarde.encode('utf-8'))
+        return len(teksten) - 1
+    
+    delen = [PROJECTREGEL.pack(
+        tekst(project.naam),
+        tekst(project.beschrijving),
+        _PROJECTSTATUS_NUMMERS[project.status],
+        Task.naar_epoch(project.aanmaakdatum),
+        Task.naar_epoch(project.sluitdatum) if project.sluitdatum else GEEN_DATUM,
+        len(project.tasks)
+    )]
+    
+    for taak in project.tasks:
+        afrondmoment = taak.afrondmoment_epoch
+        delen.append(TAAKREGEL.pack(
+            tekst(taak.titel),
+            tekst(taak.beschrijving),
+            taak.prioriteit_nummer,
+            taak.status_nummer,
+            taak.aanmaakdatum_epoch,
+            GEEN_DATUM if afrondmoment is None else afrondmoment
+        ))
+    
+    eindposities = []
+    positie = 0
+    for waarde in teksten:
+        positie += len(waarde)
+        eindposities.append(positie)
+        positie += 1
+    
+    delen.append(TELLER.pack(len(teksten)))
+    delen.append(struct.pack(f'<{len(teksten)}I', *eindposities))
+    delen.append(b'\0'.join(teksten))
+    
+    return b''.join(delen)
+
+
+def decodeer_project(blok) -> Project:
+    """Zet een blok van encodeer_project() terug om naar een project met al zijn taken"""
+    naam, beschrijving, status, aanmaakdatum, sluitdatum, aantal_taken = (
+        PROJECTREGEL.unpack_from(blok, 0)
+    )
+    taken_einde = PROJECTREGEL.size + aantal_taken * TAAKREGEL.size
+    teksten = _lees_teksten(blok, taken_einde)
+    
+    project = Project(teksten[naam], None if beschrijving == GEEN_TEKST else teksten[beschrijving])
+    project.status = _PROJECTSTATUSSEN[status]
+    project.aanmaakdatum = Task.van_epoch(aanmaakdatum)
+    if sluitdatum != GEEN_DATUM:
+        project.sluitdatum = Task.van_epoch(sluitdatum)
+    
+    uit_opslag = Task.uit_opslag
+    project.herstel_taken([
+        uit_opslag(
+            teksten[titel],
+            None if beschrijving == GEEN_TEKST else teksten[beschrijving],
+            prioriteit,
+            status,
+            aanmaakdatum,
+            None if afrondmoment == GEEN_DATUM else afrondmoment
+        )
+        for titel, beschrijving, prioriteit, status, aanmaakdatum, afrondmoment in (
+            TAAKREGEL.iter_unpack(blok[PROJECTREGEL.size:taken_einde])
+        )
+    ])
+    
+    project.markeer_opgeslagen()
+    return project
+
+
+def _lees_teksten(blok, positie: int) -> List[str]:
+    """Decodeer de tekstentabel van een blok"""
+    aantal, = TELLER.unpack_from(blok, positie)
+    positie += TELLER.size
+    eindposities = struct.unpack_from(f'<{aantal}I', blok, positie)
+    
+    data = bytes(blok[positie + 4 * aantal:])
+    
+    # Snel: alles in een keer decoderen en splitsen op de nulbytes
+    teksten = data.decode('utf-8').split('\0')
+    if len(teksten) == aantal or not aantal:
+        return teksten[:aantal]
+    
+    # Een tekst bevat zelf een nulbyte; gebruik de eindposities
+    teksten = []
+    begin = 0
+    for einde in eindposities:
+        teksten.append(data[begin:einde].decode('utf-8'))
+        begin = einde + 1
+    return teksten
+
+
+def schrijf_snapshot(pad: Path, blokken: Iterable[Tuple[str, Vingerafdruk, bytes]]):
+    """
+    Schrijf een snapshot atomisch weg.
+    
+    Args:
+        pad: Het pad van het snapshotbestand
+        blokken: Per project de mapnaam, de vingerafdruk en het blok
+    """
+    tijdelijk = pad.with_name(pad.name + '.tmp')
+    mapregels = []
+    
+    with open(tijdelijk, 'wb') as f:
+        f.write(b'\0' * KOP.size)
+        
+        for mapnaam, vingerafdruk, blok in blokken:
+            mapregels.append((mapnaam.encode('utf-8'), f.tell(), len(blok), vingerafdruk))
+            f.write(blok)
+        
+        map_positie = f.tell()
+        for naam, positie, lengte, vingerafdruk in mapregels:
+            f.write(MAPREGEL.pack(positie, lengte, len(naam), *vingerafdruk))
+        for naam, _, _, _ in mapregels:
+            f.write(naam)
+        
+        f.seek(0)
+        f.write(KOP.pack(MAGIC, VERSIE, len(mapregels), map_positie))
+        f.flush()
+        os.fsync(f.fileno())
+    
+    os.replace(tijdelijk, pad)
+
+
+class Snapshot:
+    """
+    Een geheugengemapte snapshot van de werkruimte.
+    
+    Bij openen wordt alleen de map met projecten gelezen; een project en zijn
+    taken worden pas gedecodeerd als laad_project() ervoor aangeroepen wordt.
+    Of een project in de snapshot nog klopt, bepaalt de aanroeper door de
+    vingerafdruk van de JSON-bestanden te vergelijken.
+    """
+    
+    def __init__(self, pad: Path):
+        """
+        Args:
+            pad: Het pad van het snapshotbestand
+        
+        Raises:
+            ValueError: Als het bestand geen geldige snapshot is
+        """
+        self.pad = pad
+        self._bestand = open(pad, 'rb')
+        
+        try:
+            self._mmap = mmap.mmap(self._bestand.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Een leeg bestand kan niet gemapt worden
+            self._bestand.close()
+            raise ValueError("Snapshot is leeg")
+        
+        # Blokpositie, bloklengte en vingerafdruk per mapnaam
+        self._projecten: Dict[str, Tuple[int, int, Vingerafdruk]] = {}
+        
+        try:
+            self._lees_map()
+        except (ValueError, struct.error, UnicodeDecodeError):
+            self.sluit()
+            raise ValueError(f"{pad} is geen geldige snapshot")
+    
+    def _lees_map(self):
+        """Lees de kop en de map met projecten"""
+        magic, versie, aantal, map_positie = KOP.unpack_from(self._mmap, 0)
+        
+        if magic != MAGIC or versie != VERSIE:
+            raise ValueError("Onbekende snapshotversie")
+        
+        regels = [
+            MAPREGEL.unpack_from(self._mmap, map_positie + i * MAPREGEL.size)
+            for i in range(aantal)
+        ]
+        
+        naam_positie = map_positie + aantal * MAPREGEL.size
+        for positie, lengte, naamlengte, *vingerafdruk in regels:
+            mapnaam = bytes(self._mmap[naam_positie:naam_positie + naamlengte]).decode('utf-8')
+            naam_positie += naamlengte
+            
+            if positie + lengte > len(self._mmap):
+                raise ValueError("Blok buiten het bestand")
+            self._projecten[mapnaam] = (positie, lengte, tuple(vingerafdruk))
+    
+    def is_geldig(self, mapnaam: str, vingerafdruk: Vingerafdruk) -> bool:
+        """Controleer of de snapshot van een project bij de huidige bestanden hoort"""
+        item = self._projecten.get(mapnaam)
+        return item is not None and item[2] == vingerafdruk
+    
+    def blok(self, mapnaam: str) -> bytes:
+        """Geef het ongedecodeerde blok van een project"""
+        positie, lengte, _ = self._projecten[mapnaam]
+        return self._mmap[positie:positie + lengte]
+    
+    def laad_project(self, mapnaam: str) -> Project:
+        """Decodeer een project met al zijn taken uit de snapshot"""
+        positie, lengte, _ = self._projecten[mapnaam]
+        blok = memoryview(self._mmap)[positie:positie + lengte]
+        
+        try:
+            return decodeer_project(blok)
+        finally:
+            blok.release()
+    
+    def __contains__(self, mapnaam: str) -> bool:
+        return mapnaam in self._projecten
+    
+    def sluit(self):
+        """Sluit de geheugenmapping en het bestand"""
+        self._mmap.close()
+        self._bestand.close()
@@ -0,0 +1,461 @@
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Dict, Any, Sequence
+from Models import (Project, Task, TaskStatus, ProjectStatus, TaskPriority, ProjectSamenvatting,
+                    Wijzigingen, naam_sleutel)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projecten (
+    id INTEGER PRIMARY KEY,
+    naam TEXT NOT NULL,
+    naam_sleutel TEXT NOT NULL UNIQUE,
+    beschrijving TEXT,
+    status TEXT NOT NULL,
+    aanmaakdatum TEXT NOT NULL,
+    sluitdatum TEXT
+);
+
+CREATE TABLE IF NOT EXISTS taken (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL REFERENCES projecten(id) ON DELETE CASCADE,
+    titel TEXT NOT NULL,
+    titel_sleutel TEXT NOT NULL,
+    beschrijving TEXT,
+    prioriteit TEXT NOT NULL,
+    status TEXT NOT NULL,
+    aanmaakdatum TEXT NOT NULL,
+    afrondmoment TEXT,
+    UNIQUE (project_id, titel_sleutel)
+);
+
+CREATE INDEX IF NOT EXISTS idx_projecten_status ON projecten(status);
+CREATE INDEX IF NOT EXISTS idx_projecten_aanmaakdatum ON projecten(aanmaakdatum);
+CREATE INDEX IF NOT EXISTS idx_taken_status ON taken(status);
+CREATE INDEX IF NOT EXISTS idx_taken_prioriteit ON taken(prioriteit);
+CREATE INDEX IF NOT EXISTS idx_taken_aanmaakdatum ON taken(aanmaakdatum);
+CREATE INDEX IF NOT EXISTS idx_taken_afrondmoment ON taken(afrondmoment);
+"""
+
+# PRAGMA user_version; versie 1 heeft sleutels van Models.naam_sleutel
+SCHEMAVERSIE = 1
+
+
+class SqliteStorageManager:
+    """
+    Manager voor persistentie van projecten en taken in een SQLite database.
+    
+    Heeft dezelfde publieke methodes als StorageManager en kan dus in plaats
+    daarvan aan ProjectManager en TaskManager worden meegegeven. Alle
+    projecten en taken staan in een enkel databasebestand; een taakwijziging
+    raakt alleen de betreffende rij.
+    """
+    
+    def __init__(self, database_pad: str = "projects.db"):
+        self.database_pad = Path(database_pad)
+        self._lock = threading.Lock()
+        self._verbinding = sqlite3.connect(str(self.database_pad), check_same_thread=False)
+        self._verbinding.row_factory = sqlite3.Row
+        self._verbinding.execute("PRAGMA foreign_keys = ON")
+        self._verbinding.executescript(SCHEMA)
+        self._verbinding.commit()
+        
+        if self._verbinding.execute("PRAGMA user_version").fetchone()[0] < SCHEMAVERSIE:
+            self._herbereken_sleutels()
+    
+    def _herbereken_sleutels(self):
+        """Zet sleutels uit een oudere database (strip().lower()) om naar naam_sleutel"""
+        try:
+            with self._verbinding:
+                self._verbinding.executemany(
+                    "UPDATE projecten SET naam_sleutel = ? WHERE id = ?",
+                    [(self._sleutel(rij['naam']), rij['id'])
+                     for rij in self._verbinding.execute("SELECT id, naam FROM projecten")]
+                )
+                self._verbinding.executemany(
+                    "UPDATE taken SET titel_sleutel = ? WHERE id = ?",
+                    [(self._sleutel(rij['titel']), rij['id'])
+                     for rij in self._verbinding.execute("SELECT id, titel FROM taken")]
+                )
+                self._verbinding.execute(f"PRAGMA user_version = {SCHEMAVERSIE}")
+        except sqlite3.IntegrityError as e:
+            print(f"Sleutels konden niet bijgewerkt worden, twee namen vallen samen: {e}")
+    
+    def _sleutel(self, naam: str) -> str:
+        """Geef de hoofdletterongevoelige sleutel voor een naam of titel"""
+        return naam_sleutel(naam)
+    
+    def _taak_waarden(self, taak: Task) -> Dict[str, Any]:
+        """Zet een taak om naar kolomwaarden"""
+        return {
+            'titel': taak.titel,
+            'titel_sleutel': self._sleutel(taak.titel),
+            'beschrijving': taak.beschrijving,
+            'prioriteit': taak.prioriteit.value,
+            'status': taak.status.value,
+            'aanmaakdatum': taak.aanmaakdatum.isoformat(),
+            'afrondmoment': taak.afrondmoment.isoformat() if taak.afrondmoment else None
+        }
+    
+    def _rij_naar_taak(self, rij: sqlite3.Row) -> Task:
+        """Maak een taak aan uit een databaserij"""
+        taak = Task(rij['titel'], rij['beschrijving'], TaskPriority(rij['prioriteit']))
+        taak.status = TaskStatus(rij['status'])
+        taak.aanmaakdatum = datetime.fromisoformat(rij['aanmaakdatum'])
+        
+        if rij['afrondmoment']:
+            taak.afrondmoment = datetime.fromisoformat(rij['afrondmoment'])
+        
+        return taak
+    
+    def _rij_naar_project(self, rij: sqlite3.Row) -> Project:
+        """Maak een project (zonder taken) aan uit een databaserij"""
+        project = Project(rij['naam'], rij['beschrijving'])
+        project.status = ProjectStatus(rij['status'])
+        project.aanmaakdatum = datetime.fromisoformat(rij['aanmaakdatum'])
+        
+        if rij['sluitdatum']:
+            project.sluitdatum = datetime.fromisoformat(rij['sluitdatum'])
+        
+        return project
+    
+    def _project_id(self, project_naam: str) -> Optional[int]:
+        """Zoek het id van een project op naam"""
+        rij = self._verbinding.execute(
+            "SELECT id FROM projecten WHERE naam_sleutel = ?",
+            (self._sleutel(project_naam),)
+        ).fetchone()
+        return rij['id'] if rij else None
+    
+    def _sla_projectrij_op(self, project: Project) -> int:
+        """Voeg de projectrij toe of werk hem bij en geef het id terug"""
+        self._verbinding.execute(
+            """
+            INSERT INTO projecten (naam, naam_sleutel, beschrijving, status, aanmaakdatum, sluitdatum)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (naam_sleutel) DO UPDATE SET
+                naam = excluded.naam,
+                beschrijving = excluded.beschrijving,
+                status = excluded.status,
+                aanmaakdatum = excluded.aanmaakdatum,
+                sluitdatum = excluded.sluitdatum
+            """,
+            (
+                project.naam,
+                self._sleutel(project.naam),
+                project.beschrijving,
+                project.status.value,
+                project.aanmaakdatum.isoformat(),
+                project.sluitdatum.isoformat() if project.sluitdatum else None
+            )
+        )
+        return self._project_id(project.naam)
+    
+    def _sla_taakrij_op(self, project_id: int, taak: Task):
+        """Voeg een taakrij toe of werk hem bij"""
+        waarden = self._taak_waarden(taak)
+        waarden['project_id'] = project_id
+        self._verbinding.execute(
+            """
+            INSERT INTO taken (project_id, titel, titel_sleutel, beschrijving,
+                               prioriteit, status, aanmaakdatum, afrondmoment)
+            VALUES (:project_id, :titel, :titel_sleutel, :beschrijving,
+                    :prioriteit, :status, :aanmaakdatum, :afrondmoment)
+            ON CONFLICT (project_id, titel_sleutel) DO UPDATE SET
+                titel = excluded.titel,
+                beschrijving = excluded.beschrijving,
+                prioriteit = excluded.prioriteit,
+                status = excluded.status,
+                aanmaakdatum = excluded.aanmaakdatum,
+                afrondmoment = excluded.afrondmoment
+            """,
+            waarden
+        )
+    
+    def sla_project_op(self, project: Project) -> bool:
+        """
+        Sla een project inclusief alle taken op in de database.
+        
+        Van een bestaand project worden alleen de gewijzigde rijen geschreven.
+        
+        Args:
+            project: Het project dat opgeslagen moet worden
+        
+        Returns:
+            True als succesvol, False anders
+        """
+        # Wat een andere thread tijdens het schrijven wijzigt blijft gemarkeerd
+        wijzigingen = project.neem_wijzigingen()
+        
+        try:
+            with self._lock, self._verbinding:
+                self._schrijf_project(project, wijzigingen)
+            
+            return True
+        
+        except Exception as e:
+            project.herstel_wijzigingen(wijzigingen)
+            print(f"Fout bij opslaan project: {e}")
+            return False
+    
+    def sla_projecten_op(self, projecten: List[Project], verwijderen: Sequence[str] = ()) -> bool:
+        """
+        Sla meerdere projecten alles of niets op in een enkele
+        databasetransactie, zoals bij een Transactie. Te verwijderen
+        projecten worden in dezelfde databasetransactie eerst verwijderd, zodat
+        een project dat ook in projecten staat opnieuw aangemaakt wordt.
+        
+        Args:
+            projecten: De projecten die opgeslagen moeten worden
+            verwijderen: Namen van projecten die verwijderd moeten worden
+        
+        Returns:
+            True als succesvol, False anders
+        """
+        genomen = [(project, project.neem_wijzigingen()) for project in projecten]
+        
+        try:
+            with self._lock, self._verbinding:
+                self._verbinding.executemany(
+                    "DELETE FROM projecten WHERE naam_sleutel = ?",
+                    [(self._sleutel(project_naam),) for project_naam in verwijderen]
+                )
+                for project, wijzigingen in genomen:
+                    self._schrijf_project(project, wijzigingen)
+            
+            return True
+        
+        except Exception as e:
+            for project, wijzigingen in genomen:
+                project.herstel_wijzigingen(wijzigingen)
+            print(f"Fout bij opslaan projecten: {e}")
+            return False
+    
+    def _schrijf_project(self, project: Project, wijzigingen: Wijzigingen):
+        """
+        Schrijf de gewijzigde rijen van een project, volgens wijzigingen van
+        Project.neem_wijzigingen() (aanroeper houdt de lock en de
+        databasetransactie vast).
+        """
+        gegevens_gewijzigd, gewijzigde_taken, taken_verwijderd = wijzigingen
+        nieuw = self._project_id(project.naam) is None
+        
+        if nieuw or gegevens_gewijzigd:
+            project_id = self._sla_projectrij_op(project)
+        else:
+            project_id = self._project_id(project.naam)
+        
+        for taak in (project.tasks if nieuw else gewijzigde_taken):
+            self._sla_taakrij_op(project_id, taak)
+        
+        # Verwijder taken die niet meer in het project zitten
+        if taken_verwijderd:
+            bestaande = self._verbinding.execute(
+                "SELECT titel_sleutel FROM taken WHERE project_id = ?",
+                (project_id,)
+            ).fetchall()
+            
+            huidige = {self._sleutel(taak.titel) for taak in project.tasks}
+            overbodig = [(project_id, rij['titel_sleutel']) for rij in bestaande
+                         if rij['titel_sleutel'] not in huidige]
+            self._verbinding.executemany(
+                "DELETE FROM taken WHERE project_id = ? AND titel_sleutel = ?",
+                overbodig
+            )
+    
+    def sla_taakwijziging_op(self, project: Project, actie: str, taak: Task) -> bool:
+        """
+        Sla een enkele taakwijziging op door alleen de betreffende rij aan te passen.
+        
+        Args:
+            project: Het project waartoe de taak behoort
+            actie: 'toevoegen', 'status' of 'verwijderen'
+            taak: De gewijzigde taak
+        
+        Returns:
+            True als succesvol, False anders
+        """
+        wijzigingen = project.neem_taakwijziging(taak)
+        
+        try:
+            with self._lock, self._verbinding:
+                project_id = self._project_id(project.naam)
+                if project_id is None:
+                    project_id = self._sla_projectrij_op(project)
+                
+                if actie in ('toevoegen', 'status'):
+                    self._sla_taakrij_op(project_id, taak)
+                elif actie == 'verwijderen':
+                    self._verbinding.execute(
+                        "DELETE FROM taken WHERE project_id = ? AND titel_sleutel = ?",
+                        (project_id, self._sleutel(taak.titel))
+                    )
+                else:
+                    raise ValueError(f"Onbekende taakactie '{actie}'")
+            
+            return True
+        
+        except Exception as e:
+            project.herstel_wijzigingen(wijzigingen)
+            print(f"Fout bij opslaan taakwijziging: {e}")
+            return False
+    
+    def laad_project(self, project_naam: str) -> Optional[Project]:
+        """
+        Laad een project uit de database.
+        
+        Args:
+            project_naam: De naam van het project
+        
+        Returns:
+            Het geladen Project object of None
+        """
+        try:
+            with self._lock:
+                rij = self._verbinding.execute(
+                    "SELECT * FROM projecten WHERE naam_sleutel = ?",
+                    (self._sleutel(project_naam),)
+                ).fetchone()
+                
+                if not rij:
+                    return None
+                
+                project = self._rij_naar_project(rij)
+                
+                for taak_rij in self._verbinding.execute(
+                    "SELECT * FROM taken WHERE project_id = ? ORDER BY id",
+                    (rij['id'],)
+                ):
+                    project.herstel_taak(self._rij_naar_taak(taak_rij))
+            
+            project.markeer_opgeslagen()
+            return project
+        
+        except Exception as e:
+            print(f"Fout bij laden project: {e}")
+            return None
+    
+    def laad_alle_projecten(self, werkers: Optional[int] = None) -> List[Project]:
+        """
+        Laad alle projecten uit de database.
+        
+        Alles wordt met twee queries gelezen; werkers bestaat alleen voor
+        uitwisselbaarheid met StorageManager en wordt genegeerd.
+        
+        Returns:
+            Lijst van alle geladen projecten
+        """
+        projecten: Dict[int, Project] = {}
+        
+        try:
+            with self._lock:
+                for rij in self._verbinding.execute("SELECT * FROM projecten ORDER BY id"):
+                    projecten[rij['id']] = self._rij_naar_project(rij)
+                
+                for taak_rij in self._verbinding.execute("SELECT * FROM taken ORDER BY id"):
+                    projecten[taak_rij['project_id']].herstel_taak(self._rij_naar_taak(taak_rij))
+            
+            for project in projecten.values():
+                project.markeer_opgeslagen()
+        
+        except Exception as e:
+            print(f"Fout bij laden projecten: {e}")
+        
+        return list(projecten.values())
+    
+    def laad_catalogus(self) -> List[ProjectSamenvatting]:
+        """
+        Geef een lichte samenvatting van alle projecten zonder taken te laden.
+        
+        Returns:
+            Lijst van projectsamenvattingen
+        """
+        # Een teller per status en per prioriteit, in de volgorde van de enums
+        tellers = ", ".join(
+            ["SUM(t.status = ?)"] * len(TaskStatus) + ["SUM(t.prioriteit = ?)"] * len(TaskPriority)
+        )
+        parameters = [status.value for status in TaskStatus] + [p.value for p in TaskPriority]
+        
+        with self._lock:
+            rijen = self._verbinding.execute(
+                f"""
+                SELECT p.naam, p.status, COUNT(t.id) AS aantal_taken, {tellers}
+                FROM projecten p LEFT JOIN taken t ON t.project_id = p.id
+                GROUP BY p.id
+                ORDER BY p.id
+                """,
+                parameters
+            ).fetchall()
+        
+        samenvattingen = []
+        for rij in rijen:
+            aantallen = [aantal or 0 for aantal in tuple(rij)[3:]]
+            samenvattingen.append(ProjectSamenvatting(
+                rij['naam'], ProjectStatus(rij['status']), rij['aantal_taken'],
+                str(self.database_pad),
+                dict(zip(TaskStatus, aantallen[:len(TaskStatus)])),
+                dict(zip(TaskPriority, aantallen[len(TaskStatus):]))
+            ))
+        
+        return samenvattingen
+    
+    def sla_catalogus_op(self) -> bool:
+        """De catalogus wordt uit de tabellen afgeleid, er is niets op te slaan"""
+        return True
+    
+    def verwijder_project(self, project_naam: str) -> bool:
+        """
+        Verwijder een project inclusief alle taken.
+        
+        Args:
+            project_naam: De naam van het project
+        
+        Returns:
+            True als succesvol, False anders
+        """
+        try:
+            with self._lock, self._verbinding:
+                cursor = self._verbinding.execute(
+                    "DELETE FROM projecten WHERE naam_sleutel = ?",
+                    (self._sleutel(project_naam),)
+                )
+            return cursor.rowcount > 0
+        
+        except Exception as e:
+            print(f"Fout bij verwijderen project: {e}")
+            return False
+    
+    def project_bestaat(self, project_naam: str) -> bool:
+        """
+        Controleer of een project in de database bestaat.
+        
+        Args:
+            project_naam: De naam van het project
+        
+        Returns:
+            True als het project bestaat, False anders
+        """
+        with self._lock:
+            return self._project_id(project_naam) is not None
+    
+    def list_projectmappen(self) -> List[str]:
+        """
+        Geef een lijst van alle projectnamen.
+        
+        Returns:
+            Lijst van projectnamen
+        """
+        with self._lock:
+            return [rij['naam'] for rij in
+                    self._verbinding.execute("SELECT naam FROM projecten ORDER BY id")]
+    
+    def flush(self) -> bool:
+        """Alle wijzigingen worden direct vastgelegd, er is niets weg te schrijven"""
+        return True
+    
+    def sluit(self):
+        """Sluit de databaseverbinding"""
+        with self._lock:
+            self._verbinding.close()
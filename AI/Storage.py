@@ -1,21 +1,110 @@
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Dict, Any
-from Models import Project, Task, TaskStatus, ProjectStatus, TaskPriority
+from typing import List, Optional, Dict, Any, Sequence, Set, Tuple
+from Models import Project, Task, TaskStatus, ProjectStatus, TaskPriority, ProjectSamenvatting, Wijzigingen
+from Codecs import kies_codec
+from Snapshot import Snapshot, Vingerafdruk, encodeer_project, schrijf_snapshot
+from Manifest import Manifest, gespreid_pad
+from Archief import Archief
+from Vergrendeling import Projectslot, VersieConflict, lees_versie
+
+
+JOURNAL_BESTAND = 'journal.jsonl'
+CATALOGUS_BESTAND = 'catalogus.json'
+SNAPSHOT_BESTAND = 'snapshot.bin'
+MIGRATIEMAP = '.migratie'
+# project.json van een project dat in sla_projecten_op() verwijderd wordt
+VERWIJDERD_BESTAND = 'project.json.verwijderd'
+
+# Versie 1: tasks.json is een lijst van dicts met ISO-datums, project.json
+# heeft geen versieveld. Versie 2: beide hebben een veld 'formaat'; taken
+# staan als rijen volgens TAAKVELDEN met datums in microseconden sinds 1970.
+FORMAATVERSIE = 2
+TAAKVELDEN = ['titel', 'beschrijving', 'prioriteit', 'status', 'aanmaakdatum', 'afrondmoment']
 
 
 class StorageManager:
     """Manager voor persistentie van projecten en taken op schijf"""
     
-    def __init__(self, base_path: str = "projects"):
+    def __init__(self, base_path: str = "projects", journal_drempel: int = 256 * 1024,
+                 laad_werkers: int = 1, codec: str = "snel", snapshot: bool = True,
+                 gespreid: Optional[bool] = None):
+        """
+        Args:
+            base_path: De map waarin de projecten worden opgeslagen
+            journal_drempel: Grootte in bytes waarboven het journal van een
+                project wordt samengevoegd tot een nieuwe tasks.json
+            laad_werkers: Aantal threads waarmee projecten tegelijk worden
+                geladen (1 is na elkaar)
+            codec: Codec voor het schrijven, zie Codecs.kies_codec
+            snapshot: Schrijf bij sluit() een binaire snapshot en laad
+                projecten daaruit zolang hun bestanden niet gewijzigd zijn
+            gespreid: Gebruik de gespreide indeling met een manifest, zie
+                migreer_naar_gespreid(); None volgt de bestaande werkruimte
+        """
         self.base_path = Path(base_path)
         self.base_path.mkdir(exist_ok=True)
+        self.codec = kies_codec(codec)
+        self.journal_drempel = journal_drempel
+        self.laad_werkers = laad_werkers
+        # Fouten per projectmap van de laatste laad_alle_projecten
+        self.laadfouten: Dict[str, str] = {}
+        # Bytes die niet geschreven hoefden te worden omdat een bestand ongewijzigd was
+        self.overgeslagen_bytes = 0
+        # Huidige journalgrootte (bytes) per projectmap
+        self._journal_groottes: Dict[str, int] = {}
+        # Catalogus per projectmap, wordt pas bij eerste gebruik gelezen
+        self._catalogus: Optional[Dict[str, ProjectSamenvatting]] = None
+        # Vingerafdruk van de map (of het pack) waar elke vermelding bij hoort
+        self._catalogus_vingerafdrukken: Dict[str, Tuple[int, ...]] = {}
+        # Mappen waarvan dit proces de vermelding gewijzigd of verwijderd
+        # heeft sinds de catalogus voor het laatst geschreven is
+        self._catalogus_gewijzigd: Set[str] = set()
+        # Maken gelijktijdig gebruik uit meerdere threads veilig, zolang een
+        # project maar door een thread tegelijk gewijzigd wordt
+        self._catalogus_lock = threading.RLock()
+        self._snapshot_lock = threading.Lock()
+        self.gebruik_snapshot = snapshot
+        # Snapshot van de vorige sessie, wordt pas bij eerste gebruik geopend
+        self._snapshot: Optional[Snapshot] = None
+        self._snapshot_geopend = False
+        # Projecten die in deze sessie geladen of opgeslagen zijn, per
+        # projectmap, met de vingerafdruk van de bestanden op dat moment;
+        # deze gaan bij sluit() in de nieuwe snapshot
+        self._bekende_projecten: Dict[str, Tuple[Project, Vingerafdruk]] = {}
+        # Vingerafdruk per projectmap van de laatste keer dat geheugen (of
+        # catalogus) en schijf gelijk waren, voor wijzigingen(); voor een
+        # gearchiveerd project die van zijn pack
+        self._vingerafdrukken: Dict[str, Tuple[int, ...]] = {}
+        # Metingen.Metingen die gelezen en geschreven bytes telt; None als
+        # er niet gemeten wordt
+        self.metingen = None
+        
+        # Projectmappen in base_path/ab/cd/<mapnaam> met een manifest van
+        # alle projecten, in plaats van direct onder base_path
+        self.manifest = Manifest(self.base_path)
+        self.gespreid = Manifest.bestaat(self.base_path) or (self.base_path / MIGRATIEMAP).exists()
+        if (gespreid and not self.gespreid) or (self.base_path / MIGRATIEMAP).exists():
+            # Nieuw gevraagd, of een onderbroken migratie afmaken
+            self.migreer_naar_gespreid()
+        
+        # Gecomprimeerde packs van gesloten projecten, zie archiveer_project()
+        self.archief = Archief(self.base_path)
     
     def _project_folder(self, project_naam: str) -> Path:
         """Geef het mappad voor een project"""
-        return self.base_path / self._saniteer_mapnaam(project_naam)
+        return self._map_pad(self._saniteer_mapnaam(project_naam))
+    
+    def _map_pad(self, mapnaam: str) -> Path:
+        """Geef het pad van een projectmap in de indeling van de werkruimte"""
+        if self.gespreid:
+            return gespreid_pad(self.base_path, mapnaam)
+        return self.base_path / mapnaam
     
     def _saniteer_mapnaam(self, naam: str) -> str:
         """Zet projectnaam om naar een geldige mapnaam"""
@@ -25,22 +114,243 @@ class StorageManager:
             naam = naam.replace(char, '_')
         return naam.strip()
     
-    def sla_project_op(self, project: Project) -> bool:
+    def _project_mappen(self) -> List[str]:
+        """Geef de namen van alle projectmappen, gesorteerd"""
+        if self.gespreid:
+            return sorted(self.manifest.projecten())
+        
+        if not self.base_path.exists():
+            return []
+        
+        with os.scandir(self.base_path) as items:
+            return sorted(item.name for item in items if item.is_dir())
+    
+    def _schrijf_bestand(self, pad: Path, data: Any, uitgesteld: Optional[list] = None):
+        """
+        Schrijf data met de codec atomisch weg: eerst naar een tijdelijk
+        bestand, dat daarna het echte bestand vervangt. Een crash laat zo
+        nooit een half geschreven bestand achter.
+        
+        Met een lijst uitgesteld wordt alleen het tijdelijke bestand
+        geschreven en (tijdelijk, pad) aan de lijst toegevoegd; de aanroeper
+        zet het later op zijn plaats.
+        """
+        tijdelijk = pad.with_name(pad.name + '.tmp')
+        inhoud = self.codec.encodeer(data)
+        
+        with open(tijdelijk, 'wb') as f:
+            f.write(inhoud)
+            f.flush()
+            os.fsync(f.fileno())
+        
+        if uitgesteld is not None:
+            uitgesteld.append((tijdelijk, pad))
+        else:
+            os.replace(tijdelijk, pad)
+        
+        if self.metingen:
+            self.metingen.geschreven(len(inhoud))
+    
+    def _lees_bestand(self, pad: Path) -> Any:
+        """Lees een JSON-bestand van elk formaat en elke codec"""
+        with open(pad, 'rb') as f:
+            inhoud = f.read()
+        
+        if self.metingen:
+            self.metingen.gelezen(len(inhoud))
+        return self.codec.decodeer(inhoud)
+    
+    def _taak_naar_rij(self, taak: Task) -> List[Any]:
+        """Zet een taak om naar een rij volgens TAAKVELDEN (formaat 2)"""
+        return [
+            taak.titel,
+            taak.beschrijving,
+            taak.prioriteit.value,
+            taak.status.value,
+            taak.aanmaakdatum_epoch,
+            taak.afrondmoment_epoch
+        ]
+    
+    def _lees_taken(self, taken_data: Any) -> List[Task]:
+        """Maak taken aan uit de inhoud van tasks.json, formaat 1 of 2"""
+        # Formaat 1: een lijst van dicts
+        if isinstance(taken_data, list):
+            return [self._dict_naar_taak(taak_data) for taak_data in taken_data]
+        
+        if taken_data.get('formaat', 0) > FORMAATVERSIE:
+            raise ValueError(f"tasks.json heeft onbekend formaat {taken_data['formaat']}")
+        
+        velden = taken_data['velden']
+        titel, beschrijving, prioriteit, status, aanmaakdatum, afrondmoment = (
+            velden.index(veld) for veld in TAAKVELDEN
+        )
+        
+        taken = []
+        for rij in taken_data['taken']:
+            taak = Task(rij[titel], rij[beschrijving], TaskPriority(rij[prioriteit]))
+            taak.status = TaskStatus(rij[status])
+            taak.aanmaakdatum_epoch = rij[aanmaakdatum]
+            taak.afrondmoment_epoch = rij[afrondmoment]
+            taken.append(taak)
+        
+        return taken
+    
+    def _taak_naar_dict(self, taak: Task) -> Dict[str, Any]:
+        """Zet een taak om naar een dictionary voor opslag"""
+        return {
+            'titel': taak.titel,
+            'beschrijving': taak.beschrijving,
+            'prioriteit': taak.prioriteit.value,
+            'status': taak.status.value,
+            'aanmaakdatum': taak.aanmaakdatum.isoformat(),
+            'afrondmoment': taak.afrondmoment.isoformat() if taak.afrondmoment else None
+        }
+    
+    def _dict_naar_taak(self, taak_data: Dict[str, Any]) -> Task:
+        """Maak een taak aan uit een opgeslagen dictionary"""
+        taak = Task(
+            taak_data['titel'],
+            taak_data.get('beschrijving'),
+            TaskPriority(taak_data['prioriteit'])
+        )
+        
+        taak.status = TaskStatus(taak_data['status'])
+        taak.aanmaakdatum = datetime.fromisoformat(taak_data['aanmaakdatum'])
+        
+        if taak_data.get('afrondmoment'):
+            taak.afrondmoment = datetime.fromisoformat(taak_data['afrondmoment'])
+        
+        return taak
+    
+    def sla_project_op(self, project: Project, volledig: bool = False) -> bool:
         """
         Sla een project op in de bestandssysteem.
         
+        Alleen bestanden met wijzigingen worden geschreven: project.json als
+        de projectgegevens gewijzigd zijn, tasks.json als er taken gewijzigd
+        zijn of het journal nog wijzigingen bevat. De grootte van overgeslagen
+        bestanden wordt bijgehouden in overgeslagen_bytes.
+        
+        Het project wordt vergrendeld tijdens het schrijven. Als een ander
+        proces het project sinds het laden heeft opgeslagen, wordt er niets
+        geschreven en volgt een VersieConflict.
+        
         Args:
             project: Het project dat opgeslagen moet worden
+            volledig: Schrijf alle bestanden, ook als ze niet gewijzigd zijn
         
         Returns:
             True als succesvol, False anders
+        
+        Raises:
+            VersieConflict: Als het project intussen door een ander proces gewijzigd is
         """
         try:
             project_folder = self._project_folder(project.naam)
             project_folder.mkdir(parents=True, exist_ok=True)
+            if self.gespreid and project_folder.name not in self.manifest.projecten():
+                self.manifest.voeg_toe(project_folder.name, project.naam)
+            
+            with Projectslot(project_folder) as slot:
+                slot.controleer(project.naam, project.versie)
+                uitgesteld, genomen = self._zet_klaar([(project, project_folder)], volledig)
+                # De versie pas ophogen als de bestanden vervangen zijn, en
+                # alleen als er iets geschreven is
+                try:
+                    if uitgesteld:
+                        self._zet_op_plaats(uitgesteld)
+                        project.versie = slot.verhoog()
+                except BaseException:
+                    self._herstel_wijzigingen(genomen)
+                    raise
+                # Binnen het slot, zodat een schrijfactie van een ander proces
+                # hierna een andere vingerafdruk geeft
+                self._onthoud_project(project_folder, project)
+                # Een gearchiveerd project staat nu weer volledig in zijn map
+                self.archief.verwijder(project_folder.name)
+            
+            self._werk_catalogus_bij(project, project_folder.name)
+            self.sla_catalogus_op()
             
-            # Sla projectgegevens op
+            return True
+        
+        except VersieConflict:
+            raise
+        
+        except Exception as e:
+            print(f"Fout bij opslaan project: {e}")
+            return False
+    
+    def _zet_klaar(self, projecten: List[Tuple[Project, Path]],
+                   volledig: bool = False) -> Tuple[list, list]:
+        """
+        Neem de wijzigingen van projecten over en schrijf hun gewijzigde
+        bestanden naar tijdelijke bestanden (aanroeper houdt de sloten vast),
+        zie _schrijf_project().
+        
+        De wijzigingen worden overgenomen voordat er iets gecodeerd wordt;
+        wat een andere thread intussen wijzigt blijft dus gemarkeerd voor
+        de volgende opslag.
+        
+        Returns:
+            Tuple van (lijst van (tijdelijk, pad) voor _zet_op_plaats(), leeg
+            als er niets geschreven hoeft te worden; lijst van (project,
+            wijzigingen) voor _herstel_wijzigingen() als het vervangen nog
+            mislukt). Bij een fout worden de tijdelijke bestanden opgeruimd
+            en de wijzigingen hersteld.
+        """
+        uitgesteld = []
+        genomen = []
+        try:
+            for project, project_folder in projecten:
+                wijzigingen = project.neem_wijzigingen()
+                genomen.append((project, wijzigingen))
+                self._schrijf_project(project, project_folder, wijzigingen, volledig, uitgesteld)
+        except BaseException:
+            self._ruim_op(uitgesteld)
+            self._herstel_wijzigingen(genomen)
+            raise
+        return uitgesteld, genomen
+    
+    def _ruim_op(self, uitgesteld: list):
+        """Verwijder de tijdelijke bestanden van _zet_klaar()"""
+        for tijdelijk, _ in uitgesteld:
+            if tijdelijk is not None:
+                tijdelijk.unlink(missing_ok=True)
+    
+    def _herstel_wijzigingen(self, genomen: List[Tuple[Project, Wijzigingen]]):
+        """Markeer de wijzigingen uit _zet_klaar() weer als niet opgeslagen"""
+        for project, wijzigingen in genomen:
+            project.herstel_wijzigingen(wijzigingen)
+    
+    def _zet_op_plaats(self, uitgesteld: list):
+        """Vervang de bestanden door hun tijdelijke versie en verwijder overbodige journals"""
+        for tijdelijk, pad in uitgesteld:
+            if tijdelijk is not None:
+                os.replace(tijdelijk, pad)
+            elif pad.exists():
+                pad.unlink()
+    
+    def _schrijf_project(self, project: Project, project_folder: Path, wijzigingen: Wijzigingen,
+                         volledig: bool = False, uitgesteld: Optional[list] = None):
+        """
+        Schrijf de gewijzigde bestanden van een project (aanroeper houdt het slot vast).
+        
+        Welke bestanden gewijzigd zijn volgt uit wijzigingen, van
+        Project.neem_wijzigingen().
+        
+        Met een lijst uitgesteld worden de bestanden alleen klaargezet, zie
+        _schrijf_bestand(); een overbodig journal komt dan als (None, pad) in
+        de lijst.
+        """
+        project_file = project_folder / 'project.json'
+        tasks_file = project_folder / 'tasks.json'
+        gegevens_gewijzigd, gewijzigde_taken, taken_verwijderd = wijzigingen
+        
+        # Sla projectgegevens op
+        if volledig or gegevens_gewijzigd or not project_file.exists():
             project_data = {
+                'formaat': FORMAATVERSIE,
                 'naam': project.naam,
                 'beschrijving': project.beschrijving,
                 'status': project.status.value,
@@ -48,28 +358,158 @@ class StorageManager:
                 'sluitdatum': project.sluitdatum.isoformat() if project.sluitdatum else None
             }
             
-            with open(project_folder / 'project.json', 'w', encoding='utf-8') as f:
-                json.dump(project_data, f, ensure_ascii=False, indent=2)
+            self._schrijf_bestand(project_file, project_data, uitgesteld)
+        else:
+            self.overgeslagen_bytes += project_file.stat().st_size
+        
+        # Sla taken op
+        if (volledig or gewijzigde_taken or taken_verwijderd
+                or self._journal_grootte(project_folder) > 0 or not tasks_file.exists()):
+            taken_data = {
+                'formaat': FORMAATVERSIE,
+                'velden': TAAKVELDEN,
+                'taken': [self._taak_naar_rij(taak) for taak in project.tasks]
+            }
+            
+            self._schrijf_bestand(tasks_file, taken_data, uitgesteld)
+            
+            # De nieuwe tasks.json bevat alle wijzigingen, het journal is niet meer nodig
+            journal_file = project_folder / JOURNAL_BESTAND
+            if uitgesteld is not None:
+                uitgesteld.append((None, journal_file))
+            elif journal_file.exists():
+                journal_file.unlink()
+            self._journal_groottes[project_folder.name] = 0
+        else:
+            self.overgeslagen_bytes += tasks_file.stat().st_size
+    
+    def sla_projecten_op(self, projecten: List[Project], verwijderen: Sequence[str] = ()) -> bool:
+        """
+        Sla meerdere projecten alles of niets op, zoals bij een Transactie.
+        
+        Alle projecten worden eerst vergrendeld en gecontroleerd; bij een
+        VersieConflict is er dus niets geschreven. Daarna worden alle
+        bestanden naar tijdelijke bestanden geschreven en pas als dat voor
+        elk project gelukt is op hun plaats gezet.
+        
+        Te verwijderen projecten horen bij dezelfde stap: hun project.json
+        wordt onder het slot opzij gezet en bij een fout teruggezet. De rest
+        van de map wordt pas opgeruimd als alles geschreven is. Een project
+        dat ook in projecten staat is opnieuw aangemaakt en vervangt zijn
+        voorganger volledig.
+        
+        Args:
+            projecten: De projecten die opgeslagen moeten worden
+            verwijderen: Namen van projecten die verwijderd moeten worden
+        
+        Returns:
+            True als succesvol, False anders
+        
+        Raises:
+            VersieConflict: Als een van de projecten intussen door een ander proces gewijzigd is
+        """
+        try:
+            per_map = {self._project_folder(project.naam): project for project in projecten}
+            verwijderd = {self._project_folder(project_naam) for project_naam in verwijderen}
+            opnieuw = verwijderd & set(per_map)
+            weg = [project_folder for project_folder in verwijderd - opnieuw
+                   if (project_folder / 'project.json').exists()]
+            # Vaste volgorde, zodat twee processen elkaars sloten niet half vasthouden
+            mappen = sorted(set(per_map) | set(weg), key=str)
+            opslaan = [project_folder for project_folder in mappen if project_folder in per_map]
+            
+            for project_folder in opslaan:
+                project_folder.mkdir(parents=True, exist_ok=True)
+                if self.gespreid and project_folder.name not in self.manifest.projecten():
+                    self.manifest.voeg_toe(project_folder.name, per_map[project_folder].naam)
             
-            # Sla taken op
-            taken_data = []
-            for taak in project.tasks:
-                taken_data.append({
-                    'titel': taak.titel,
-                    'beschrijving': taak.beschrijving,
-                    'prioriteit': taak.prioriteit.value,
-                    'status': taak.status.value,
-                    'aanmaakdatum': taak.aanmaakdatum.isoformat(),
-                    'afrondmoment': taak.afrondmoment.isoformat() if taak.afrondmoment else None
-                })
+            with ExitStack() as sloten:
+                per_slot = {project_folder: sloten.enter_context(Projectslot(project_folder))
+                            for project_folder in mappen}
+                
+                for project_folder in opslaan:
+                    if project_folder not in opnieuw:
+                        per_slot[project_folder].controleer(per_map[project_folder].naam,
+                                                            per_map[project_folder].versie)
+                
+                klaar = []
+                try:
+                    for project_folder in opslaan:
+                        klaar.append(self._zet_klaar([(per_map[project_folder], project_folder)],
+                                                     project_folder in opnieuw))
+                except BaseException:
+                    for uitgesteld, genomen in klaar:
+                        self._ruim_op(uitgesteld)
+                        self._herstel_wijzigingen(genomen)
+                    raise
+                
+                # Pas ophogen als alle bestanden vervangen zijn, en alleen voor
+                # projecten waarvan iets geschreven is
+                opzij = []
+                try:
+                    for project_folder in weg:
+                        project_file = project_folder / 'project.json'
+                        os.replace(project_file, project_file.with_name(VERWIJDERD_BESTAND))
+                        opzij.append(project_file)
+                    for uitgesteld, _ in klaar:
+                        self._zet_op_plaats(uitgesteld)
+                except BaseException:
+                    for project_file in opzij:
+                        os.replace(project_file.with_name(VERWIJDERD_BESTAND), project_file)
+                    for _, genomen in klaar:
+                        self._herstel_wijzigingen(genomen)
+                    raise
+                
+                for (uitgesteld, _), project_folder in zip(klaar, opslaan):
+                    project = per_map[project_folder]
+                    if uitgesteld:
+                        project.versie = per_slot[project_folder].verhoog()
+                    self._onthoud_project(project_folder, project)
+                    self.archief.verwijder(project_folder.name)
             
-            with open(project_folder / 'tasks.json', 'w', encoding='utf-8') as f:
-                json.dump(taken_data, f, ensure_ascii=False, indent=2)
+            with self._catalogus_lock:
+                for project_folder in verwijderd - opnieuw:
+                    self._verwijder_map(project_folder, True)
+                for project_folder, project in per_map.items():
+                    self._werk_catalogus_bij(project, project_folder.name)
+                self.sla_catalogus_op()
             
             return True
         
+        except VersieConflict:
+            raise
+        
         except Exception as e:
-            print(f"Fout bij opslaan project: {e}")
+            print(f"Fout bij opslaan projecten: {e}")
+            return False
+    
+    def herlaad_project(self, project: Project) -> bool:
+        """
+        Laad een project opnieuw van schijf in het bestaande object, na een
+        VersieConflict. Niet opgeslagen wijzigingen gaan daarbij verloren.
+        
+        Args:
+            project: Het project dat opnieuw geladen moet worden
+        
+        Returns:
+            True als succesvol, False anders
+        """
+        try:
+            project_folder = self._project_folder(project.naam)
+            actueel = self._lees_map_of_archief(project_folder.name)
+            if actueel is None:
+                return False
+            
+            project.neem_over(actueel)
+            
+            if project_folder.name in self._bekende_projecten:
+                self._bekende_projecten[project_folder.name] = (
+                    project, self._bekende_projecten[project_folder.name][1]
+                )
+            return True
+        
+        except Exception as e:
+            print(f"Fout bij herladen project: {e}")
             return False
     
     def laad_project(self, project_naam: str) -> Optional[Project]:
@@ -83,81 +523,848 @@ class StorageManager:
             Het geladen Project object of None
         """
         try:
-            project_folder = self._project_folder(project_naam)
-            
-            if not project_folder.exists():
-                return None
-            
-            # Laad projectgegevens
-            project_file = project_folder / 'project.json'
-            if not project_file.exists():
-                return None
-            
-            with open(project_file, 'r', encoding='utf-8') as f:
-                project_data = json.load(f)
-            
-            # Recreïer project
-            project = Project(
-                project_data['naam'],
-                project_data.get('beschrijving')
-            )
-            
-            project.status = ProjectStatus(project_data['status'])
-            project.aanmaakdatum = datetime.fromisoformat(project_data['aanmaakdatum'])
+            return self._lees_map_of_archief(self._saniteer_mapnaam(project_naam))
+        
+        except Exception as e:
+            print(f"Fout bij laden project: {e}")
+            return None
+    
+    def _lees_map_of_archief(self, mapnaam: str) -> Optional[Project]:
+        """Lees een project uit zijn map, of uit zijn pack als het gearchiveerd is"""
+        project = self._lees_project(self._map_pad(mapnaam))
+        if project is None:
+            # Van voor het lezen, zodat een pack dat intussen vervangen wordt opvalt
+            vingerafdruk = self.archief.vingerafdruk(mapnaam)
+            project = self.archief.pak_uit(mapnaam)
+            if project is not None:
+                self._vingerafdrukken[mapnaam] = vingerafdruk
+        return project
+    
+    def _lees_project(self, project_folder: Path, slot_vast: bool = False) -> Optional[Project]:
+        """
+        Lees een project uit zijn map.
+        
+        Geeft None als de map geen project bevat en laat fouten bij het lezen
+        door aan de aanroeper.
+        
+        Args:
+            project_folder: De projectmap
+            slot_vast: De aanroeper houdt het slot van het project al vast
+        """
+        # Laad projectgegevens
+        project_file = project_folder / 'project.json'
+        if not project_file.exists():
+            return None
+        
+        if slot_vast:
+            versie, vingerafdruk, project = self._lees_versie_en_project(project_folder)
+        else:
+            # Onder een gedeeld slot, zodat versie en gegevens bij elkaar horen
+            with Projectslot(project_folder, gedeeld=True):
+                versie, vingerafdruk, project = self._lees_versie_en_project(project_folder)
+        project.versie = versie
+        
+        self._vingerafdrukken[project_folder.name] = vingerafdruk
+        if self.gebruik_snapshot:
+            self._bekende_projecten[project_folder.name] = (project, vingerafdruk)
+        
+        # Herstel eventueel verouderde tellers in de catalogus
+        if self._catalogus is not None:
+            self._werk_catalogus_bij(project, project_folder.name)
+        
+        return project
+    
+    def _lees_versie_en_project(self, project_folder: Path) -> Tuple[int, Vingerafdruk, Project]:
+        """Lees versie, vingerafdruk en gegevens van een project (aanroeper houdt het slot vast)"""
+        versie = lees_versie(project_folder)
+        vingerafdruk = self._vingerafdruk(project_folder)
+        self._journal_groottes.pop(project_folder.name, None)
+        
+        project = self._lees_uit_snapshot(project_folder, vingerafdruk)
+        if project is None:
+            project = self._lees_uit_json(project_folder)
+        return versie, vingerafdruk, project
+    
+    def _lees_uit_snapshot(self, project_folder: Path,
+                           vingerafdruk: Vingerafdruk) -> Optional[Project]:
+        """Lees een project uit de snapshot, of geef None als die niet meer klopt"""
+        snapshot = self._haal_snapshot()
+        
+        if not snapshot or not snapshot.is_geldig(project_folder.name, vingerafdruk):
+            return None
+        
+        try:
+            return snapshot.laad_project(project_folder.name)
+        except Exception as e:
+            print(f"Snapshot van {project_folder.name} onleesbaar, JSON wordt gebruikt: {e}")
+            return None
+    
+    def _lees_uit_json(self, project_folder: Path) -> Project:
+        """Lees een project uit project.json, tasks.json en het journal"""
+        project_data = self._lees_bestand(project_folder / 'project.json')
+        
+        if project_data.get('formaat', 1) > FORMAATVERSIE:
+            raise ValueError(f"project.json heeft onbekend formaat {project_data['formaat']}")
+        
+        # Recreïer project
+        project = Project(
+            project_data['naam'],
+            project_data.get('beschrijving')
+        )
+        
+        project.status = ProjectStatus(project_data['status'])
+        project.aanmaakdatum = datetime.fromisoformat(project_data['aanmaakdatum'])
+        
+        if project_data.get('sluitdatum'):
+            project.sluitdatum = datetime.fromisoformat(project_data['sluitdatum'])
+        
+        # Laad taken
+        tasks_file = project_folder / 'tasks.json'
+        if tasks_file.exists():
+            project.herstel_taken(self._lees_taken(self._lees_bestand(tasks_file)))
+        
+        # Speel wijzigingen van na de laatste tasks.json af
+        self._speel_journal_af(project, project_folder)
+        
+        # Wat van schijf komt hoeft niet opnieuw geschreven te worden
+        project.markeer_opgeslagen()
+        
+        return project
+    
+    def sla_taakwijziging_op(self, project: Project, actie: str, taak: Task) -> bool:
+        """
+        Sla een enkele taakwijziging op door een regel aan het journal toe te voegen.
+        
+        In plaats van het hele project opnieuw weg te schrijven wordt alleen de
+        wijziging bewaard. Zodra het journal groter wordt dan journal_drempel
+        wordt het samengevoegd tot een nieuwe tasks.json.
+        
+        Args:
+            project: Het project waartoe de taak behoort
+            actie: 'toevoegen', 'status' of 'verwijderen'
+            taak: De gewijzigde taak
+        
+        Returns:
+            True als succesvol, False anders
+        
+        Raises:
+            VersieConflict: Als het project intussen door een ander proces gewijzigd is
+        """
+        try:
+            project_folder = self._project_folder(project.naam)
             
-            if project_data.get('sluitdatum'):
-                project.sluitdatum = datetime.fromisoformat(project_data['sluitdatum'])
+            # Zonder bestaand project is er niets om op voort te bouwen
+            if not (project_folder / 'project.json').exists():
+                return self.sla_project_op(project)
             
-            # Laad taken
-            tasks_file = project_folder / 'tasks.json'
-            if tasks_file.exists():
-                with open(tasks_file, 'r', encoding='utf-8') as f:
-                    taken_data = json.load(f)
+            # Alleen de wijziging van deze taak komt in het journal; wat intussen
+            # nog gewijzigd wordt blijft gemarkeerd voor de volgende opslag. Zolang
+            # er een journal is wordt tasks.json bij opslaan altijd herschreven,
+            # dus ook andere verwijderde taken gaan niet verloren.
+            wijzigingen = project.neem_taakwijziging(taak, verwijderd=actie == 'verwijderen')
+            try:
+                if actie == 'toevoegen':
+                    record = {'actie': actie, 'taak': self._taak_naar_dict(taak)}
+                elif actie == 'status':
+                    record = {
+                        'actie': actie,
+                        'titel': taak.titel,
+                        'status': taak.status.value,
+                        'afrondmoment': taak.afrondmoment.isoformat() if taak.afrondmoment else None
+                    }
+                elif actie == 'verwijderen':
+                    record = {'actie': actie, 'titel': taak.titel}
+                else:
+                    raise ValueError(f"Onbekende journalactie '{actie}'")
+                
+                regel = json.dumps(record, ensure_ascii=False) + '\n'
+                samengevoegd = False
                 
-                for taak_data in taken_data:
-                    taak = Task(
-                        taak_data['titel'],
-                        taak_data.get('beschrijving'),
-                        TaskPriority(taak_data['prioriteit'])
-                    )
+                with Projectslot(project_folder) as slot:
+                    slot.controleer(project.naam, project.versie)
+                    
+                    with open(project_folder / JOURNAL_BESTAND, 'a', encoding='utf-8') as f:
+                        f.write(regel)
                     
-                    taak.status = TaskStatus(taak_data['status'])
-                    taak.aanmaakdatum = datetime.fromisoformat(taak_data['aanmaakdatum'])
+                    regel_bytes = len(regel.encode('utf-8'))
+                    if self.metingen:
+                        self.metingen.geschreven(regel_bytes)
                     
-                    if taak_data.get('afrondmoment'):
-                        taak.afrondmoment = datetime.fromisoformat(taak_data['afrondmoment'])
+                    grootte = self._journal_grootte(project_folder) + regel_bytes
+                    self._journal_groottes[project_folder.name] = grootte
                     
-                    project.tasks.append(taak)
+                    if grootte >= self.journal_drempel:
+                        uitgesteld, genomen = self._zet_klaar([(project, project_folder)])
+                        try:
+                            self._zet_op_plaats(uitgesteld)
+                        except BaseException:
+                            self._herstel_wijzigingen(genomen)
+                            raise
+                        samengevoegd = True
+                    
+                    # Pas ophogen nu het journal (en eventueel tasks.json) geschreven is
+                    project.versie = slot.verhoog()
+                    self._onthoud_project(project_folder, project)
+            except BaseException:
+                project.herstel_wijzigingen(wijzigingen)
+                raise
+            
+            # Alleen in het geheugen; de catalogus wordt bij flush() geschreven,
+            # of direct als het journal samengevoegd is
+            self._werk_catalogus_bij(project, project_folder.name)
+            if samengevoegd:
+                self.sla_catalogus_op()
             
-            return project
+            return True
+        
+        except VersieConflict:
+            raise
         
         except Exception as e:
-            print(f"Fout bij laden project: {e}")
-            return None
+            print(f"Fout bij opslaan taakwijziging: {e}")
+            return False
+    
+    def _journal_grootte(self, project_folder: Path) -> int:
+        """Geef de bekende grootte van het journal van een project"""
+        if project_folder.name not in self._journal_groottes:
+            journal_file = project_folder / JOURNAL_BESTAND
+            grootte = journal_file.stat().st_size if journal_file.exists() else 0
+            self._journal_groottes[project_folder.name] = grootte
+        return self._journal_groottes[project_folder.name]
+    
+    def _speel_journal_af(self, project: Project, project_folder: Path):
+        """
+        Pas de journalregels van een project toe op de geladen taken.
+        
+        Een onvolledige laatste regel (bijvoorbeeld na een crash tijdens het
+        schrijven) wordt overgeslagen.
+        """
+        journal_file = project_folder / JOURNAL_BESTAND
+        if not journal_file.exists():
+            self._journal_groottes[project_folder.name] = 0
+            return
+        
+        with open(journal_file, 'r', encoding='utf-8') as f:
+            for regel in f:
+                try:
+                    record = json.loads(regel)
+                except ValueError:
+                    continue
+                
+                actie = record.get('actie')
+                
+                if actie == 'toevoegen':
+                    project.herstel_taak(self._dict_naar_taak(record['taak']))
+                elif actie == 'status':
+                    taak = project.zoek_taak(record['titel'])
+                    if taak:
+                        taak.status = TaskStatus(record['status'])
+                        if record.get('afrondmoment'):
+                            taak.afrondmoment = datetime.fromisoformat(record['afrondmoment'])
+                elif actie == 'verwijderen':
+                    taak = project.zoek_taak(record['titel'])
+                    if taak:
+                        project.verwijder_taak(taak)
+        
+        self._journal_groottes[project_folder.name] = journal_file.stat().st_size
+        
+        if self.metingen:
+            self.metingen.gelezen(self._journal_groottes[project_folder.name])
     
-    def laad_alle_projecten(self) -> List[Project]:
+    def laad_alle_projecten(self, werkers: Optional[int] = None) -> List[Project]:
         """
         Laad alle projecten van schijf.
         
+        Met meer dan een werker worden projecten tegelijk gelezen, wat helpt
+        op trage of netwerkschijven. De volgorde is altijd die van de
+        mapnamen. Een project dat niet geladen kan worden wordt overgeslagen
+        en vastgelegd in self.laadfouten.
+        
+        Args:
+            werkers: Aantal threads, standaard self.laad_werkers
+        
         Returns:
             Lijst van alle geladen projecten
         """
         projecten = []
+        self.laadfouten = {}
         
         if not self.base_path.exists():
             return projecten
         
-        # Itereer door alle mappen in projects/
-        for project_folder in self.base_path.iterdir():
-            if project_folder.is_dir():
-                project_file = project_folder / 'project.json'
-                if project_file.exists():
-                    projeto = self.laad_project(project_folder.name)
-                    if projeto:
-                        projecten.append(projeto)
+        # Itereer door alle mappen in projects/ en het archief
+        mapnamen = sorted(set(self._project_mappen()) | self.archief.mapnamen())
+        for mapnaam, projeto in self._laad_mappen(mapnamen, werkers):
+            if projeto:
+                projecten.append(projeto)
         
         return projecten
     
+    def _laad_mappen(self, mapnamen: List[str], werkers: Optional[int] = None):
+        """
+        Laad de projecten uit de gegeven mappen, eventueel parallel.
+        
+        Returns:
+            Lijst van (mapnaam, project of None) in de volgorde van mapnamen
+        """
+        werkers = werkers or self.laad_werkers
+        
+        def laad(mapnaam: str) -> Optional[Project]:
+            try:
+                return self._lees_map_of_archief(mapnaam)
+            except Exception as e:
+                self.laadfouten[mapnaam] = str(e)
+                print(f"Fout bij laden project '{mapnaam}': {e}")
+                return None
+        
+        if werkers <= 1 or len(mapnamen) <= 1:
+            return [(mapnaam, laad(mapnaam)) for mapnaam in mapnamen]
+        
+        with ThreadPoolExecutor(max_workers=werkers) as executor:
+            return list(zip(mapnamen, executor.map(laad, mapnamen)))
+    
+    def laad_catalogus(self) -> List[ProjectSamenvatting]:
+        """
+        Geef een lichte samenvatting van alle projecten zonder taken te laden.
+        
+        De catalogus staat in een enkel bestand. Projectmappen die daar nog
+        niet in staan, of waarvan de bestanden sinds het schrijven van de
+        vermelding gewijzigd zijn, worden eenmalig geladen; vermeldingen
+        waarvan de map verdwenen is worden verwijderd.
+        
+        Returns:
+            Lijst van projectsamenvattingen
+        """
+        return list(self._haal_catalogus().values())
+    
+    def _haal_catalogus(self) -> Dict[str, ProjectSamenvatting]:
+        """Geef de catalogus, en lees hem bij eerste gebruik van schijf"""
+        with self._catalogus_lock:
+            if self._catalogus is None:
+                self._catalogus = self._lees_catalogus()
+                self.sla_catalogus_op()
+            return self._catalogus
+    
+    def _lees_catalogus(self) -> Dict[str, ProjectSamenvatting]:
+        """Lees de catalogus en breng hem in lijn met de mappen op schijf"""
+        catalogus: Dict[str, ProjectSamenvatting] = {}
+        vingerafdrukken: Dict[str, Tuple[int, ...]] = {}
+        items = self._lees_catalogusitems()
+        
+        for mapnaam, item in (items or {}).items():
+            # Vermeldingen zonder tellers of vingerafdruk worden hieronder
+            # opnieuw uit de projectmap opgebouwd
+            if 'per_status' not in item or 'vingerafdruk' not in item:
+                continue
+            
+            catalogus[mapnaam] = ProjectSamenvatting(
+                item['naam'],
+                ProjectStatus(item['status']),
+                item['aantal_taken'],
+                mapnaam,
+                {status: item['per_status'].get(status.value, 0) for status in TaskStatus},
+                {prioriteit: item['per_prioriteit'].get(prioriteit.value, 0)
+                 for prioriteit in TaskPriority}
+            )
+            vingerafdrukken[mapnaam] = tuple(item['vingerafdruk'])
+        
+        mappen = set(self._project_mappen())
+        # Gearchiveerde projecten houden hun vermelding; alleen die staat in de catalogus
+        gearchiveerd = self.archief.mapnamen() - mappen
+        
+        for mapnaam in list(catalogus):
+            if mapnaam not in mappen and mapnaam not in gearchiveerd:
+                del catalogus[mapnaam]
+                self._catalogus_gewijzigd.add(mapnaam)
+                continue
+            
+            # Een vermelding geldt alleen zolang de bestanden niet gewijzigd
+            # zijn, bijvoorbeeld door een ander proces of een journal van voor
+            # een crash; anders wordt hij hieronder opnieuw opgebouwd
+            huidig = self._huidige_vingerafdruk(mapnaam)
+            if vingerafdrukken[mapnaam] != huidig:
+                del catalogus[mapnaam]
+                continue
+            
+            # Uitgangspunt voor wijzigingen()
+            self._vingerafdrukken.setdefault(mapnaam, huidig)
+            self._catalogus_vingerafdrukken[mapnaam] = huidig
+        
+        for mapnaam, project in self._laad_mappen(sorted(mappen - catalogus.keys())):
+            if project:
+                catalogus[mapnaam] = project.samenvatting(mapnaam)
+                self._catalogus_vingerafdrukken[mapnaam] = self._vingerafdrukken.get(mapnaam)
+                self._catalogus_gewijzigd.add(mapnaam)
+        
+        for mapnaam in sorted(gearchiveerd - catalogus.keys()):
+            try:
+                catalogus[mapnaam] = self._lees_map_of_archief(mapnaam).samenvatting(mapnaam)
+                self._catalogus_vingerafdrukken[mapnaam] = self._vingerafdrukken.get(mapnaam)
+                self._catalogus_gewijzigd.add(mapnaam)
+            except Exception as e:
+                self.laadfouten[mapnaam] = str(e)
+                print(f"Fout bij laden gearchiveerd project '{mapnaam}': {e}")
+        
+        if items is None:
+            self._catalogus_gewijzigd.update(catalogus)
+        
+        return catalogus
+    
+    def _lees_catalogusitems(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Lees de vermeldingen uit catalogus.json per map; None als het bestand ontbreekt of onleesbaar is"""
+        catalogus_file = self.base_path / CATALOGUS_BESTAND
+        if not catalogus_file.exists():
+            return None
+        
+        try:
+            return {item['map']: item for item in self._lees_bestand(catalogus_file)['projecten']}
+        except Exception as e:
+            print(f"Catalogus onleesbaar, wordt opnieuw opgebouwd: {e}")
+            return None
+    
+    def _huidige_vingerafdruk(self, mapnaam: str) -> Optional[Tuple[int, ...]]:
+        """Vingerafdruk van de projectmap, of van het pack als het project gearchiveerd is"""
+        project_folder = self._map_pad(mapnaam)
+        if (project_folder / 'project.json').exists():
+            return self._vingerafdruk(project_folder)
+        return self.archief.vingerafdruk(mapnaam)
+    
+    def _werk_catalogus_bij(self, project: Project, mapnaam: str):
+        """Neem de actuele gegevens van een project over in de catalogus"""
+        with self._catalogus_lock:
+            catalogus = self._haal_catalogus()
+            item = catalogus.get(mapnaam)
+            # De bestanden waar de tellers bij horen, zoals net gelezen of geschreven
+            vingerafdruk = self._vingerafdrukken.get(mapnaam)
+            
+            if (item and item.naam == project.naam and item.status == project.status
+                    and item.aantal_taken == project.aantal_taken()
+                    and item.aantal_per_status == project.aantal_per_status()
+                    and item.aantal_per_prioriteit == project.aantal_per_prioriteit()
+                    and self._catalogus_vingerafdrukken.get(mapnaam) == vingerafdruk):
+                return
+            
+            catalogus[mapnaam] = project.samenvatting(mapnaam)
+            self._catalogus_vingerafdrukken[mapnaam] = vingerafdruk
+            self._catalogus_gewijzigd.add(mapnaam)
+    
+    def sla_catalogus_op(self) -> bool:
+        """
+        Schrijf de catalogus naar schijf als deze gewijzigd is.
+        
+        Returns:
+            True als succesvol, False anders
+        """
+        with self._catalogus_lock:
+            if self._catalogus is None or not self._catalogus_gewijzigd:
+                return True
+            
+            return self._schrijf_catalogus()
+    
+    def _schrijf_catalogus(self) -> bool:
+        """
+        Schrijf de catalogus naar schijf (aanroeper houdt de catalogus-lock vast).
+        
+        Andere processen schrijven hetzelfde bestand. Onder het slot van
+        base_path wordt het daarom opnieuw gelezen en worden alleen de
+        vermeldingen bijgewerkt die dit proces gewijzigd heeft. Heeft een
+        ander proces een vermelding geschreven die bij de huidige bestanden
+        hoort en de eigen niet, dan blijft die van het andere proces staan.
+        """
+        try:
+            with Projectslot(self.base_path):
+                items = self._lees_catalogusitems()
+                if items is None:
+                    items = {}
+                    gewijzigd = set(self._catalogus) | self._catalogus_gewijzigd
+                else:
+                    gewijzigd = self._catalogus_gewijzigd
+                
+                for mapnaam in gewijzigd:
+                    item = self._catalogus.get(mapnaam)
+                    if item is None:
+                        items.pop(mapnaam, None)
+                        continue
+                    
+                    eigen = self._catalogus_vingerafdrukken.get(mapnaam)
+                    ander = items.get(mapnaam, {}).get('vingerafdruk')
+                    if (ander is not None and tuple(ander) != eigen
+                            and tuple(ander) == self._huidige_vingerafdruk(mapnaam)):
+                        continue
+                    
+                    items[mapnaam] = self._catalogusitem(item, eigen)
+                
+                data = {'formaat': FORMAATVERSIE, 'projecten': list(items.values())}
+                self._schrijf_bestand(self.base_path / CATALOGUS_BESTAND, data)
+            
+            self._catalogus_gewijzigd = set()
+            return True
+        
+        except Exception as e:
+            print(f"Fout bij opslaan catalogus: {e}")
+            return False
+    
+    def _catalogusitem(self, item: ProjectSamenvatting,
+                       vingerafdruk: Optional[Tuple[int, ...]]) -> Dict[str, Any]:
+        """Zet een vermelding om naar de vorm in catalogus.json"""
+        return {
+            'naam': item.naam,
+            'status': item.status.value,
+            'aantal_taken': item.aantal_taken,
+            'per_status': {
+                status.value: aantal for status, aantal in item.aantal_per_status.items()
+            },
+            'per_prioriteit': {
+                prioriteit.value: aantal
+                for prioriteit, aantal in item.aantal_per_prioriteit.items()
+            },
+            'map': item.locatie,
+            'vingerafdruk': list(vingerafdruk) if vingerafdruk is not None else None
+        }
+    
+    def migreer(self) -> int:
+        """
+        Herschrijf alle projecten in het huidige formaat met de huidige codec.
+        
+        Projecten in een ouder formaat blijven tot dan gewoon leesbaar; dit
+        zet de hele werkruimte in een keer om. Journals worden daarbij
+        samengevoegd in tasks.json.
+        
+        Returns:
+            Aantal herschreven projecten
+        """
+        aantal = 0
+        self.laadfouten = {}
+        
+        for mapnaam, project in self._laad_mappen(self._project_mappen()):
+            if project and self.sla_project_op(project, volledig=True):
+                aantal += 1
+        
+        with self._catalogus_lock:
+            self._catalogus_gewijzigd.update(self._haal_catalogus())
+            self.sla_catalogus_op()
+        
+        return aantal
+    
+    def migreer_naar_gespreid(self) -> int:
+        """
+        Zet een platte werkruimte om naar de gespreide indeling: elke
+        projectmap gaat naar base_path/ab/cd/<mapnaam> en manifest.json
+        krijgt alle projectnamen, zodat de lijst van projecten uit een enkel
+        bestand komt.
+        
+        Mappen worden alleen verplaatst, niet herschreven. Mapnamen en
+        wijzigingstijden blijven gelijk, dus catalogus en snapshot blijven
+        geldig. Eerst gaan alle mappen naar base_path/.migratie, zodat een
+        projectmap nooit botst met een tussenmap; een onderbroken migratie
+        wordt bij het volgende openen van de werkruimte afgemaakt. Er mag
+        tijdens de migratie geen ander proces in de werkruimte werken.
+        
+        Returns:
+            Aantal verplaatste projecten
+        """
+        migratiemap = self.base_path / MIGRATIEMAP
+        migratiemap.mkdir(exist_ok=True)
+        
+        # Tussenmappen bevatten zelf geen project.json
+        with os.scandir(self.base_path) as items:
+            platte_mappen = [item.name for item in items
+                             if item.is_dir() and item.name != MIGRATIEMAP
+                             and os.path.exists(os.path.join(item.path, 'project.json'))]
+        for mapnaam in platte_mappen:
+            os.rename(self.base_path / mapnaam, migratiemap / mapnaam)
+        
+        # Eerst het manifest, zodat de werkruimte na een onderbreking als
+        # gespreid herkend wordt
+        namen = {}
+        for item in migratiemap.iterdir():
+            try:
+                namen[item.name] = self._lees_bestand(item / 'project.json')['naam']
+            except Exception as e:
+                self.laadfouten[item.name] = str(e)
+                print(f"Fout bij migreren project in '{item.name}': {e}")
+        self.manifest.voeg_meerdere_toe(namen)
+        self.gespreid = True
+        
+        for mapnaam in namen:
+            doel = gespreid_pad(self.base_path, mapnaam)
+            doel.parent.mkdir(parents=True, exist_ok=True)
+            os.rename(migratiemap / mapnaam, doel)
+        
+        if not any(migratiemap.iterdir()):
+            migratiemap.rmdir()
+        
+        return len(namen)
+    
+    def archiveer_project(self, project_naam: str) -> bool:
+        """
+        Verplaats een gesloten project naar het archief.
+        
+        Het project gaat gecomprimeerd in een pack en de projectmap wordt
+        verwijderd. De samenvatting blijft in de catalogus, zodat het
+        overzicht het project zonder uitpakken toont. laad_project() pakt
+        het uit; wordt het daarna opgeslagen, dan komt het weer in een map.
+        
+        Args:
+            project_naam: De naam van het project
+        
+        Returns:
+            True als het project gearchiveerd is, False als het niet
+            bestaat, niet gesloten is of niet geschreven kon worden
+        """
+        try:
+            project_folder = self._project_folder(project_naam)
+            if not (project_folder / 'project.json').exists():
+                return False
+            
+            # Onder het slot, zodat geen ander proces het project intussen opslaat
+            with Projectslot(project_folder):
+                project = self._lees_project(project_folder, slot_vast=True)
+                if project is None or project.status != ProjectStatus.GESLOTEN:
+                    return False
+                
+                self.archief.pak_in(project_folder.name, project)
+                import shutil
+                shutil.rmtree(project_folder)
+            
+            self._ruim_tussenmappen_op(project_folder)
+            self._bekende_projecten.pop(project_folder.name, None)
+            # Het pack geldt nu als bekend, zodat wijzigingen() ziet als een
+            # ander proces het project verwijdert of weer uitpakt
+            self._vingerafdrukken[project_folder.name] = self.archief.vingerafdruk(project_folder.name)
+            self._journal_groottes.pop(project_folder.name, None)
+            if self.gespreid:
+                self.manifest.verwijder(project_folder.name)
+            
+            self._werk_catalogus_bij(project, project_folder.name)
+            self.sla_catalogus_op()
+            return True
+        
+        except Exception as e:
+            print(f"Fout bij archiveren project: {e}")
+            return False
+    
+    def _ruim_tussenmappen_op(self, project_folder: Path):
+        """Verwijder lege tussenmappen boven een verwijderde projectmap (gespreide indeling)"""
+        if not self.gespreid:
+            return
+        
+        tussenmap = project_folder.parent
+        while tussenmap != self.base_path:
+            try:
+                os.rmdir(tussenmap)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                # Niet leeg; de mappen erboven dus ook niet
+                return
+            tussenmap = tussenmap.parent
+    
+    def archiveer_gesloten(self) -> int:
+        """
+        Archiveer alle gesloten projecten die nog in een map staan.
+        
+        Returns:
+            Aantal gearchiveerde projecten
+        """
+        mappen = set(self._project_mappen())
+        gesloten = [
+            samenvatting.naam for mapnaam, samenvatting in list(self._haal_catalogus().items())
+            if samenvatting.status == ProjectStatus.GESLOTEN and mapnaam in mappen
+        ]
+        return sum(self.archiveer_project(naam) for naam in gesloten)
+    
+    def flush(self) -> bool:
+        """
+        Schrijf alles weg wat nog in het geheugen staat.
+        
+        Returns:
+            True als succesvol, False anders
+        """
+        return self.sla_catalogus_op()
+    
+    def sluit(self):
+        """Rond de opslag af bij het afsluiten van de applicatie"""
+        self.flush()
+        
+        if self.gebruik_snapshot:
+            self.schrijf_snapshot()
+    
+    def _vingerafdruk(self, project_folder: Path) -> Vingerafdruk:
+        """Wijzigingstijd en grootte van de bestanden van een project"""
+        vingerafdruk = []
+        
+        for bestand in ('project.json', 'tasks.json', JOURNAL_BESTAND):
+            try:
+                status = os.stat(project_folder / bestand)
+                vingerafdruk += [status.st_mtime_ns, status.st_size]
+            except FileNotFoundError:
+                vingerafdruk += [0, 0]
+        
+        return tuple(vingerafdruk)
+    
+    def _onthoud_project(self, project_folder: Path, project: Project):
+        """Onthoud een project dat net weggeschreven is voor wijzigingen() en de volgende snapshot"""
+        vingerafdruk = self._vingerafdruk(project_folder)
+        self._vingerafdrukken[project_folder.name] = vingerafdruk
+        if self.gebruik_snapshot:
+            self._bekende_projecten[project_folder.name] = (project, vingerafdruk)
+    
+    def mapnaam(self, project_naam: str) -> str:
+        """Geef de naam van de map waarin een project staat"""
+        return self._project_folder(project_naam).name
+    
+    def wijzigingen(self) -> Tuple[List[str], List[str]]:
+        """
+        Zoek projectmappen die sinds het laatste laden of opslaan door een
+        ander proces gewijzigd, toegevoegd of verwijderd zijn.
+        
+        Vergelijkt alleen wijzigingstijden en groottes; er wordt niets
+        gelezen of bijgewerkt. Gebruik ververs_map() om een gevonden
+        wijziging over te nemen.
+        
+        Returns:
+            Tuple van (gewijzigde of nieuwe mappen, verwijderde mappen)
+        """
+        mappen = self._project_mappen()
+        gearchiveerd = self.archief.mapnamen() - set(mappen)
+        bekend = dict(self._vingerafdrukken)
+        
+        gewijzigd = [
+            mapnaam for mapnaam in mappen
+            if bekend.get(mapnaam) != self._vingerafdruk(self._map_pad(mapnaam))
+            and (mapnaam in bekend or (self._map_pad(mapnaam) / 'project.json').exists())
+        ]
+        # Een gearchiveerd project is niet verdwenen; alleen een pack dat
+        # nieuw of vervangen is telt als wijziging
+        gewijzigd += [
+            mapnaam for mapnaam in sorted(gearchiveerd)
+            if bekend.get(mapnaam) != self.archief.vingerafdruk(mapnaam)
+        ]
+        verwijderd = sorted(bekend.keys() - set(mappen) - gearchiveerd)
+        
+        return gewijzigd, verwijderd
+    
+    def ververs_map(self, mapnaam: str) -> Optional[ProjectSamenvatting]:
+        """
+        Lees een gewijzigde projectmap of pack opnieuw en werk de catalogus bij.
+        
+        Args:
+            mapnaam: Een map uit wijzigingen()
+        
+        Returns:
+            De nieuwe samenvatting, of None als het project verdwenen of onleesbaar is
+        """
+        try:
+            project = self._lees_map_of_archief(mapnaam)
+        except Exception as e:
+            print(f"Fout bij verversen project in '{mapnaam}': {e}")
+            return None
+        
+        if project is None:
+            self._vingerafdrukken.pop(mapnaam, None)
+            self._bekende_projecten.pop(mapnaam, None)
+            self._journal_groottes.pop(mapnaam, None)
+            with self._catalogus_lock:
+                if self._haal_catalogus().pop(mapnaam, None):
+                    self._catalogus_vingerafdrukken.pop(mapnaam, None)
+                    self._catalogus_gewijzigd.add(mapnaam)
+            return None
+        
+        # Alleen de samenvatting blijft bewaard; het project zelf wordt
+        # pas bij gebruik opnieuw geladen
+        self._bekende_projecten.pop(mapnaam, None)
+        with self._catalogus_lock:
+            self._werk_catalogus_bij(project, mapnaam)
+            return self._haal_catalogus()[mapnaam]
+    
+    def _haal_snapshot(self) -> Optional[Snapshot]:
+        """Open de snapshot bij eerste gebruik; None als er geen bruikbare is"""
+        with self._snapshot_lock:
+            if not self._snapshot_geopend:
+                self._snapshot_geopend = True
+                pad = self.base_path / SNAPSHOT_BESTAND
+                
+                if self.gebruik_snapshot and pad.exists():
+                    try:
+                        self._snapshot = Snapshot(pad)
+                    except (OSError, ValueError) as e:
+                        print(f"Snapshot wordt niet gebruikt: {e}")
+            
+            return self._snapshot
+    
+    def schrijf_snapshot(self) -> bool:
+        """
+        Schrijf een binaire snapshot van de werkruimte.
+        
+        Projecten die in deze sessie geladen of opgeslagen zijn komen uit het
+        geheugen, ongewijzigde projecten worden uit de vorige snapshot
+        overgenomen. Een project in het geheugen met niet opgeslagen
+        wijzigingen wordt opnieuw van schijf gelezen, zodat de snapshot
+        altijd overeenkomt met de bestanden. Projecten waarvan de bestanden
+        intussen door een ander proces gewijzigd zijn, of die geen van
+        beide zijn, ontbreken en worden de volgende keer uit JSON geladen.
+        
+        Returns:
+            True als succesvol, False anders
+        """
+        try:
+            snapshot = self._haal_snapshot()
+            blokken = []
+            
+            for mapnaam in self._project_mappen():
+                project_folder = self._map_pad(mapnaam)
+                if not (project_folder / 'project.json').exists():
+                    continue
+                
+                vingerafdruk = self._vingerafdruk(project_folder)
+                project, bekende_vingerafdruk = self._bekende_projecten.get(mapnaam, (None, None))
+                
+                if project and bekende_vingerafdruk == vingerafdruk:
+                    blok = None if project.heeft_wijzigingen() else encodeer_project(project)
+                    # Ook een wijziging tijdens het coderen hoort niet in de snapshot
+                    if blok is None or project.heeft_wijzigingen():
+                        blok = self._blok_van_schijf(project_folder, vingerafdruk, snapshot)
+                elif not project and snapshot and snapshot.is_geldig(mapnaam, vingerafdruk):
+                    blok = snapshot.blok(mapnaam)
+                else:
+                    blok = None
+                
+                if blok is None:
+                    continue
+                
+                blokken.append((mapnaam, vingerafdruk, blok))
+            
+            # De oude mapping moet dicht voordat het bestand vervangen wordt
+            with self._snapshot_lock:
+                if snapshot:
+                    snapshot.sluit()
+                self._snapshot = None
+                self._snapshot_geopend = False
+            
+            schrijf_snapshot(self.base_path / SNAPSHOT_BESTAND, blokken)
+            return True
+        
+        except Exception as e:
+            print(f"Fout bij opslaan snapshot: {e}")
+            return False
+    
+    def _blok_van_schijf(self, project_folder: Path, vingerafdruk: Vingerafdruk,
+                         snapshot: Optional[Snapshot]) -> Optional[bytes]:
+        """
+        Geef het snapshotblok van een project zoals het op schijf staat, of
+        None als de bestanden intussen niet meer bij vingerafdruk horen.
+        """
+        if snapshot and snapshot.is_geldig(project_folder.name, vingerafdruk):
+            return snapshot.blok(project_folder.name)
+        
+        with Projectslot(project_folder, gedeeld=True):
+            _, gelezen, project = self._lees_versie_en_project(project_folder)
+        
+        if gelezen != vingerafdruk:
+            return None
+        return encodeer_project(project)
+    
     def verwijder_project(self, project_naam: str) -> bool:
         """
         Verwijder een project inclusief alle bestanden.
@@ -170,10 +1377,13 @@ class StorageManager:
         """
         try:
             project_folder = self._project_folder(project_naam)
+            gearchiveerd = self.archief.bevat(project_folder.name)
             
-            if project_folder.exists():
-                import shutil
-                shutil.rmtree(project_folder)
+            if project_folder.exists() or gearchiveerd:
+                with self._catalogus_lock:
+                    if self._verwijder_map(project_folder, gearchiveerd):
+                        self.sla_catalogus_op()
+                
                 return True
             
             return False
@@ -182,6 +1392,29 @@ class StorageManager:
             print(f"Fout bij verwijderen project: {e}")
             return False
     
+    def _verwijder_map(self, project_folder: Path, fouten_negeren: bool) -> bool:
+        """
+        Verwijder de map en het archief van een project en vergeet het
+        (aanroeper houdt _catalogus_lock vast).
+        
+        Returns:
+            True als de catalogus gewijzigd is
+        """
+        import shutil
+        shutil.rmtree(project_folder, ignore_errors=fouten_negeren)
+        self._ruim_tussenmappen_op(project_folder)
+        self.archief.verwijder(project_folder.name)
+        self._bekende_projecten.pop(project_folder.name, None)
+        self._vingerafdrukken.pop(project_folder.name, None)
+        if self.gespreid:
+            self.manifest.verwijder(project_folder.name)
+        
+        if self._haal_catalogus().pop(project_folder.name, None) is None:
+            return False
+        self._catalogus_vingerafdrukken.pop(project_folder.name, None)
+        self._catalogus_gewijzigd.add(project_folder.name)
+        return True
+    
     def project_bestaat(self, project_naam: str) -> bool:
         """
         Controleer of een project op schijf bestaat.
@@ -193,29 +1426,39 @@ class StorageManager:
             True als het project bestaat, False anders
         """
         project_folder = self._project_folder(project_naam)
-        return (project_folder / 'project.json').exists()
+        return (project_folder / 'project.json').exists() or self.archief.bevat(project_folder.name)
     
     def list_projectmappen(self) -> List[str]:
         """
         Geef een lijst van alle projectmappen.
         
+        In de gespreide indeling komen de namen uit het manifest, van
+        gearchiveerde projecten uit de catalogus.
+        
         Returns:
             Lijst van projectnamen
         """
-        projecten = []
-        
-        if not self.base_path.exists():
-            return projecten
+        if self.gespreid:
+            projecten = list(self.manifest.projecten().values())
+        else:
+            projecten = []
+            
+            if not self.base_path.exists():
+                return projecten
+            
+            for item in self.base_path.iterdir():
+                if item.is_dir():
+                    project_file = item / 'project.json'
+                    if project_file.exists():
+                        try:
+                            projecten.append(self._lees_bestand(project_file)['naam'])
+                        except:
+                            pass
         
-        for item in self.base_path.iterdir():
-            if item.is_dir():
-                project_file = item / 'project.json'
-                if project_file.exists():
-                    try:
-                        with open(project_file, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                            projecten.append(data['naam'])
-                    except:
-                        pass
+        gearchiveerd = self.archief.mapnamen() - set(self._project_mappen())
+        if gearchiveerd:
+            catalogus = self._haal_catalogus()
+            projecten += [catalogus[mapnaam].naam for mapnaam in sorted(gearchiveerd)
+                          if mapnaam in catalogus]
         
         return projecten
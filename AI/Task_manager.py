@@ -1,6 +1,9 @@
-from typing import List, Optional, Tuple
-from Models import Project, Task, TaskStatus, TaskPriority
+from collections import ChainMap
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+from Models import Project, Task, TaskStatus, TaskPriority, naam_sleutel
 from Validators import valideer_taaktitel, valideer_prioriteit
+from Transactie import Transactie
+from Vergrendeling import met_herhaling
 
 
 class TaskManager:
@@ -9,6 +12,14 @@ class TaskManager:
     def __init__(self, storage=None):
         self.storage = storage
     
+    def transactie(self) -> Transactie:
+        """
+        Groepeer wijzigingen tot een enkele schrijfactie per project, zie
+        ProjectManager.transactie(). Gebruik die van de ProjectManager als
+        er ook projecten aangemaakt of verwijderd worden.
+        """
+        return Transactie(self.storage)
+    
     def maak_taak_aan(self, project: Project, titel: str, beschrijving: Optional[str] = None,
                      prioriteit_str: str = "normaal") -> Tuple[bool, str, Optional[Task]]:
         """
@@ -23,11 +34,20 @@ class TaskManager:
         Returns:
             Tuple van (succes, bericht, taak)
         """
+        return met_herhaling(
+            self.storage, project,
+            lambda: self._maak_taak_aan(project, titel, beschrijving, prioriteit_str),
+            (False, "Taak kon niet opgeslagen worden, project wordt steeds elders gewijzigd", None)
+        )
+    
+    def _maak_taak_aan(self, project: Project, titel: str, beschrijving: Optional[str] = None,
+                      prioriteit_str: str = "normaal") -> Tuple[bool, str, Optional[Task]]:
+        """Maak een taak aan en sla hem op, zie maak_taak_aan"""
         if project.is_gesloten():
             return False, "Kan geen taken toevoegen aan een gesloten project", None
         
         # Valideer titel
-        is_geldig, foutbericht = valideer_taaktitel(titel, project.tasks)
+        is_geldig, foutbericht = valideer_taaktitel(titel, project.taakindex)
         if not is_geldig:
             return False, foutbericht, None
         
@@ -42,17 +62,104 @@ class TaskManager:
         # Voeg toe aan project
         if project.voeg_taak_toe(nieuwe_taak):
             # Sla op schijf op
-            if self.storage and self.storage.sla_project_op(project):
+            if self.storage and self.storage.sla_taakwijziging_op(project, 'toevoegen', nieuwe_taak):
                 return True, f"Taak '{titel}' succesvol aangemaakt", nieuwe_taak
             elif not self.storage:
                 return True, f"Taak '{titel}' succesvol aangemaakt", nieuwe_taak
             else:
                 # Verwijder uit project als opslaan mislukt
-                project.tasks.remove(nieuwe_taak)
+                project.verwijder_taak(nieuwe_taak)
                 return False, f"Taak kon niet opgeslagen worden", None
         
         return False, "Kon taak niet toevoegen", None
     
+    def maak_taken_aan_bulk(self, project: Project, rijen: Iterable[Mapping[str, Any]],
+                            alles_of_niets: bool = False
+                            ) -> Tuple[bool, str, List[Tuple[bool, str, Optional[Task]]]]:
+        """
+        Maak meerdere taken in een keer aan en sla het project een keer op.
+        
+        Alle titels worden in een doorgang gecontroleerd, zowel tegen de
+        bestaande taken als tegen elkaar.
+        
+        Args:
+            project: Het project waarin de taken worden aangemaakt
+            rijen: Rijen met 'titel' en optioneel 'beschrijving' en 'prioriteit'
+            alles_of_niets: Voeg niets toe als een van de rijen ongeldig is
+        
+        Returns:
+            Tuple van (succes, bericht, resultaten), met per rij een tuple
+            van (succes, bericht, taak) zoals maak_taak_aan die geeft
+        """
+        return met_herhaling(
+            self.storage, project,
+            lambda: self._maak_taken_aan_bulk(project, rijen, alles_of_niets),
+            (False, "Taken konden niet opgeslagen worden, project wordt steeds elders gewijzigd", [])
+        )
+    
+    def _maak_taken_aan_bulk(self, project: Project, rijen: Iterable[Mapping[str, Any]],
+                             alles_of_niets: bool = False
+                             ) -> Tuple[bool, str, List[Tuple[bool, str, Optional[Task]]]]:
+        """Maak de taken aan en sla het project op, zie maak_taken_aan_bulk"""
+        if project.is_gesloten():
+            return False, "Kan geen taken toevoegen aan een gesloten project", []
+        
+        resultaten: List[Tuple[bool, str, Optional[Task]]] = []
+        nieuwe_taken: List[Task] = []
+        # Titels van eerdere rijen in deze bulk, bovenop de bestaande taken
+        nieuwe_titels: Dict[str, Task] = {}
+        bestaande_titels = ChainMap(nieuwe_titels, project.taakindex)
+        
+        for rij in rijen:
+            titel = rij.get('titel', '')
+            
+            is_geldig, foutbericht = valideer_taaktitel(titel, bestaande_titels)
+            if not is_geldig:
+                resultaten.append((False, foutbericht, None))
+                continue
+            
+            is_geldig, prioriteit = valideer_prioriteit(rij.get('prioriteit') or "normaal")
+            if not is_geldig:
+                resultaten.append((False, prioriteit, None))
+                continue
+            
+            nieuwe_taak = Task(titel, rij.get('beschrijving') or None, prioriteit)
+            nieuwe_titels[naam_sleutel(titel)] = nieuwe_taak
+            nieuwe_taken.append(nieuwe_taak)
+            resultaten.append((True, f"Taak '{titel}' succesvol aangemaakt", nieuwe_taak))
+        
+        aantal_fouten = len(resultaten) - len(nieuwe_taken)
+        
+        if alles_of_niets and aantal_fouten:
+            resultaten = [
+                (False, "Niet aangemaakt omdat andere rijen ongeldig zijn", None)
+                if succes else (succes, bericht, taak)
+                for succes, bericht, taak in resultaten
+            ]
+            return False, f"{aantal_fouten} van {len(resultaten)} rij(en) ongeldig, niets aangemaakt", resultaten
+        
+        if not nieuwe_taken:
+            return not aantal_fouten, f"0 taken aangemaakt, {aantal_fouten} rij(en) ongeldig", resultaten
+        
+        for taak in nieuwe_taken:
+            project.voeg_taak_toe(taak)
+        
+        # Sla op schijf op, een keer voor alle taken
+        if self.storage and not self.storage.sla_project_op(project):
+            # Verwijder uit project als opslaan mislukt
+            project.verwijder_taken(nieuwe_taken)
+            resultaten = [
+                (False, "Taak kon niet opgeslagen worden", None) if succes else (succes, bericht, taak)
+                for succes, bericht, taak in resultaten
+            ]
+            return False, "Taken konden niet opgeslagen worden", resultaten
+        
+        bericht = f"{len(nieuwe_taken)} taken aangemaakt"
+        if aantal_fouten:
+            bericht += f", {aantal_fouten} rij(en) ongeldig"
+        
+        return not aantal_fouten, bericht, resultaten
+    
     def zoek_taak(self, project: Project, titel: str) -> Optional[Task]:
         """
         Zoek een taak in een project op titel.
@@ -64,10 +171,7 @@ class TaskManager:
         Returns:
             De gevonden taak of None
         """
-        return next(
-            (t for t in project.tasks if t.titel.lower() == titel.lower()),
-            None
-        )
+        return project.zoek_taak(titel)
     
     def wijzig_taakstatus(self, project: Project, taaktitel: str, 
                          nieuwe_status_str: str) -> Tuple[bool, str]:
@@ -82,6 +186,15 @@ class TaskManager:
         Returns:
             Tuple van (succes, bericht)
         """
+        return met_herhaling(
+            self.storage, project,
+            lambda: self._wijzig_taakstatus(project, taaktitel, nieuwe_status_str),
+            (False, "Status kon niet opgeslagen worden, project wordt steeds elders gewijzigd")
+        )
+    
+    def _wijzig_taakstatus(self, project: Project, taaktitel: str, 
+                          nieuwe_status_str: str) -> Tuple[bool, str]:
+        """Wijzig de status en sla de wijziging op, zie wijzig_taakstatus"""
         taak = self.zoek_taak(project, taaktitel)
         
         if not taak:
@@ -113,7 +226,7 @@ class TaskManager:
             
             # Sla op schijf op
             if self.storage:
-                self.storage.sla_project_op(project)
+                self.storage.sla_taakwijziging_op(project, 'status', taak)
             
             return True, bericht
         else:
@@ -130,6 +243,14 @@ class TaskManager:
         Returns:
             Tuple van (succes, bericht)
         """
+        return met_herhaling(
+            self.storage, project,
+            lambda: self._verwijder_taak(project, taaktitel),
+            (False, "Verwijderen kon niet opgeslagen worden, project wordt steeds elders gewijzigd")
+        )
+    
+    def _verwijder_taak(self, project: Project, taaktitel: str) -> Tuple[bool, str]:
+        """Verwijder de taak en sla de wijziging op, zie verwijder_taak"""
         taak = self.zoek_taak(project, taaktitel)
         
         if not taak:
@@ -138,11 +259,11 @@ class TaskManager:
         if not taak.is_afgerond():
             return False, "Alleen afgeronde taken kunnen verwijderd worden"
         
-        project.tasks.remove(taak)
+        project.verwijder_taak(taak)
         
         # Sla op schijf op
         if self.storage:
-            self.storage.sla_project_op(project)
+            self.storage.sla_taakwijziging_op(project, 'verwijderen', taak)
         
         return True, f"Taak '{taaktitel}' succesvol verwijderd"
     
@@ -156,20 +277,62 @@ class TaskManager:
         Returns:
             Een geformateerde string met de takenlijst
         """
+        return "".join(self.takenlijst_regels(project))
+    
+    def takenlijst_regels(self, project: Project, offset: int = 0,
+                          aantal: Optional[int] = None) -> Iterator[str]:
+        """
+        Geef de takenlijst regel voor regel, te beginnen met de kop.
+        
+        Args:
+            project: Het project
+            offset: Index van de eerste taak
+            aantal: Maximaal aantal taken, of None voor alle taken
+        
+        Returns:
+            Een generator van regels (inclusief regeleinde)
+        """
         if not project.tasks:
-            return f"\n=== TAKEN IN PROJECT '{project.naam}' ===\nGeen taken gevonden"
+            yield f"\n=== TAKEN IN PROJECT '{project.naam}' ===\nGeen taken gevonden"
+            return
+        
+        yield f"\n=== TAKEN IN PROJECT '{project.naam}' ===\n"
+        yield f"{'Titel':<30} {'Status':<10} {'Prioriteit':<10}\n"
+        yield "-" * 50 + "\n"
         
-        overzicht = f"\n=== TAKEN IN PROJECT '{project.naam}' ===\n"
-        overzicht += f"{'Titel':<30} {'Status':<10} {'Prioriteit':<10}\n"
-        overzicht += "-" * 50 + "\n"
+        einde = len(project.tasks) if aantal is None else min(offset + aantal, len(project.tasks))
         
-        for taak in project.tasks:
+        for index in range(offset, einde):
+            taak = project.tasks[index]
             status_text = taak.status.value
             prioriteit_text = taak.prioriteit.value
             
-            overzicht += f"{taak.titel:<30} {status_text:<10} {prioriteit_text:<10}\n"
+            yield f"{taak.titel:<30} {status_text:<10} {prioriteit_text:<10}\n"
+    
+    def takenlijst_paginas(self, project: Project, pagina_grootte: int = 20,
+                           offset: int = 0) -> Iterator[str]:
+        """
+        Geef de takenlijst per pagina; een pagina wordt pas opgebouwd als
+        erom gevraagd wordt.
+        
+        Args:
+            project: Het project
+            pagina_grootte: Aantal taken per pagina
+            offset: Index van de eerste taak
+        
+        Returns:
+            Een generator van geformateerde pagina's
+        """
+        totaal = len(project.tasks)
+        
+        if not totaal:
+            yield "".join(self.takenlijst_regels(project))
+            return
         
-        return overzicht
+        for begin in range(offset, totaal, pagina_grootte):
+            einde = min(begin + pagina_grootte, totaal)
+            pagina = "".join(self.takenlijst_regels(project, begin, pagina_grootte))
+            yield pagina + f"(taken {begin + 1}-{einde} van {totaal})"
     
     def toon_taakdetails(self, project: Project, taaktitel: str) -> str:
         """
@@ -0,0 +1,160 @@
+from typing import Dict, Optional
+from Models import Project, Task, naam_sleutel
+
+
+# Opslagmethodes die tijdens een transactie alleen onthouden wat er opgeslagen moet worden
+UITGESTELDE_METHODES = ('sla_project_op', 'sla_taakwijziging_op', 'verwijder_project')
+
+
+class TransactieMislukt(Exception):
+    """De wijzigingen van een transactie konden niet opgeslagen worden"""
+
+
+class Transactie:
+    """
+    Groepeert wijzigingen via de managers tot een enkele schrijfactie, voor
+    gebruik met ``with``.
+    
+    Binnen de transactie schrijven de managers niets naar de opslag; elk
+    gewijzigd project wordt onthouden en bij het einde een keer opgeslagen,
+    met StorageManager.sla_projecten_op() alles of niets. Gaat er binnen
+    de transactie iets mis of mislukt het opslaan, dan worden de gewijzigde
+    projecten opnieuw van schijf geladen en krijgt de ProjectManager zijn
+    projectenlijst van voor de transactie terug; de fout gaat door naar de
+    aanroeper.
+    
+    De transactie geldt voor de opslag, dus ook voor een TaskManager met
+    dezelfde opslag. Gebruik de managers binnen een transactie vanuit een
+    enkele thread. Een transactie binnen een transactie hoort bij de
+    buitenste. De opslag moet sla_projecten_op() hebben (StorageManager en
+    SqliteStorageManager); zonder opslag doet de transactie niets. Heeft een
+    UitgesteldeStorage nog openstaande wijzigingen, dan worden die eerst
+    weggeschreven, zodat terugdraaien alleen de transactie ongedaan maakt.
+    """
+    
+    def __init__(self, storage, project_manager=None):
+        """
+        Args:
+            storage: De opslag van de managers, of None
+            project_manager: De ProjectManager waarvan de projectenlijst bij
+                een fout hersteld wordt, als die er is
+        """
+        self.storage = storage
+        self.project_manager = project_manager
+        # Gewijzigde en verwijderde projecten op naam_sleutel, in volgorde van wijzigen
+        self._gewijzigd: Dict[str, Project] = {}
+        self._verwijderd: Dict[str, str] = {}
+        # Alle projecten die in de transactie opgeslagen zouden worden, ook
+        # als ze daarna verwijderd zijn; die worden bij een fout opnieuw geladen
+        self._aangeraakt: Dict[int, Project] = {}
+        self._oorspronkelijk: Dict[str, object] = {}
+        self._buitenste = True
+    
+    def __enter__(self) -> "Transactie":
+        # Zonder opslag wordt er toch niets geschreven
+        if self.storage is None:
+            self._buitenste = False
+            return self
+        
+        if not hasattr(self.storage, 'sla_projecten_op'):
+            raise TransactieMislukt(
+                f"{type(self.storage).__name__} kan projecten niet alles of niets opslaan"
+            )
+        
+        if vars(self.storage).get('_transactie') is not None:
+            self._buitenste = False
+            return self.storage._transactie
+        
+        if vars(self.storage).get('_vuil') and not self.storage.flush():
+            raise TransactieMislukt("Openstaande wijzigingen konden niet weggeschreven worden")
+        
+        if self.project_manager is not None:
+            self._catalogus = dict(self.project_manager._catalogus)
+            self._geladen = dict(self.project_manager._geladen)
+        
+        # Alleen voor dit object, zoals Metingen; eerdere omhullingen blijven bewaard
+        for naam in UITGESTELDE_METHODES:
+            self._oorspronkelijk[naam] = vars(self.storage).get(naam)
+        
+        self.storage.sla_project_op = self._onthoud
+        self.storage.sla_taakwijziging_op = self._onthoud_taakwijziging
+        self.storage.verwijder_project = self._onthoud_verwijderen
+        self.storage._transactie = self
+        return self
+    
+    def __exit__(self, soort, fout, traceback) -> bool:
+        if not self._buitenste:
+            return False
+        
+        self._herstel_opslag()
+        
+        if soort is not None:
+            self._draai_terug()
+            return False
+        
+        try:
+            self._voer_door()
+        except BaseException:
+            self._draai_terug()
+            raise
+        
+        return False
+    
+    def bevat(self, project: Project) -> bool:
+        """Of een project in deze transactie gewijzigd is"""
+        return id(project) in self._aangeraakt
+    
+    def _onthoud(self, project: Project, *args, **kwargs) -> bool:
+        self._gewijzigd[naam_sleutel(project.naam)] = project
+        self._aangeraakt[id(project)] = project
+        return True
+    
+    def _onthoud_taakwijziging(self, project: Project, actie: str, taak: Task) -> bool:
+        return self._onthoud(project)
+    
+    def _onthoud_verwijderen(self, project_naam: str) -> bool:
+        sleutel = naam_sleutel(project_naam)
+        self._gewijzigd.pop(sleutel, None)
+        self._verwijderd[sleutel] = project_naam
+        return True
+    
+    def _herstel_opslag(self):
+        """Zet de opslagmethodes terug zoals ze voor de transactie waren"""
+        for naam, oorspronkelijk in self._oorspronkelijk.items():
+            if oorspronkelijk is None:
+                delattr(self.storage, naam)
+            else:
+                setattr(self.storage, naam, oorspronkelijk)
+        del self.storage._transactie
+    
+    def _voer_door(self):
+        """
+        Schrijf alle wijzigingen en verwijderingen in een enkele stap weg;
+        projecten die in de transactie verwijderd en opnieuw aangemaakt zijn
+        vervangen daarbij hun voorganger.
+        
+        Raises:
+            VersieConflict: Als een project intussen door een ander proces gewijzigd is
+            TransactieMislukt: Als er iets niet opgeslagen kon worden
+        """
+        projecten = list(self._gewijzigd.values())
+        verwijderen = list(self._verwijderd.values())
+        
+        if (projecten or verwijderen) and not self.storage.sla_projecten_op(projecten, verwijderen):
+            raise TransactieMislukt("De projecten konden niet opgeslagen worden")
+    
+    def _draai_terug(self):
+        """Laad de gewijzigde projecten opnieuw en herstel de projectenlijst"""
+        for project in self._aangeraakt.values():
+            herlaad = getattr(self.storage, 'herlaad_project', None)
+            if herlaad is not None:
+                herlaad(project)
+                continue
+            
+            actueel: Optional[Project] = self.storage.laad_project(project.naam)
+            if actueel is not None:
+                project.neem_over(actueel)
+        
+        if self.project_manager is not None:
+            self.project_manager._catalogus = self._catalogus
+            self.project_manager._geladen = self._geladen
@@ -1,5 +1,6 @@
 import os
 import sys
+from typing import Iterable
 
 
 def wis_scherm():
@@ -7,8 +8,13 @@ def wis_scherm():
     os.system('cls' if os.name == 'nt' else 'clear')
 
 
-def toon_menu():
-    """Toon het hoofdmenu"""
+def toon_menu(metingen: bool = False):
+    """
+    Toon het hoofdmenu.
+    
+    Args:
+        metingen: Toon ook de menuoptie voor de metingen
+    """
     print("=" * 50)
     print("     PROJECT & TASK MANAGEMENT SYSTEEM")
     print("=" * 50)
@@ -23,6 +29,10 @@ def toon_menu():
     print("7. Taken weergeven")
     print("8. Taakdetails weergeven")
     print("9. Taak verwijderen")
+    print("10. Taken zoeken")
+    if metingen:
+        print("\n=== DIAGNOSE ===")
+        print("11. Metingen bekijken")
     print("\n0. Afsluiten")
     print("-" * 50)
 
@@ -113,6 +123,32 @@ def toon_bericht(bericht: str, soort: str = "info"):
     print(f"{kleur}{bericht}{einde}")
 
 
+def toon_paginas(paginas: Iterable[str]):
+    """
+    Toon pagina's een voor een.
+    
+    Na elke pagina kan de gebruiker met Enter doorbladeren of met 'q'
+    stoppen. Na de laatste pagina wordt niet meer gevraagd.
+    
+    Args:
+        paginas: De pagina's, bijvoorbeeld van een generator
+    """
+    iterator = iter(paginas)
+    pagina = next(iterator, None)
+    
+    while pagina is not None:
+        print(pagina)
+        
+        volgende = next(iterator, None)
+        if volgende is None:
+            return
+        
+        if input("\nEnter voor de volgende pagina, 'q' om te stoppen: ").strip().lower() == 'q':
+            return
+        
+        pagina = volgende
+
+
 def wacht_op_enter():
     """Wacht tot de gebruiker op Enter drukt"""
     input("\nDruk op Enter om door te gaan...")
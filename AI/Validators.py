@@ -1,14 +1,14 @@
-from typing import List, Optional
-from Models import Project, Task, TaskPriority
+from typing import Container, List, Optional
+from Models import Project, Task, TaskPriority, naam_sleutel
 
 
-def valideer_projectnaam(naam: str, bestaande_projecten: List[Project]) -> tuple[bool, str]:
+def valideer_projectnaam(naam: str, bestaande_namen: Container[str]) -> tuple[bool, str]:
     """
     Valideer de projectnaam.
     
     Args:
         naam: De projectnaam die gevalideerd moet worden
-        bestaande_projecten: Lijst van bestaande projecten
+        bestaande_namen: Index van bestaande projecten op naam_sleutel
     
     Returns:
         Tuple van (is_geldig, foutbericht)
@@ -17,20 +17,20 @@ def valideer_projectnaam(naam: str, bestaande_projecten: List[Project]) -> tuple
         return False, "Projectnaam mag niet leeg zijn"
     
     # Controleer uniciteit
-    bestaande_namen = [p.naam.lower() for p in bestaande_projecten]
-    if naam.lower() in bestaande_namen:
+    if naam_sleutel(naam) in bestaande_namen:
         return False, f"Een project met de naam '{naam}' bestaat al"
     
     return True, ""
 
 
-def valideer_taaktitel(titel: str, bestaande_taken: List[Task]) -> tuple[bool, str]:
+def valideer_taaktitel(titel: str, bestaande_titels: Container[str]) -> tuple[bool, str]:
     """
     Valideer de taaktitel.
     
     Args:
         titel: De taaktitel die gevalideerd moet worden
-        bestaande_taken: Lijst van bestaande taken in het project
+        bestaande_titels: Index van bestaande taken in het project op
+            naam_sleutel, zoals Project.taakindex
     
     Returns:
         Tuple van (is_geldig, foutbericht)
@@ -39,8 +39,7 @@ def valideer_taaktitel(titel: str, bestaande_taken: List[Task]) -> tuple[bool, s
         return False, "Taaktitel mag niet leeg zijn"
     
     # Controleer uniciteit binnen project
-    bestaande_titels = [t.titel.lower() for t in bestaande_taken]
-    if titel.lower() in bestaande_titels:
+    if naam_sleutel(titel) in bestaande_titels:
         return False, f"Een taak met titel '{titel}' bestaat al in dit project"
     
     return True, ""
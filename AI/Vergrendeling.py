@@ -0,0 +1,153 @@
+import os
+from pathlib import Path
+from typing import Any, Callable
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+# Bestand in elke projectmap dat zowel als lock dient als het versienummer bevat
+VERSIEBESTAND = '.versie'
+# Het versienummer staat als vaste breedte tekst aan het begin van het bestand
+_VERSIEBREEDTE = 20
+# Op Windows wordt een byte voorbij het versienummer vergrendeld, zodat het
+# versienummer zonder lock leesbaar blijft
+_LOCKPOSITIE = 64
+
+# Aantal keer dat een wijziging opnieuw geprobeerd wordt na een conflict
+MAX_POGINGEN = 5
+
+
+class VersieConflict(Exception):
+    """Een project is door een ander proces gewijzigd sinds het geladen werd"""
+    
+    def __init__(self, naam: str, verwacht: int, gevonden: int):
+        super().__init__(
+            f"Project '{naam}' is intussen gewijzigd (versie {gevonden}, verwacht {verwacht})"
+        )
+        self.naam = naam
+        self.verwacht = verwacht
+        self.gevonden = gevonden
+
+
+def lees_versie(project_folder: Path) -> int:
+    """Lees het versienummer van een project zonder lock; 0 als er nog geen is"""
+    try:
+        with open(project_folder / VERSIEBESTAND, 'rb') as f:
+            inhoud = f.read(_VERSIEBREEDTE).strip()
+    except FileNotFoundError:
+        return 0
+    
+    return int(inhoud) if inhoud else 0
+
+
+class Projectslot:
+    """
+    Advisory lock op een projectmap, voor gebruik met ``with``.
+    
+    Zolang het slot vastgehouden wordt kan geen ander proces (of andere
+    thread) hetzelfde project wegschrijven. Binnen het slot wordt met
+    controleer() nagegaan of het project sinds het laden niet gewijzigd is,
+    en met verhoog() het versienummer opgehoogd nadat er geschreven is.
+    
+    Een gedeeld slot is voor lezen: meerdere lezers tegelijk, maar niet
+    tijdens het schrijven, zodat gegevens en versienummer bij elkaar horen.
+    Op Windows is ook een gedeeld slot exclusief.
+    """
+    
+    def __init__(self, project_folder: Path, gedeeld: bool = False):
+        self.pad = project_folder / VERSIEBESTAND
+        self.gedeeld = gedeeld
+        self._bestand = None
+    
+    def __enter__(self) -> "Projectslot":
+        fd = os.open(self.pad, os.O_RDWR | os.O_CREAT, 0o644)
+        self._bestand = os.fdopen(fd, 'r+b', buffering=0)
+        
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_SH if self.gedeeld else fcntl.LOCK_EX)
+            elif msvcrt:
+                self._bestand.seek(_LOCKPOSITIE)
+                while True:
+                    try:
+                        # LK_LOCK geeft na ongeveer tien seconden op
+                        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+        except BaseException:
+            self._bestand.close()
+            raise
+        
+        return self
+    
+    def __exit__(self, *exc_info):
+        try:
+            if fcntl:
+                fcntl.flock(self._bestand.fileno(), fcntl.LOCK_UN)
+            elif msvcrt:
+                self._bestand.seek(_LOCKPOSITIE)
+                msvcrt.locking(self._bestand.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._bestand.close()
+            self._bestand = None
+    
+    @property
+    def versie(self) -> int:
+        """Het huidige versienummer op schijf"""
+        self._bestand.seek(0)
+        inhoud = self._bestand.read(_VERSIEBREEDTE).strip()
+        return int(inhoud) if inhoud else 0
+    
+    def controleer(self, naam: str, verwacht: int):
+        """
+        Controleer dat het versienummer op schijf nog het verwachte is.
+        
+        Raises:
+            VersieConflict: Als een ander proces het project intussen gewijzigd heeft
+        """
+        gevonden = self.versie
+        if gevonden != verwacht:
+            raise VersieConflict(naam, verwacht, gevonden)
+    
+    def verhoog(self) -> int:
+        """Hoog het versienummer op schijf op en geef het nieuwe nummer"""
+        nieuw = self.versie + 1
+        self._bestand.seek(0)
+        self._bestand.write(str(nieuw).rjust(_VERSIEBREEDTE).encode('ascii'))
+        return nieuw
+
+
+def met_herhaling(storage, project, mutatie: Callable[[], Any], bij_conflict: Any) -> Any:
+    """
+    Voer een wijziging uit en probeer het opnieuw als er een versieconflict is.
+    
+    Bij een conflict wordt het project in place opnieuw van schijf geladen,
+    waarmee ook de mislukte wijziging ongedaan wordt, en wordt de wijziging
+    opnieuw uitgevoerd op de actuele gegevens.
+    
+    Args:
+        storage: De opslag; moet herlaad_project() hebben als er conflicten kunnen zijn
+        project: Het project dat gewijzigd wordt
+        mutatie: Functie die de wijziging uitvoert en opslaat
+        bij_conflict: Resultaat als het na MAX_POGINGEN nog steeds niet lukt
+    
+    Returns:
+        Het resultaat van mutatie(), of bij_conflict
+    """
+    for _ in range(MAX_POGINGEN):
+        try:
+            return mutatie()
+        except VersieConflict:
+            if not storage.herlaad_project(project):
+                break
+    
+    return bij_conflict
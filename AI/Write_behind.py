@@ -0,0 +1,198 @@
+import threading
+import time
+from typing import Dict, List, Optional
+from Models import Project, Task, ProjectSamenvatting, naam_sleutel
+from Vergrendeling import VersieConflict
+
+
+class UitgesteldeStorage:
+    """
+    Opslag die wijzigingen op de achtergrond wegschrijft (write-behind).
+    
+    Wordt om een StorageManager of SqliteStorageManager heen gezet en heeft
+    dezelfde publieke methodes. Opslaan markeert een project alleen als
+    gewijzigd; een schrijfthread slaat elk gewijzigd project een keer op zodra
+    er max_wachttijd seconden verstreken zijn sinds de eerste wijziging of er
+    max_wijzigingen wijzigingen zijn. Tien snelle wijzigingen aan hetzelfde
+    project leveren zo een enkele schrijfactie op.
+    
+    Roep flush() aan om direct alles weg te schrijven en sluit() bij afsluiten.
+    Zonder achtergrondthread wordt alleen bij flush() geschreven.
+    """
+    
+    def __init__(self, storage, max_wachttijd: float = 1.0, max_wijzigingen: int = 100,
+                 achtergrond: bool = True):
+        """
+        Args:
+            storage: De onderliggende opslag
+            max_wachttijd: Maximale tijd in seconden dat een wijziging wacht
+            max_wijzigingen: Aantal wijzigingen waarna direct geschreven wordt
+            achtergrond: Start een schrijfthread; zonder thread wordt alleen
+                bij flush() en sluit() geschreven
+        """
+        self.storage = storage
+        self.max_wachttijd = max_wachttijd
+        self.max_wijzigingen = max_wijzigingen
+        
+        # Gewijzigde projecten op naam_sleutel
+        self._vuil: Dict[str, Project] = {}
+        self._aantal_wijzigingen = 0
+        self._eerste_wijziging: Optional[float] = None
+        
+        self._conditie = threading.Condition()
+        # Zorgt dat er maar een flush tegelijk loopt
+        self._schrijf_lock = threading.Lock()
+        self._actief = True
+        
+        self._thread: Optional[threading.Thread] = None
+        if achtergrond:
+            self._thread = threading.Thread(target=self._schrijflus, name="write-behind", daemon=True)
+            self._thread.start()
+    
+    def __getattr__(self, naam: str):
+        # Overige attributen en methodes komen van de onderliggende opslag
+        return getattr(self.storage, naam)
+    
+    def _markeer_vuil(self, project: Project) -> bool:
+        """Onthoud dat een project opgeslagen moet worden"""
+        with self._conditie:
+            self._vuil[naam_sleutel(project.naam)] = project
+            self._aantal_wijzigingen += 1
+            if self._eerste_wijziging is None:
+                self._eerste_wijziging = time.monotonic()
+            self._conditie.notify()
+        return True
+    
+    def _moet_schrijven(self) -> bool:
+        """Controleer of een drempel bereikt is (aanroeper houdt de conditie vast)"""
+        if not self._vuil:
+            return False
+        
+        if self._aantal_wijzigingen >= self.max_wijzigingen:
+            return True
+        
+        return time.monotonic() - self._eerste_wijziging >= self.max_wachttijd
+    
+    def _resterende_wachttijd(self) -> Optional[float]:
+        """Tijd tot de volgende geplande flush, of None als er niets wacht"""
+        if self._eerste_wijziging is None:
+            return None
+        return max(0.0, self.max_wachttijd - (time.monotonic() - self._eerste_wijziging))
+    
+    def _schrijflus(self):
+        """Hoofdlus van de schrijfthread"""
+        while True:
+            with self._conditie:
+                while self._actief and not self._moet_schrijven():
+                    self._conditie.wait(self._resterende_wachttijd())
+                
+                if not self._actief:
+                    return
+            
+            self.flush()
+    
+    def flush(self) -> bool:
+        """
+        Schrijf alle gewijzigde projecten direct weg.
+        
+        Projecten die niet opgeslagen konden worden blijven gemarkeerd en
+        worden later opnieuw geprobeerd. Is een project intussen door een
+        ander proces gewijzigd, dan worden de eigen wijzigingen verworpen en
+        wordt het project opnieuw van schijf geladen.
+        
+        Returns:
+            True als alles opgeslagen is, False anders
+        """
+        with self._schrijf_lock:
+            with self._conditie:
+                vuil = self._vuil
+                self._vuil = {}
+                self._aantal_wijzigingen = 0
+                self._eerste_wijziging = None
+            
+            gelukt = True
+            
+            for sleutel, project in vuil.items():
+                try:
+                    opgeslagen = self.storage.sla_project_op(project)
+                except VersieConflict as e:
+                    print(f"Wijzigingen niet opgeslagen: {e}")
+                    self.storage.herlaad_project(project)
+                    gelukt = False
+                    continue
+                
+                if not opgeslagen:
+                    gelukt = False
+                    with self._conditie:
+                        self._vuil.setdefault(sleutel, project)
+                        if self._eerste_wijziging is None:
+                            self._eerste_wijziging = time.monotonic()
+            
+            return self.storage.flush() and gelukt
+    
+    def sluit(self):
+        """Stop de schrijfthread, schrijf alles weg en sluit de onderliggende opslag"""
+        with self._conditie:
+            self._actief = False
+            self._conditie.notify()
+        
+        if self._thread:
+            self._thread.join()
+        self.flush()
+        self.storage.sluit()
+    
+    def sla_project_op(self, project: Project) -> bool:
+        """Markeer een project om op de achtergrond op te slaan"""
+        return self._markeer_vuil(project)
+    
+    def sla_taakwijziging_op(self, project: Project, actie: str, taak: Task) -> bool:
+        """Markeer het project van een taakwijziging om op de achtergrond op te slaan"""
+        return self._markeer_vuil(project)
+    
+    def sla_catalogus_op(self) -> bool:
+        """Schrijf alles weg, inclusief de catalogus"""
+        return self.flush()
+    
+    def verwijder_project(self, project_naam: str) -> bool:
+        """Verwijder een project; openstaande wijzigingen ervan vervallen"""
+        with self._schrijf_lock:
+            with self._conditie:
+                self._vuil.pop(naam_sleutel(project_naam), None)
+            return self.storage.verwijder_project(project_naam)
+    
+    def laad_project(self, project_naam: str) -> Optional[Project]:
+        """
+        Laad een project. Staat het project nog gemarkeerd, dan is het object
+        in het geheugen actueler dan de schijf en wordt dat teruggegeven;
+        andere gemarkeerde projecten worden niet tussendoor weggeschreven.
+        """
+        with self._conditie:
+            project = self._vuil.get(naam_sleutel(project_naam))
+        if project is not None:
+            return project
+        return self.storage.laad_project(project_naam)
+    
+    def laad_alle_projecten(self, werkers: Optional[int] = None) -> List[Project]:
+        """Laad alle projecten; nog gemarkeerde projecten komen uit het geheugen, zie laad_project()"""
+        with self._conditie:
+            vuil = dict(self._vuil)
+        projecten = [vuil.pop(naam_sleutel(project.naam), project)
+                     for project in self.storage.laad_alle_projecten(werkers)]
+        return projecten + list(vuil.values())
+    
+    def laad_catalogus(self) -> List[ProjectSamenvatting]:
+        """Laad de catalogus nadat openstaande wijzigingen zijn weggeschreven"""
+        self.flush()
+        return self.storage.laad_catalogus()
+    
+    def project_bestaat(self, project_naam: str) -> bool:
+        """Controleer of een project bestaat, inclusief nog niet weggeschreven projecten"""
+        with self._conditie:
+            if naam_sleutel(project_naam) in self._vuil:
+                return True
+        return self.storage.project_bestaat(project_naam)
+    
+    def list_projectmappen(self) -> List[str]:
+        """Geef alle projectnamen nadat openstaande wijzigingen zijn weggeschreven"""
+        self.flush()
+        return self.storage.list_projectmappen()
@@ -0,0 +1,164 @@
+import re
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+# Gewicht van een woord in de titel en in de beschrijving van een taak
+TITELGEWICHT = 3
+BESCHRIJVINGGEWICHT = 1
+# Factor voor een woord dat alleen met de zoekterm begint
+PREFIXFACTOR = 0.5
+
+_WOORD = re.compile(r'\w+')
+
+
+def tokeniseer(tekst: Optional[str]) -> List[str]:
+    """Splits een tekst in woorden, ongeacht hoofdletters"""
+    if not tekst:
+        return []
+    return _WOORD.findall(tekst.casefold())
+
+
+def _gewichten(taak) -> Dict[str, int]:
+    """Gewicht per woord van een taak, zie TITELGEWICHT en BESCHRIJVINGGEWICHT"""
+    # De beschrijving is meestal langer; dict.fromkeys ontdubbelt die in een keer
+    gewichten: Dict[str, int] = dict.fromkeys(tokeniseer(taak.beschrijving), BESCHRIJVINGGEWICHT)
+    for woord in dict.fromkeys(tokeniseer(taak.titel)):
+        gewichten[woord] = gewichten.get(woord, 0) + TITELGEWICHT
+    return gewichten
+
+
+def doorzoek(taken, termen: List[str], prefix: bool = False) -> Dict[object, float]:
+    """
+    Zoek taken waarin alle termen voorkomen zonder een index op te bouwen,
+    met dezelfde scores als Zoekindex.zoek().
+    
+    Voor een enkele zoekopdracht is dit sneller dan eerst een index
+    opbouwen: alleen taken waarvan de tekst alle termen bevat worden in
+    woorden gesplitst.
+    """
+    resultaat: Dict[object, float] = {}
+    
+    for taak in taken:
+        tekst = f"{taak.titel}\n{taak.beschrijving or ''}".casefold()
+        if not all(term in tekst for term in termen):
+            continue
+        
+        gewichten = _gewichten(taak)
+        score = 0.0
+        for term in termen:
+            beste = gewichten.get(term, 0)
+            if prefix:
+                for woord, gewicht in gewichten.items():
+                    if gewicht * PREFIXFACTOR > beste and woord != term and woord.startswith(term):
+                        beste = gewicht * PREFIXFACTOR
+            if not beste:
+                break
+            score += beste
+        else:
+            resultaat[taak] = score
+    
+    return resultaat
+
+
+class Zoekindex:
+    """
+    Omgekeerde index van de woorden in de titels en beschrijvingen van de
+    taken van een project.
+    
+    Per woord staat bij elke taak waarin het voorkomt een gewicht: hoger
+    als het woord in de titel staat dan in de beschrijving. Het project
+    houdt de index bij als taken toegevoegd, verwijderd of gewijzigd worden.
+    """
+    
+    def __init__(self, taken=()):
+        # Woord -> taak -> gewicht
+        self._woorden: Dict[str, Dict[object, int]] = {}
+        # Woorden per taak, om een taak te kunnen verwijderen als de tekst al gewijzigd is
+        self._woorden_per_taak: Dict[object, Tuple[str, ...]] = {}
+        # Gesorteerde woorden voor zoeken op prefix; None als ze opnieuw gesorteerd moeten worden
+        self._gesorteerd: Optional[List[str]] = None
+        
+        for taak in taken:
+            self.voeg_toe(taak)
+    
+    def voeg_toe(self, taak):
+        """Neem de titel en beschrijving van een taak op in de index"""
+        gewichten = _gewichten(taak)
+        
+        woorden = self._woorden
+        for woord, gewicht in gewichten.items():
+            taken = woorden.get(woord)
+            if taken is None:
+                taken = woorden[woord] = {}
+                self._gesorteerd = None
+            taken[taak] = gewicht
+        
+        self._woorden_per_taak[taak] = tuple(gewichten)
+    
+    def verwijder(self, taak):
+        """Haal een taak uit de index"""
+        for woord in self._woorden_per_taak.pop(taak, ()):
+            taken = self._woorden[woord]
+            del taken[taak]
+            if not taken:
+                del self._woorden[woord]
+                self._gesorteerd = None
+    
+    def werk_bij(self, taak):
+        """Werk de index bij nadat de titel of beschrijving van een taak gewijzigd is"""
+        self.verwijder(taak)
+        self.voeg_toe(taak)
+    
+    def _varianten(self, term: str, prefix: bool) -> Iterator[Tuple[str, float]]:
+        """Geef de woorden in de index die bij een zoekterm horen, met hun factor"""
+        if term in self._woorden:
+            yield term, 1.0
+        
+        if not prefix:
+            return
+        
+        if self._gesorteerd is None:
+            self._gesorteerd = sorted(self._woorden)
+        
+        positie = bisect_left(self._gesorteerd, term)
+        while positie < len(self._gesorteerd) and self._gesorteerd[positie].startswith(term):
+            if self._gesorteerd[positie] != term:
+                yield self._gesorteerd[positie], PREFIXFACTOR
+            positie += 1
+    
+    def zoek(self, termen: List[str], prefix: bool = False) -> Dict[object, float]:
+        """
+        Zoek taken waarin alle termen voorkomen.
+        
+        Args:
+            termen: Getokeniseerde zoektermen, zie tokeniseer()
+            prefix: Laat een term ook woorden vinden die ermee beginnen
+        
+        Returns:
+            De gevonden taken met hun score: per term het gewicht van het
+            best passende woord, opgeteld
+        """
+        resultaat: Optional[Dict[object, float]] = None
+        
+        for term in termen:
+            scores: Dict[object, float] = {}
+            for woord, factor in self._varianten(term, prefix):
+                for taak, gewicht in self._woorden[woord].items():
+                    score = gewicht * factor
+                    if score > scores.get(taak, 0):
+                        scores[taak] = score
+            
+            if resultaat is None:
+                resultaat = scores
+            else:
+                resultaat = {taak: score + scores[taak] for taak, score in resultaat.items()
+                             if taak in scores}
+            
+            if not resultaat:
+                return {}
+        
+        return resultaat or {}
+    
+    def __len__(self) -> int:
+        return len(self._woorden_per_taak)
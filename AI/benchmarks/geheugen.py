@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Geheugenbenchmark voor Task.
+
+Vergelijkt het geheugengebruik per taak van de compacte Task (met __slots__
+en getallen in plaats van enums en datetimes) met de oude representatie
+met een __dict__ per object en twee datetime objecten.
+
+Gebruik: python benchmarks/geheugen.py [aantal_taken]
+"""
+
+import sys
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Models import Task, TaskPriority, TaskStatus
+
+
+class OudeTaak:
+    """De representatie van Task van voor de compacte versie"""
+    
+    def __init__(self, titel, beschrijving=None, prioriteit=TaskPriority.NORMAAL):
+        self.titel = titel
+        self.beschrijving = beschrijving
+        self.prioriteit = prioriteit
+        self.status = TaskStatus.NIEUW
+        self.aanmaakdatum = datetime.now()
+        self.afrondmoment = None
+
+
+def meet(klasse, aantal: int) -> float:
+    """Geef het gemiddeld aantal bytes per taak bij het aanmaken van aantal taken"""
+    # De titels bestaan al zodat alleen de taakobjecten gemeten worden
+    titels = [f"Taak {i}" for i in range(aantal)]
+    
+    tracemalloc.start()
+    begin = tracemalloc.get_traced_memory()[0]
+    
+    taken = [klasse(titel, None, TaskPriority.HOOG) for titel in titels]
+    for taak in taken[::2]:
+        taak.afrondmoment = datetime.now()
+    
+    gebruikt = tracemalloc.get_traced_memory()[0] - begin
+    tracemalloc.stop()
+    
+    # De lijst zelf telt niet mee
+    return (gebruikt - sys.getsizeof(taken)) / aantal
+
+
+def main():
+    aantal = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    
+    oud = meet(OudeTaak, aantal)
+    nieuw = meet(Task, aantal)
+    
+    print(f"=== GEHEUGENGEBRUIK PER TAAK ({aantal} taken) ===")
+    print(f"{'Oude Task (__dict__)':<30} {oud:>8.0f} bytes")
+    print(f"{'Compacte Task (__slots__)':<30} {nieuw:>8.0f} bytes")
+    print(f"{'Besparing':<30} {(1 - nieuw / oud) * 100:>7.0f} %")
+
+
+if __name__ == "__main__":
+    main()
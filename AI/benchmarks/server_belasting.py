@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Belastingstest voor de HTTP/JSON-server.
+
+Start een server op een tijdelijke werkruimte (of gebruikt een draaiende
+server via --url), laat een aantal clients tegelijk een mix van verzoeken
+sturen en meldt het aantal verzoeken per seconde en de latentie.
+
+Gebruik:
+    python benchmarks/server_belasting.py --clients 8 --verzoeken 2000
+    python benchmarks/server_belasting.py --url http://127.0.0.1:8080
+"""
+
+import argparse
+import http.client
+import json
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Server import maak_server
+from Storage import StorageManager
+
+
+class Client:
+    """Een client met een vaste (keep-alive) verbinding"""
+    
+    def __init__(self, host: str, poort: int):
+        self.verbinding = http.client.HTTPConnection(host, poort, timeout=30)
+    
+    def verzoek(self, methode: str, pad: str, body: Optional[Dict[str, Any]] = None) -> Tuple[int, Dict]:
+        """Stuur een verzoek en geef de statuscode en het JSON-antwoord"""
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Content-Type': 'application/json'} if data else {}
+        self.verbinding.request(methode, pad, body=data, headers=headers)
+        antwoord = self.verbinding.getresponse()
+        return antwoord.status, json.loads(antwoord.read())
+    
+    def sluit(self):
+        self.verbinding.close()
+
+
+def bereid_voor(client: Client, aantal_projecten: int, taken_per_project: int) -> List[str]:
+    """Maak de projecten en taken aan waarop de clients werken"""
+    projecten = []
+    for p in range(aantal_projecten):
+        naam = f"Belasting {p:03d}"
+        client.verzoek('POST', '/projecten', {'naam': naam})
+        for t in range(taken_per_project):
+            client.verzoek('POST', f"/projecten/{quote(naam)}/taken", {'titel': f"Taak {t:04d}"})
+        projecten.append(naam)
+    return projecten
+
+
+def werk(client: Client, nummer: int, aantal: int, projecten: List[str],
+         taken_per_project: int, latenties: List[float], fouten: List[int]):
+    """
+    Stuur aantal verzoeken: om en om details opvragen, een takenlijst
+    opvragen, een taak aanmaken en een status wijzigen. Elke vier verzoeken
+    gaan naar hetzelfde project.
+    """
+    for i in range(aantal):
+        project = quote(projecten[(nummer + i // 4) % len(projecten)])
+        soort = i % 4
+        
+        if soort == 0:
+            verzoek = ('GET', f"/projecten/{project}/taken/{quote(f'Taak {i % taken_per_project:04d}')}", None)
+        elif soort == 1:
+            verzoek = ('GET', f"/projecten/{project}/taken", None)
+        elif soort == 2:
+            verzoek = ('POST', f"/projecten/{project}/taken", {'titel': f"Client {nummer} taak {i}"})
+        else:
+            verzoek = ('PUT', f"/projecten/{project}/taken/{quote(f'Client {nummer} taak {i - 1}')}/status",
+                       {'status': 'bezig'})
+        
+        begin = time.perf_counter()
+        status, _ = client.verzoek(*verzoek)
+        latenties.append(time.perf_counter() - begin)
+        if status != 200:
+            fouten.append(status)
+
+
+def percentiel(waarden: List[float], p: float) -> float:
+    """Geef het p-de percentiel van een gesorteerde lijst"""
+    return waarden[min(len(waarden) - 1, int(len(waarden) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Belastingstest voor de HTTP/JSON-server")
+    parser.add_argument("--url", help="adres van een draaiende server; standaard wordt er een gestart")
+    parser.add_argument("--clients", type=int, default=8, help="aantal gelijktijdige clients")
+    parser.add_argument("--verzoeken", type=int, default=2000, help="aantal verzoeken per client")
+    parser.add_argument("--projecten", type=int, default=8, help="aantal projecten")
+    parser.add_argument("--taken", type=int, default=200, help="aantal taken per project vooraf")
+    args = parser.parse_args()
+    
+    server = None
+    werkruimte = None
+    
+    if args.url:
+        adres = urlsplit(args.url)
+        host, poort = adres.hostname, adres.port or 80
+    else:
+        werkruimte = Path(tempfile.mkdtemp(prefix="server_belasting_"))
+        # Een open verbinding houdt een werker bezet, dus een werker per client
+        server = maak_server("127.0.0.1", 0, args.clients, StorageManager(str(werkruimte)))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, poort = server.server_address
+    
+    try:
+        voorbereider = Client(host, poort)
+        projecten = bereid_voor(voorbereider, args.projecten, args.taken)
+        voorbereider.sluit()
+        
+        clients = [Client(host, poort) for _ in range(args.clients)]
+        latenties: List[List[float]] = [[] for _ in clients]
+        fouten: List[int] = []
+        
+        threads = [
+            threading.Thread(target=werk, args=(client, nummer, args.verzoeken, projecten,
+                                                args.taken, latenties[nummer], fouten))
+            for nummer, client in enumerate(clients)
+        ]
+        
+        begin = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duur = time.perf_counter() - begin
+        
+        for client in clients:
+            client.sluit()
+    finally:
+        if server:
+            server.shutdown()
+            server.server_close()
+            server.verwerker.project_manager.storage.sluit()
+        if werkruimte:
+            shutil.rmtree(werkruimte, ignore_errors=True)
+    
+    alle = sorted(l for lijst in latenties for l in lijst)
+    
+    print(f"=== SERVERBELASTING ({args.clients} clients x {args.verzoeken} verzoeken) ===")
+    print(f"Verzoeken per seconde: {len(alle) / duur:10.0f}")
+    print(f"Latentie gemiddeld:    {statistics.mean(alle) * 1000:10.2f} ms")
+    print(f"Latentie p50:          {percentiel(alle, 50) * 1000:10.2f} ms")
+    print(f"Latentie p99:          {percentiel(alle, 99) * 1000:10.2f} ms")
+    print(f"Mislukte verzoeken:    {len(fouten):10d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark van de manager- en opslaglaag op een synthetische werkruimte.
+
+Genereert een projects/ map van instelbare grootte, meet de belangrijkste
+operaties en vergelijkt de resultaten met een baseline in JSON. Het script
+eindigt met exitcode 1 als een operatie meer dan de tolerantie trager is
+dan de baseline.
+
+Gebruik:
+    python benchmarks/werkruimte.py --projecten 100 --taken 1000 --bewaar-baseline
+    python benchmarks/werkruimte.py --projecten 100 --taken 1000
+"""
+
+import argparse
+import json
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Models import Project, Task, TaskPriority, TaskStatus
+from Storage import StorageManager
+from Project_manager import ProjectManager
+from Task_manager import TaskManager
+
+
+STANDAARD_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def genereer_werkruimte(pad: Path, aantal_projecten: int, taken_per_project: int):
+    """
+    Schrijf een synthetische werkruimte weg via StorageManager.
+    
+    Args:
+        pad: De map voor de werkruimte (wordt leeggemaakt)
+        aantal_projecten: Aantal projecten
+        taken_per_project: Aantal taken per project
+    """
+    if pad.exists():
+        shutil.rmtree(pad)
+    
+    storage = StorageManager(str(pad))
+    prioriteiten = list(TaskPriority)
+    
+    for p in range(aantal_projecten):
+        project = Project(f"Project {p:05d}", f"Gegenereerd project {p}")
+        
+        for t in range(taken_per_project):
+            taak = Task(f"Taak {t:05d}", f"Beschrijving van taak {t}",
+                        prioriteiten[t % len(prioriteiten)])
+            if t % 3 == 1:
+                taak.wijzig_status(TaskStatus.BEZIG)
+            elif t % 3 == 2:
+                taak.wijzig_status(TaskStatus.BEZIG)
+                taak.wijzig_status(TaskStatus.AFGEROND)
+            project.voeg_taak_toe(taak)
+        
+        storage.sla_project_op(project)
+    
+    storage.sluit()
+
+
+def meet(functie: Callable[[int], None], herhalingen: int) -> Dict[str, float]:
+    """Voer functie(i) herhalingen keer uit en geef mediaan en minimum in seconden"""
+    tijden: List[float] = []
+    
+    for i in range(herhalingen):
+        begin = time.perf_counter()
+        functie(i)
+        tijden.append(time.perf_counter() - begin)
+    
+    return {"mediaan": statistics.median(tijden), "minimum": min(tijden)}
+
+
+def voer_benchmarks_uit(pad: Path, herhalingen: int) -> Dict[str, Dict[str, float]]:
+    """Meet alle operaties op de werkruimte in pad"""
+    resultaten = {}
+    
+    # Opstarten, zoals TaskManagementApp dat doet
+    resultaten["opstarten"] = meet(
+        lambda i: ProjectManager(StorageManager(str(pad))), herhalingen
+    )
+    
+    storage = StorageManager(str(pad))
+    pm = ProjectManager(storage)
+    tm = TaskManager(storage)
+    doelproject = pm.zoek_project("Project 00000")
+    
+    resultaten["maak_project_aan"] = meet(
+        lambda i: pm.maak_project_aan(f"Benchmark {i}", "Benchmarkproject"), herhalingen
+    )
+    resultaten["maak_taak_aan"] = meet(
+        lambda i: tm.maak_taak_aan(doelproject, f"Benchmarktaak {i}", None, "hoog"), herhalingen
+    )
+    resultaten["wijzig_taakstatus"] = meet(
+        lambda i: tm.wijzig_taakstatus(doelproject, f"Benchmarktaak {i}", "bezig"), herhalingen
+    )
+    resultaten["toon_projectoverzicht"] = meet(
+        lambda i: pm.toon_projectoverzicht(), herhalingen
+    )
+    resultaten["toon_takenlijst"] = meet(
+        lambda i: tm.toon_takenlijst(doelproject), herhalingen
+    )
+    
+    storage.sluit()
+    return resultaten
+
+
+def vergelijk(resultaten: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+              tolerantie: float) -> List[str]:
+    """
+    Vergelijk resultaten met de baseline.
+    
+    Returns:
+        Lijst van meldingen voor operaties die trager zijn dan toegestaan
+    """
+    regressies = []
+    
+    for operatie, meting in resultaten.items():
+        if operatie not in baseline:
+            continue
+        
+        grens = baseline[operatie]["mediaan"] * (1 + tolerantie)
+        if meting["mediaan"] > grens:
+            regressies.append(
+                f"{operatie}: {meting['mediaan'] * 1000:.2f} ms "
+                f"(baseline {baseline[operatie]['mediaan'] * 1000:.2f} ms)"
+            )
+    
+    return regressies
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark op een synthetische werkruimte")
+    parser.add_argument("--projecten", type=int, default=100, help="aantal projecten")
+    parser.add_argument("--taken", type=int, default=1000, help="aantal taken per project")
+    parser.add_argument("--herhalingen", type=int, default=20, help="metingen per operatie")
+    parser.add_argument("--tolerantie", type=float, default=0.25,
+                        help="toegestane vertraging t.o.v. de baseline (0.25 = 25%%)")
+    parser.add_argument("--baseline", type=Path, default=STANDAARD_BASELINE,
+                        help="pad van de baseline JSON")
+    parser.add_argument("--bewaar-baseline", action="store_true",
+                        help="schrijf de resultaten als nieuwe baseline weg")
+    parser.add_argument("--werkmap", type=Path, default=None,
+                        help="map voor de werkruimte (standaard een tijdelijke map)")
+    args = parser.parse_args()
+    
+    werkmap = args.werkmap or Path(tempfile.mkdtemp(prefix="werkruimte-"))
+    pad = werkmap / "projects"
+    
+    print(f"Werkruimte genereren: {args.projecten} projecten x {args.taken} taken...")
+    begin = time.perf_counter()
+    genereer_werkruimte(pad, args.projecten, args.taken)
+    print(f"  klaar in {time.perf_counter() - begin:.1f} s\n")
+    
+    try:
+        resultaten = voer_benchmarks_uit(pad, args.herhalingen)
+    finally:
+        if not args.werkmap:
+            shutil.rmtree(werkmap, ignore_errors=True)
+    
+    print(f"{'Operatie':<25} {'Mediaan (ms)':>14} {'Minimum (ms)':>14}")
+    print("-" * 55)
+    for operatie, meting in resultaten.items():
+        print(f"{operatie:<25} {meting['mediaan'] * 1000:>14.3f} {meting['minimum'] * 1000:>14.3f}")
+    
+    sleutel = f"{args.projecten}x{args.taken}"
+    
+    baselines = {}
+    if args.baseline.exists():
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baselines = json.load(f)
+    
+    if args.bewaar_baseline:
+        baselines[sleutel] = resultaten
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2)
+        print(f"\nBaseline voor {sleutel} opgeslagen in {args.baseline}")
+        return 0
+    
+    if sleutel not in baselines:
+        print(f"\nGeen baseline voor {sleutel}; draai eerst met --bewaar-baseline")
+        return 0
+    
+    regressies = vergelijk(resultaten, baselines[sleutel], args.tolerantie)
+    if regressies:
+        print(f"\nREGRESSIE (tolerantie {args.tolerantie:.0%}):")
+        for melding in regressies:
+            print(f"  - {melding}")
+        return 1
+    
+    print(f"\nGeen regressies t.o.v. de baseline (tolerantie {args.tolerantie:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
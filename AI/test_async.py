@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from Storage import StorageManager
+from Async_managers import AsyncProjectManager
+
+
+def test_overzicht_tijdens_aanmaken(tmp_path):
+    """Het overzicht lezen terwijl de threadpool projecten toevoegt geeft geen fout"""
+    async def hoofd():
+        pm = await AsyncProjectManager.open(StorageManager(str(tmp_path)), max_gelijktijdig=8)
+        for i in range(20):
+            await pm.maak_project_aan(f"Bestaand {i}")
+        
+        aanmaken = asyncio.gather(*(pm.maak_project_aan(f"Project {i}") for i in range(100)))
+        
+        while not aanmaken.done():
+            for _ in pm.manager.projectoverzicht_regels():
+                # Het overzicht wordt regel voor regel verstuurd, zoals door de server
+                await asyncio.sleep(0)
+            pm.toon_projectoverzicht()
+            await asyncio.sleep(0)
+        
+        assert all(succes for succes, _, _ in await aanmaken)
+        assert len(pm.haal_samenvattingen_op()) == 120
+        await pm.sluit()
+    
+    asyncio.run(hoofd())
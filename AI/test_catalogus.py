@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from Storage import StorageManager
+from Project_manager import ProjectManager
+from Task_manager import TaskManager
+
+
+def aantallen(pad) -> dict:
+    """Aantal taken per project volgens het overzicht van een nieuwe ProjectManager"""
+    return {samenvatting.naam: samenvatting.aantal_taken
+            for samenvatting in ProjectManager(StorageManager(str(pad))).haal_samenvattingen_op()}
+
+
+def test_catalogus_van_ander_proces(tmp_path):
+    """Een proces dat later afsluit mag de tellers van een ander proces niet terugzetten"""
+    opzet = ProjectManager(StorageManager(str(tmp_path)))
+    opzet.maak_project_aan("P")
+    opzet.maak_project_aan("Q")
+    opzet.storage.sluit()
+    
+    storage_a, storage_b = StorageManager(str(tmp_path)), StorageManager(str(tmp_path))
+    pm_a, pm_b = ProjectManager(storage_a), ProjectManager(storage_b)
+    
+    project = pm_b.zoek_project("P")
+    for i in range(5):
+        assert TaskManager(storage_b).maak_taak_aan(project, f"Taak {i}")[0]
+    storage_b.sluit()
+    
+    assert TaskManager(storage_a).maak_taak_aan(pm_a.zoek_project("Q"), "Taak")[0]
+    storage_a.sluit()
+    
+    assert aantallen(tmp_path) == {"P": 5, "Q": 1}
+
+
+def test_catalogus_na_crash(tmp_path):
+    """Journalregels die nooit in de catalogus kwamen worden bij het laden toch geteld"""
+    storage = StorageManager(str(tmp_path))
+    pm = ProjectManager(storage)
+    pm.maak_project_aan("P")
+    storage.sluit()
+    
+    # Zonder sluit(), zoals na een crash: de catalogus op schijf is verouderd
+    storage = StorageManager(str(tmp_path))
+    project = ProjectManager(storage).zoek_project("P")
+    assert TaskManager(storage).maak_taak_aan(project, "Taak")[0]
+    
+    assert aantallen(tmp_path) == {"P": 1}
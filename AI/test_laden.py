@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from Storage import StorageManager
+from Project_manager import ProjectManager
+
+
+def test_alle_projecten_in_een_keer_geladen(tmp_path):
+    """haal_alle_projecten_op laadt ontbrekende projecten via laad_alle_projecten, met werkers"""
+    storage = StorageManager(str(tmp_path))
+    pm = ProjectManager(storage)
+    for i in range(10):
+        pm.maak_project_aan(f"Project {i}")
+    storage.sluit()
+    
+    storage = StorageManager(str(tmp_path), laad_werkers=4)
+    pm = ProjectManager(storage)
+    # Een al geladen project met een niet opgeslagen wijziging blijft hetzelfde object
+    geladen = pm.zoek_project("Project 3")
+    geladen.beschrijving = "Gewijzigd"
+    
+    aanroepen = []
+    laad_alle_projecten = storage.laad_alle_projecten
+    storage.laad_alle_projecten = lambda *args: aanroepen.append(args) or laad_alle_projecten(*args)
+    storage.laad_project = None
+    
+    projecten = pm.haal_alle_projecten_op()
+    
+    assert len(aanroepen) == 1
+    assert sorted(project.naam for project in projecten) == [f"Project {i}" for i in range(10)]
+    assert pm.zoek_project("Project 3") is geladen
+    assert geladen.beschrijving == "Gewijzigd"
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import pytest
+
+from Storage import StorageManager
+from Project_manager import ProjectManager
+from Task_manager import TaskManager
+from Models import Task
+from Vergrendeling import VersieConflict
+
+
+def aantallen(pad) -> dict:
+    """Aantal taken per project volgens het overzicht van een nieuwe ProjectManager"""
+    return {samenvatting.naam: samenvatting.aantal_taken
+            for samenvatting in ProjectManager(StorageManager(str(pad))).haal_samenvattingen_op()}
+
+
+def maak_projecten(pad, *namen):
+    storage = StorageManager(str(pad))
+    pm = ProjectManager(storage)
+    for naam in namen:
+        pm.maak_project_aan(naam)
+    storage.sluit()
+
+
+def test_overzicht_na_sluiten_van_twee_storages(tmp_path):
+    """Beide processen werken eerst en sluiten daarna; geen van beide overschrijft de ander"""
+    maak_projecten(tmp_path, "P", "Q")
+    
+    storage_a, storage_b = StorageManager(str(tmp_path)), StorageManager(str(tmp_path))
+    pm_a, pm_b = ProjectManager(storage_a), ProjectManager(storage_b)
+    
+    for i in range(3):
+        assert TaskManager(storage_a).maak_taak_aan(pm_a.zoek_project("P"), f"Taak {i}")[0]
+    for i in range(2):
+        assert TaskManager(storage_b).maak_taak_aan(pm_b.zoek_project("Q"), f"Taak {i}")[0]
+    
+    storage_a.sluit()
+    storage_b.sluit()
+    
+    assert aantallen(tmp_path) == {"P": 3, "Q": 2}
+
+
+def test_versieconflict_en_opnieuw(tmp_path):
+    """Na een conflict wordt het project herladen en lukt de tweede poging"""
+    maak_projecten(tmp_path, "P")
+    
+    storage_a, storage_b = StorageManager(str(tmp_path)), StorageManager(str(tmp_path))
+    project_a = storage_a.laad_project("P")
+    project_b = storage_b.laad_project("P")
+    
+    assert TaskManager(storage_b).maak_taak_aan(project_b, "Van B")[0]
+    
+    project_a.voeg_taak_toe(Task("Van A"))
+    with pytest.raises(VersieConflict):
+        storage_a.sla_project_op(project_a)
+    
+    # Herladen gooit de mislukte wijziging weg; daarna lukt het opnieuw
+    assert storage_a.herlaad_project(project_a)
+    assert [taak.titel for taak in project_a.tasks] == ["Van B"]
+    project_a.voeg_taak_toe(Task("Van A"))
+    assert storage_a.sla_project_op(project_a)
+    
+    titels = sorted(taak.titel for taak in StorageManager(str(tmp_path)).laad_project("P").tasks)
+    assert titels == ["Van A", "Van B"]
+
+
+def test_taakmanager_herhaalt_na_conflict(tmp_path):
+    """TaskManager probeert het zelf opnieuw als een ander proces tussendoor schreef"""
+    maak_projecten(tmp_path, "P")
+    
+    storage_a, storage_b = StorageManager(str(tmp_path)), StorageManager(str(tmp_path))
+    project_a = storage_a.laad_project("P")
+    assert TaskManager(storage_b).maak_taak_aan(storage_b.laad_project("P"), "Van B")[0]
+    
+    assert TaskManager(storage_a).maak_taak_aan(project_a, "Van A")[0]
+    
+    titels = sorted(taak.titel for taak in StorageManager(str(tmp_path)).laad_project("P").tasks)
+    assert titels == ["Van A", "Van B"]
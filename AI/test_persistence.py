@@ -2,7 +2,8 @@
 # -*- coding: utf-8 -*-
 
 import sys
-sys.path.insert(0, r"c:\Users\tyron\OneDrive - Vonk\Documents\GitHub\Project-Task-management")
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
 
 from Storage import StorageManager
 from Project_manager import ProjectManager
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import pytest
+
+import Storage
+from Storage import StorageManager
+from Sqlite_storage import SqliteStorageManager
+from Write_behind import UitgesteldeStorage
+from Project_manager import ProjectManager
+from Task_manager import TaskManager
+from Transactie import TransactieMislukt
+
+
+def maak_gesloten_project(storage, pm, naam):
+    """Maak een project met een afgeronde taak en sluit het, zodat het verwijderd mag worden"""
+    tm = TaskManager(storage)
+    pm.maak_project_aan(naam)
+    project = pm.zoek_project(naam)
+    tm.maak_taak_aan(project, "Klaar")
+    tm.wijzig_taakstatus(project, "Klaar", "bezig")
+    tm.wijzig_taakstatus(project, "Klaar", "afgerond")
+    assert pm.sluit_project(naam)[0]
+
+
+def test_terugdraaien_als_verwijderen_mislukt(tmp_path, monkeypatch):
+    """Mislukt het verwijderen, dan is ook de rest van de transactie niet geschreven"""
+    storage = StorageManager(str(tmp_path))
+    pm, tm = ProjectManager(storage), TaskManager(storage)
+    pm.maak_project_aan("A")
+    maak_gesloten_project(storage, pm, "B")
+    
+    replace = os.replace
+    def mislukt(bron, doel):
+        if str(doel).endswith(Storage.VERWIJDERD_BESTAND):
+            raise PermissionError(doel)
+        replace(bron, doel)
+    monkeypatch.setattr(Storage.os, "replace", mislukt)
+    
+    with pytest.raises(TransactieMislukt):
+        with pm.transactie():
+            assert tm.maak_taak_aan(pm.zoek_project("A"), "Nieuw")[0]
+            assert pm.verwijder_project("B")[0]
+    monkeypatch.undo()
+    
+    assert pm.zoek_project("A").tasks == []
+    assert pm.zoek_project("B") is not None
+    
+    opnieuw = StorageManager(str(tmp_path))
+    assert opnieuw.laad_project("A").tasks == []
+    assert opnieuw.project_bestaat("B")
+
+
+@pytest.mark.parametrize("soort", ["json", "sqlite"])
+def test_verwijderen_en_opnieuw_aanmaken(tmp_path, soort):
+    """Een verwijderd en opnieuw aangemaakt project vervangt zijn voorganger"""
+    def open_storage():
+        if soort == "sqlite":
+            return SqliteStorageManager(str(tmp_path / "projects.db"))
+        return StorageManager(str(tmp_path))
+    
+    storage = open_storage()
+    pm, tm = ProjectManager(storage), TaskManager(storage)
+    maak_gesloten_project(storage, pm, "P")
+    
+    with pm.transactie():
+        assert pm.verwijder_project("P")[0]
+        assert pm.maak_project_aan("P", "Opnieuw")[0]
+        assert tm.maak_taak_aan(pm.zoek_project("P"), "Nieuw")[0]
+    
+    project = open_storage().laad_project("P")
+    assert project.beschrijving == "Opnieuw"
+    assert [taak.titel for taak in project.tasks] == ["Nieuw"]
+
+
+def test_terugdraaien_bewaart_uitgestelde_wijzigingen(tmp_path):
+    """Wijzigingen van voor de transactie gaan bij terugdraaien niet verloren"""
+    storage = UitgesteldeStorage(StorageManager(str(tmp_path)), achtergrond=False)
+    pm, tm = ProjectManager(storage), TaskManager(storage)
+    pm.maak_project_aan("P")
+    assert tm.maak_taak_aan(pm.zoek_project("P"), "Voor")[0]
+    
+    with pytest.raises(RuntimeError):
+        with pm.transactie():
+            assert tm.maak_taak_aan(pm.zoek_project("P"), "Tijdens")[0]
+            raise RuntimeError("mislukt")
+    
+    assert [taak.titel for taak in pm.zoek_project("P").tasks] == ["Voor"]
+    storage.sluit()
+    assert [taak.titel for taak in StorageManager(str(tmp_path)).laad_project("P").tasks] == ["Voor"]
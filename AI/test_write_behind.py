@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from Storage import StorageManager
+from Write_behind import UitgesteldeStorage
+from Project_manager import ProjectManager
+from Task_manager import TaskManager
+
+
+def test_laden_schrijft_niet_tussendoor(tmp_path):
+    """Afwisselend twee projecten wijzigen levert pas bij sluiten een schrijfactie per project op"""
+    storage = StorageManager(str(tmp_path))
+    pm = ProjectManager(storage)
+    pm.maak_project_aan("A")
+    pm.maak_project_aan("B")
+    storage.sluit()
+    
+    onderliggend = StorageManager(str(tmp_path))
+    opgeslagen = []
+    sla_project_op = onderliggend.sla_project_op
+    onderliggend.sla_project_op = lambda project, *args: opgeslagen.append(project.naam) or sla_project_op(project, *args)
+    
+    uitgesteld = UitgesteldeStorage(onderliggend, achtergrond=False)
+    pm, tm = ProjectManager(uitgesteld), TaskManager(uitgesteld)
+    for i in range(3):
+        for naam in ("A", "B"):
+            assert tm.maak_taak_aan(pm.zoek_project(naam), f"Taak {i}")[0]
+    assert opgeslagen == []
+    
+    uitgesteld.sluit()
+    assert sorted(opgeslagen) == ["A", "B"]
+    assert len(StorageManager(str(tmp_path)).laad_project("A").tasks) == 3
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import pytest
+
+from Models import Task
+from Zoekindex import Zoekindex, doorzoek, tokeniseer
+
+
+TAKEN = [
+    Task("Website ontwerpen", "Ontwerp voor de webshop en de website"),
+    Task("Webshop testen", "Betalingen testen"),
+    Task("Ontwerp bespreken", "Met de klant, over de website"),
+    Task("Koffie", None),
+]
+
+
+@pytest.mark.parametrize("zoekterm", ["website", "web", "ontwerp", "web ontwerp", "klant web", "thee", "Betaling"])
+@pytest.mark.parametrize("prefix", [False, True])
+def test_doorzoeken_geeft_dezelfde_scores_als_de_index(zoekterm, prefix):
+    termen = tokeniseer(zoekterm)
+    assert doorzoek(TAKEN, termen, prefix) == Zoekindex(TAKEN).zoek(termen, prefix)